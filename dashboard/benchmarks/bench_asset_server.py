@@ -0,0 +1,117 @@
+"""
+Benchmark: concurrent scene downloads, threaded asset server vs. the old
+single-threaded TCPServer + SimpleHTTPRequestHandler.
+
+One "slow" client trickles through the scene while N normal clients download
+it in full. With the old server every other client waits behind the slow one.
+
+Usage (from repo root):
+    python dashboard/benchmarks/bench_asset_server.py --size-mb 200 --clients 8
+"""
+import argparse
+import http.client
+import http.server
+import os
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from functools import partial
+
+sys.path.append(os.path.join(os.getcwd(), "dashboard", "src"))
+
+from services.asset_server import create_server
+
+
+class _QuietLegacyHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def legacy_server(root: str):
+    return socketserver.TCPServer(("127.0.0.1", 0), partial(_QuietLegacyHandler, directory=root))
+
+
+def download(port: int, path: str, chunk: int = 1 << 20, delay: float = 0.0) -> dict:
+    started = time.perf_counter()
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=600)
+    conn.request("GET", path)
+    resp = conn.getresponse()
+    first_byte = time.perf_counter() - started
+    received = 0
+    while True:
+        block = resp.read(chunk)
+        if not block:
+            break
+        received += len(block)
+        if delay:
+            time.sleep(delay)
+    conn.close()
+    return {"ttfb": first_byte, "seconds": time.perf_counter() - started, "bytes": received}
+
+
+def run(server, clients: int, path: str, slow_delay: float) -> dict:
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    port = server.server_address[1]
+    results, slow = [], {}
+
+    def _slow():
+        slow.update(download(port, path, chunk=64 << 10, delay=slow_delay))
+
+    def _fast():
+        results.append(download(port, path))
+
+    slow_thread = threading.Thread(target=_slow)
+    slow_thread.start()
+    time.sleep(0.2)  # The slow client gets the server first
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=_fast) for _ in range(clients)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    wall = time.perf_counter() - started
+
+    slow_thread.join()
+    server.shutdown()
+    server.server_close()
+
+    total = sum(r["bytes"] for r in results)
+    return {
+        "wall": wall,
+        "throughput_mb_s": total / wall / 1e6,
+        "max_ttfb": max(r["ttfb"] for r in results),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=int, default=200)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--slow-delay", type=float, default=0.002, help="Seconds slept per 64 KiB by the slow client")
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        os.makedirs(os.path.join(root, "demo", "scene"))
+        scene = os.path.join(root, "demo", "scene", "factory_complete.glb")
+        with open(scene, "wb") as f:
+            for _ in range(args.size_mb):
+                f.write(os.urandom(1 << 20))
+        path = "/demo/scene/factory_complete.glb"
+
+        print(f"Scene: {args.size_mb} MB, {args.clients} concurrent clients + 1 slow client")
+        rows = [("threaded + sendfile", run(create_server(root, 0, "127.0.0.1"), args.clients, path, args.slow_delay))]
+        if not args.skip_legacy:
+            rows.append(("legacy TCPServer", run(legacy_server(root), args.clients, path, args.slow_delay)))
+
+        print(f"{'server':<22}{'wall (s)':>10}{'MB/s':>10}{'max TTFB (s)':>15}")
+        for name, r in rows:
+            print(f"{name:<22}{r['wall']:>10.2f}{r['throughput_mb_s']:>10.0f}{r['max_ttfb']:>15.3f}")
+
+
+if __name__ == "__main__":
+    main()
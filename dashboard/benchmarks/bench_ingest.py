@@ -0,0 +1,136 @@
+"""
+Load generator for the telemetry ingest service.
+
+Starts services.telemetry_ingest in a subprocess pinned to ONE core, then
+drives it from several client processes sending pre-encoded batches
+(HTTP keep-alive or UDP) and reports the sustained points/s the service
+acknowledged (from /health, so UDP drops are not counted).
+
+Usage (from repo root):
+    python dashboard/benchmarks/bench_ingest.py --seconds 10 --clients 3 --batch 5000
+    python dashboard/benchmarks/bench_ingest.py --udp --batch 1000
+"""
+import argparse
+import http.client
+import json
+import multiprocessing as mp
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC = os.path.join(os.getcwd(), "dashboard", "src")
+METRICS = ("temperature", "vibration", "power", "efficiency")
+
+
+def free_port(kind=socket.SOCK_STREAM) -> int:
+    with socket.socket(socket.AF_INET, kind) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def make_batches(machines: int, batch: int, count: int, seed: int) -> list:
+    rng = random.Random(seed)
+    now = time.time()
+    batches = []
+    for b in range(count):
+        points = [
+            [now + (b * batch + i) * 1e-4, f"M{rng.randrange(machines)}", METRICS[i % 4], round(rng.uniform(0, 100), 2)]
+            for i in range(batch)
+        ]
+        batches.append(json.dumps({"points": points}).encode())
+    return batches
+
+
+def http_client(port: int, batches: list, deadline: float, sent):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    i = 0
+    while time.time() < deadline:
+        conn.request("POST", "/ingest", body=batches[i % len(batches)])
+        resp = conn.getresponse()
+        resp.read()
+        if resp.status != 204:
+            raise RuntimeError(f"Ingest failed: {resp.status}")
+        i += 1
+    conn.close()
+    with sent.get_lock():
+        sent.value += i
+
+
+def udp_client(port: int, batches: list, deadline: float, sent):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    i = 0
+    while time.time() < deadline:
+        sock.sendto(batches[i % len(batches)], ("127.0.0.1", port))
+        i += 1
+        if i % 8 == 0:
+            time.sleep(0.001)  # Keep the socket buffer from overflowing outright
+    with sent.get_lock():
+        sent.value += i
+
+
+def health(port: int) -> dict:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    conn.request("GET", "/health")
+    data = json.loads(conn.getresponse().read())
+    conn.close()
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--clients", type=int, default=3)
+    parser.add_argument("--batch", type=int, default=5000, help="Points per request / datagram")
+    parser.add_argument("--machines", type=int, default=1000)
+    parser.add_argument("--udp", action="store_true")
+    args = parser.parse_args()
+    if args.udp:
+        args.batch = min(args.batch, 1000)  # Must fit in one datagram
+
+    http_port, udp_port = free_port(), free_port(socket.SOCK_DGRAM)
+    with tempfile.TemporaryDirectory() as root:
+        env = dict(os.environ, PYTHONPATH=SRC)
+        cmd = [sys.executable, "-m", "services.telemetry_ingest", "--root", root,
+               "--host", "127.0.0.1", "--http-port", str(http_port), "--udp-port", str(udp_port)]
+        pin = (lambda: os.sched_setaffinity(0, {0})) if hasattr(os, "sched_setaffinity") else None
+        server = subprocess.Popen(cmd, env=env, preexec_fn=pin, stderr=subprocess.DEVNULL)
+        try:
+            for _ in range(100):
+                try:
+                    health(http_port)
+                    break
+                except OSError:
+                    time.sleep(0.1)
+
+            batches = make_batches(args.machines, args.batch, 8, seed=1)
+            before = health(http_port)["points_total"]
+            started = time.time()
+            deadline = started + args.seconds
+            sent = mp.Value("q", 0)
+            target = udp_client if args.udp else http_client
+            port = udp_port if args.udp else http_port
+            clients = [mp.Process(target=target, args=(port, batches, deadline, sent)) for _ in range(args.clients)]
+            for c in clients:
+                c.start()
+            for c in clients:
+                c.join()
+            time.sleep(0.5)  # Let the server drain queued datagrams
+            elapsed = time.time() - started
+            stats = health(http_port)
+        finally:
+            server.terminate()
+            server.wait()
+
+        accepted = stats["points_total"] - before
+        size = sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(root) for f in files)
+        print(f"transport: {'udp' if args.udp else 'http'}, batch {args.batch}, {args.clients} clients, server on 1 core")
+        print(f"sent {sent.value * args.batch:,} points, stored {accepted:,} ({stats['series']} series)")
+        print(f"sustained: {accepted / elapsed:,.0f} points/s, store size {size / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark: telemetry simulator tick and read cost vs. fleet size, compared
+with the old per-rerun DataLoader.generate_telemetry (random values per machine).
+
+Usage (from repo root):
+    python dashboard/benchmarks/bench_telemetry_sim.py --machines 100 1000 10000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.getcwd(), "dashboard", "src"))
+
+from services.telemetry_sim import TelemetrySimulator
+
+
+def legacy_generate_telemetry(machines: list) -> dict:
+    data = {}
+    for m in machines:
+        status = "RUNNING" if random.random() > 0.1 else "IDLE"
+        if random.random() > 0.98:
+            status = "MAINTENANCE"
+        data[m] = {
+            "status": status,
+            "temperature": round(random.uniform(40, 85), 1),
+            "vibration": round(random.uniform(0.1, 2.5), 2),
+            "power": round(random.uniform(10, 50), 1),
+            "efficiency": int(random.uniform(70, 99)),
+        }
+    return data
+
+
+def timed(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--machines", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--history", type=int, default=300)
+    args = parser.parse_args()
+
+    print(f"{'machines':>9}{'tick (ms)':>12}{'latest (us)':>13}{'5 min window (us)':>19}{'legacy rerun (ms)':>19}")
+    for n in args.machines:
+        ids = [f"M{i}" for i in range(n)]
+        sim = TelemetrySimulator(ids, history=args.history, seed=0)
+        for _ in range(args.history):
+            sim.step()
+        tick = timed(sim.step, 50)
+        latest = timed(lambda: sim.latest(ids[n // 2]), 2000)
+        window = timed(lambda: sim.window(ids[n // 2], 300), 2000)
+        legacy = timed(lambda: legacy_generate_telemetry(ids), 5)
+        print(f"{n:>9}{tick * 1e3:>12.2f}{latest * 1e6:>13.1f}{window * 1e6:>19.1f}{legacy * 1e3:>19.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Load test: many concurrent dashboard sessions in one process.
+
+Each simulated user is a headless Streamlit session (streamlit.testing AppTest)
+running the real dashboard/src/main.py against a generated facility: it opens
+the app, then keeps switching "Inspect Machine" (every switch is a full rerun).
+Reports rerun latency percentiles, process memory and how many shared
+project states the registry holds, so runs with 1 / 10 / 50 users can be
+compared: with shared state, memory should stay flat as users grow.
+
+Usage (from repo root):
+    python dashboard/benchmarks/loadtest_sessions.py --users 1 10 50 --machines 500 --reruns 20
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+APP = Path(__file__).resolve().parent.parent / "src" / "main.py"
+sys.path.append(str(APP.parent))
+
+
+def make_fixture(root: Path, projects: int, machines: int) -> None:
+    """Shared-data + builder folders the dashboard discovers like real Architect/Builder output."""
+    for p in range(projects):
+        name = f"loadtest_{p}"
+        contract = {
+            "machines": [
+                {"id": f"M{i}", "name": f"Machine {i}", "position": [i % 50 * 4.0, 0.0, i // 50 * 4.0]}
+                for i in range(machines)
+            ],
+            "relationships": [{"from_id": f"M{i}", "to_id": f"M{i + 1}"} for i in range(machines - 1) if (i + 1) % 25],
+        }
+        shared = root / "shared" / name
+        shared.mkdir(parents=True)
+        (shared / "layout_contract.json").write_text(json.dumps(contract))
+        scene = root / "builder" / name / "scene"
+        scene.mkdir(parents=True)
+        (scene / "factory_complete.glb").write_bytes(b"glTF")
+        (shared / "camera_map.json").write_text(json.dumps({
+            f"M{i}": {"position": [0, 5, 5], "target": [0, 0, 0]} for i in range(machines)
+        }))
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def user(user_id: int, machines: int, reruns: int, latencies: list, errors: list, barrier: threading.Barrier):
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(user_id)
+    at = AppTest.from_file(str(APP), default_timeout=60)
+    barrier.wait()
+    try:
+        started = time.perf_counter()
+        at.run()
+        latencies.append(time.perf_counter() - started)
+        for _ in range(reruns):
+            choice = "Overview" if rng.random() < 0.2 else f"Machine {rng.randrange(machines)}"
+            started = time.perf_counter()
+            at.selectbox(key="inspect_machine").set_value(choice).run()
+            latencies.append(time.perf_counter() - started)
+        if at.exception:
+            errors.append(at.exception[0].message)
+    except Exception as e:  # Reported, the other users keep going
+        errors.append(f"user {user_id}: {e}")
+
+
+def run(users: int, machines: int, reruns: int) -> dict:
+    from services.shared_state import registry
+
+    latencies, errors = [], []
+    barrier = threading.Barrier(users)
+    threads = [
+        threading.Thread(target=user, args=(u, machines, reruns, latencies, errors, barrier), daemon=True)
+        for u in range(users)
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        "users": users,
+        "reruns": len(latencies),
+        "reruns_per_s": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "rss_mb": rss_mb(),
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "shared_projects": registry.stats(),
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-session load test of the Twin dashboard")
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--machines", type=int, default=500)
+    parser.add_argument("--projects", type=int, default=1)
+    parser.add_argument("--reruns", type=int, default=20, help="Reruns (selection changes) per user")
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    root = Path(tmp.name)
+    make_fixture(root, args.projects, args.machines)
+    # Read by TwinContext at every rerun; the asset server starts but no browser fetches from it
+    os.environ["TWIN_SHARED_ROOT"] = str(root / "shared")
+    os.environ["TWIN_BUILDER_ROOT"] = str(root / "builder")
+
+    print(f"{args.machines} machines x {args.projects} project(s), {args.reruns} reruns per user")
+    print(f"{'users':>6} {'reruns/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'RSS MB':>8} {'peak MB':>8}  shared")
+    baseline = rss_mb()
+    for users in args.users:
+        r = run(users, args.machines, args.reruns)
+        print(
+            f"{r['users']:>6} {r['reruns_per_s']:>9.1f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f}"
+            f" {r['rss_mb']:>8.0f} {r['peak_rss_mb']:>8.0f}  {r['shared_projects']}"
+        )
+        for error in r["errors"][:5]:
+            print(f"       ! {error}")
+    print(f"Baseline RSS before the first session: {baseline:.0f} MB")
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from services.telemetry_sim import TICK_SECONDS, TelemetrySimulator
+
+WINDOW_SECONDS = 300
+REFRESH_SECONDS = 2
+
+
+@st.fragment(run_every=REFRESH_SECONDS)  # Refreshes only this panel, not the whole app (and not the viewer)
+def render_metrics(sim: TelemetrySimulator, machine_id: str, window_seconds: float = WINDOW_SECONDS):
+    """
+    Live metrics of one machine from the background simulator: current values
+    with the change over the window, plus temperature / power trends.
+    """
+    latest = sim.latest(machine_id)
+    if not latest:
+        st.warning("No telemetry for this machine.")
+        return
+
+    history = sim.window(machine_id, window_seconds)
+    first = {name: _first_valid(history[name], latest.get(name, 0)) for name in ("temperature", "efficiency")}
+
+    st.metric("Status", latest["status"])
+    st.metric("Temperature", f"{latest['temperature']} °C", delta=f"{latest['temperature'] - first['temperature']:+.1f} °C", delta_color="inverse")
+    st.metric("Efficiency", f"{latest['efficiency']} %", delta=f"{latest['efficiency'] - first['efficiency']:+.0f} %")
+    st.caption(f"Vibration {latest['vibration']} mm/s · Power {latest['power']} kW")
+
+    trend = pd.DataFrame(
+        {"Temperature (°C)": history["temperature"], "Power (kW)": history["power"]},
+        index=pd.to_datetime(history["timestamp"], unit="s"),
+    )
+    st.line_chart(trend, height=180)
+
+
+def _first_valid(values: np.ndarray, default: float) -> float:
+    """Oldest sample in the window (ingested series may have gaps)."""
+    valid = np.flatnonzero(~np.isnan(values))
+    return float(values[valid[0]]) if len(valid) else float(default)
+
+
+@st.fragment(run_every=REFRESH_SECONDS)
+def render_fleet_overview(source):
+    """
+    Fleet and per-line KPIs precomputed by the telemetry tick (nothing is aggregated here).
+    Takes the telemetry source, not the dict: fragment reruns reuse their arguments.
+    """
+    kpis = source.fleet_kpis() if hasattr(source, "fleet_kpis") else {}
+    if not kpis:
+        st.info("Fleet KPIs appear once telemetry arrives.")
+        return
+
+    minutes = kpis["window_ticks"] * TICK_SECONDS / 60
+    st.metric("OEE", f"{kpis['oee']:.1%}", help=f"Availability x performance over the last {minutes:.0f} min (quality assumed 100%)")
+    st.metric("Availability", f"{kpis['availability']:.1%}")
+    st.metric("Running", f"{kpis['running']} / {kpis['machines']}")
+    st.metric("In Maintenance", kpis["in_maintenance"])
+    st.metric("Mean Temperature", f"{kpis['mean_temperature']:.1f} °C", help=f"Peak {kpis['window_max_temperature']:.1f} °C in window")
+
+    if len(kpis["lines"]) > 1:
+        st.caption("Lines (flow order)")
+        st.dataframe(
+            pd.DataFrame([{
+                "Line": f"{line['machines'][0]} → {line['machines'][-1]}",
+                "OEE": f"{line['oee']:.0%}",
+                "Bottleneck": line["bottleneck"],
+                "Avg °C": round(line["mean_temperature"], 1),
+                "Maint.": line["in_maintenance"],
+            } for line in kpis["lines"]]),
+            hide_index=True,
+            use_container_width=True,
+        )
@@ -0,0 +1,24 @@
+import streamlit.components.v1 as components
+
+PLAYER_HTML = """
+<video id="flythrough" controls muted playsinline style="width:100%;background:#0e1117;"></video>
+<script src="http://localhost:8000/vendor/hls.js@1.5.7/dist/hls.min.js"></script>
+<script>
+    const video = document.getElementById('flythrough');
+    const src = '__STREAM_URL__';
+    if (video.canPlayType('application/vnd.apple.mpegurl')) {
+        video.src = src;  // Safari plays HLS natively
+    } else if (window.Hls && Hls.isSupported()) {
+        // EVENT playlist: hls.js keeps polling it while segments are still being rendered
+        const hls = new Hls();
+        hls.loadSource(src);
+        hls.attachMedia(video);
+    }
+</script>
+"""
+
+def render_flythrough(stream_url: str, height=360):
+    """
+    Plays the flythrough HLS playlist; playback can start while the rest is rendering.
+    """
+    components.html(PLAYER_HTML.replace("__STREAM_URL__", stream_url), height=height)
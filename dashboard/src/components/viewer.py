@@ -1,29 +1,43 @@
+import streamlit as st
 import streamlit.components.v1 as components
-import json
 from pathlib import Path
+from typing import Optional
 
-def render_viewer(model_url: str, camera_map: dict, selected_machine_id: str = None, height=600):
-    """
-    Renders the 3D Viewer IFrame.
+# Bidirectional component served from assets/viewer/index.html.
+# The iframe is created once per session and kept mounted while `key` stays
+# the same; later reruns only post the new arguments into the running scene.
+VIEWER_DIR = Path(__file__).parent.parent / "assets" / "viewer"
+_viewer = components.declare_component("factory_viewer", path=str(VIEWER_DIR))
+
+VIEWER_KEY = "twin_viewer"
+
+
+def render_viewer(
+    model_url: str,
+    camera_map: dict,
+    selected_machine_id: str = None,
+    height=600,
+    manifest_url: str = None,
+) -> Optional[dict]:
     """
-    
-    # Load HTML Template
-    html_path = Path(__file__).parent.parent / "assets" / "viewer.html"
-    with open(html_path, "r") as f:
-        html_content = f.read()
+    Renders the 3D Viewer. Changing the selected machine sends a camera snap
+    message to the loaded scene; the GLB is only fetched again when model_url changes.
+    With a chunk manifest the scene streams in per machine, nearest first
+    (falls back to model_url when the manifest is missing).
 
-    # Serialize Data for JS
-    cam_json = json.dumps(camera_map)
-    
-    # We inject the data directly into the HTML before rendering
-    # This prevents complex cross-origin messaging issues
-    full_html = html_content.replace(
-        "/* INJECT_DATA_HERE */",
-        (
-            f"const MACHINE_CAM_DATA = {cam_json};\n"
-            f"const MODEL_URL = '{model_url}';\n"
-            f"const TARGET_ID = '{selected_machine_id or ''}';"
-        )
+    Returns the last machine clicked in the scene: {"machine_id", "nonce"} or None.
+    """
+    return _viewer(
+        model_url=model_url,
+        manifest_url=manifest_url or "",
+        camera_map=camera_map,
+        target_id=selected_machine_id or "",
+        height=height,
+        key=VIEWER_KEY,
+        default=None,
     )
 
-    components.html(full_html, height=height)
\ No newline at end of file
+
+def last_clicked_machine() -> Optional[dict]:
+    """The viewer's value from the previous run, readable before any widget is drawn."""
+    return st.session_state.get(VIEWER_KEY)
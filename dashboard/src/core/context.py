@@ -3,23 +3,49 @@ from pathlib import Path
 from dataclasses import dataclass
 from typing import List, Optional
 
+from core.project_index import ProjectIndex
+
+CONTRACT_NAME = "layout_contract.json"
+SCENE_NAME = "factory_complete.glb"
+COMPRESSED_SCENE_NAME = "factory_complete.meshopt.glb"  # Written by the Builder when gltfpack is installed
+
 @dataclass
 class ProjectReference:
     name: str
     contract_path: Path
     camera_map_path: Path
     scene_path: Path
+    video_status_path: Optional[Path] = None
+    previews_dir: Optional[Path] = None
+
+    def served_scene(self) -> str:
+        """Scene to load, relative to the project's asset root: the meshopt variant unless it is stale."""
+        try:
+            if self.scene_path.with_name(COMPRESSED_SCENE_NAME).stat().st_mtime_ns >= self.scene_path.stat().st_mtime_ns:
+                return f"scene/{COMPRESSED_SCENE_NAME}"
+        except OSError:
+            pass
+        return f"scene/{SCENE_NAME}"
 
 class TwinContext:
     """
     Manages access to the Shared Data Bridge and Builder Outputs.
     """
     def __init__(self):
-        # Paths mapped via Docker
-        self.shared_root = Path("/app/shared_data")
-        self.builder_root = Path("/app/factory_builder/data")
+        # Paths mapped via Docker (overridable for local runs / load tests)
+        self.shared_root = Path(os.getenv("TWIN_SHARED_ROOT", "/app/shared_data"))
+        self.builder_root = Path(os.getenv("TWIN_BUILDER_ROOT", "/app/factory_builder/data"))
     
     def discover_projects(self) -> List[ProjectReference]:
+        """Projects with a valid contract; rescanned only when the folders change."""
+        index = ProjectIndex.shared(
+            [self.shared_root, self.builder_root],
+            self.scan_projects,
+            watched_names=(CONTRACT_NAME, SCENE_NAME),
+        )
+        return index.projects()
+
+    def scan_projects(self) -> List[ProjectReference]:
         """Scans shared_data for projects that have a valid contract."""
         projects = []
         if not self.shared_root.exists():
@@ -27,10 +53,10 @@ class TwinContext:
 
         for folder in self.shared_root.iterdir():
             if folder.is_dir():
-                contract = folder / "layout_contract.json"
+                contract = folder / CONTRACT_NAME
                 # The scene lives in the Builder's private storage, but we mount it for reading
                 scene_dir = self.builder_root / folder.name / "scene"
-                scene_file = scene_dir / "factory_complete.glb"
+                scene_file = scene_dir / SCENE_NAME
                 cam_map = self.shared_root / folder.name / "camera_map.json"
 
                 if contract.exists() and scene_file.exists():
@@ -38,7 +64,9 @@ class TwinContext:
                         name=folder.name,
                         contract_path=contract,
                         camera_map_path=cam_map,
-                        scene_path=scene_file
+                        scene_path=scene_file,
+                        video_status_path=self.shared_root / folder.name / "video_status.json",
+                        previews_dir=self.shared_root / folder.name / "previews"
                     ))
         
         # Sort by newest
@@ -0,0 +1,128 @@
+"""
+Process-wide project discovery for the Twin.
+
+The folder scan runs only when something changed: a watchdog observer on
+shared_data and the Builder's data folder marks the index dirty when a project
+folder or one of the watched files (contract, scene) changes, and the next
+caller rescans once for every session. Without watchdog (or when inotify is
+unavailable, e.g. some bind mounts) the index falls back to rescanning at most
+every PROJECT_POLL_SECONDS.
+"""
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # Optional: polling fallback
+    Observer = None
+    FileSystemEventHandler = object
+
+POLL_SECONDS = float(os.getenv("PROJECT_POLL_SECONDS", "5"))
+
+
+class _InvalidateOnChange(FileSystemEventHandler):
+    """Dirties the index for events that can change the scan result, not for render output etc."""
+    def __init__(self, index: "ProjectIndex", watched_names: set):
+        super().__init__()
+        self.index = index
+        self.watched_names = watched_names
+        self.roots = {str(root) for root in index.roots}
+
+    def _relevant(self, path) -> bool:
+        if not path:
+            return False
+        path = os.fsdecode(path)
+        return os.path.basename(path) in self.watched_names or os.path.dirname(path) in self.roots
+
+    def on_any_event(self, event):
+        if event.event_type in ("opened", "closed_no_write"):
+            return
+        if self._relevant(event.src_path) or self._relevant(getattr(event, "dest_path", "")):
+            self.index.invalidate()
+
+
+class ProjectIndex:
+    _instances: Dict[Tuple[Path, ...], "ProjectIndex"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(
+        self,
+        roots: List[Path],
+        scan: Callable[[], list],
+        watched_names: Tuple[str, ...] = (),
+        poll_seconds: float = POLL_SECONDS,
+        watch: bool = True,
+    ):
+        self.roots = roots
+        self.watched_names = set(watched_names)
+        self._scan = scan
+        self.poll_seconds = poll_seconds
+        self.watch = watch
+        self._projects: Optional[list] = None
+        self._scanned_at = 0.0
+        self._dirty = True
+        self._lock = threading.Lock()
+        self._observer = self._start_observer() if watch else None
+
+    @classmethod
+    def shared(cls, roots: List[Path], scan: Callable[[], list], watched_names: Tuple[str, ...] = ()) -> "ProjectIndex":
+        """One index per set of roots, shared by every session in the process."""
+        key = tuple(roots)
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(roots, scan, watched_names)
+            return cls._instances[key]
+
+    @property
+    def watching(self) -> bool:
+        return self._observer is not None
+
+    def _start_observer(self):
+        if Observer is None:
+            logger.info(f"👀 watchdog not installed: rescanning projects every {self.poll_seconds:g}s")
+            return None
+        existing = [root for root in self.roots if root.exists()]
+        if len(existing) != len(self.roots):
+            # Cannot watch a folder that is not there yet; poll until it is
+            return None
+        try:
+            observer = Observer()
+            handler = _InvalidateOnChange(self, self.watched_names)
+            for root in existing:
+                observer.schedule(handler, str(root), recursive=True)
+            observer.daemon = True
+            observer.start()
+            logger.info(f"👀 Watching {', '.join(map(str, existing))} for new projects")
+            return observer
+        except OSError as e:
+            logger.warning(f"File watching unavailable ({e}); rescanning every {self.poll_seconds:g}s")
+            return None
+
+    def invalidate(self):
+        self._dirty = True
+
+    def projects(self) -> list:
+        with self._lock:
+            if self._observer is None and time.monotonic() - self._scanned_at >= self.poll_seconds:
+                self._dirty = True
+                if self.watch and Observer is not None:
+                    self._observer = self._start_observer()  # Roots may exist by now
+            if self._dirty or self._projects is None:
+                # Clear first: events arriving during the scan trigger another one
+                self._dirty = False
+                self._projects = self._scan()
+                self._scanned_at = time.monotonic()
+            return self._projects
+
+    def stop(self):
+        self.watch = False  # Polling from now on: projects() must not start a new observer
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=2)
+            self._observer = None
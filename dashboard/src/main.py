@@ -1,6 +1,7 @@
 import streamlit as st
 import sys
 import os
+from pathlib import Path
 
 # Ensure Python path includes 'src'
 sys.path.append(os.path.dirname(__file__))
@@ -8,8 +9,16 @@ sys.path.append(os.path.dirname(__file__))
 from core.context import TwinContext
 from services.asset_server import BackgroundAssetServer
 from services.data_loader import DataLoader
-from components.viewer import render_viewer
-from components.telemetry import render_metrics # (Implementation implied - simple charts)
+from components.viewer import render_viewer, last_clicked_machine
+from components.video import render_flythrough
+from components.telemetry import render_fleet_overview, render_metrics
+from services.telemetry_sim import TelemetrySimulator
+from services.shared_state import ProjectState, current_session_id, registry
+from services.telemetry_store import TelemetryQuery
+from services.telemetry_ingest import STORE_ROOT as TELEMETRY_STORE
+
+# sim = built-in simulator | ingest = data posted to services/telemetry_ingest.py
+TELEMETRY_SOURCE = os.getenv("TELEMETRY_SOURCE", "sim")
 
 # Page Config
 st.set_page_config(layout="wide", page_title="Factory Twin 5.0", page_icon="🏭")
@@ -35,16 +44,24 @@ def main():
         format_func=lambda p: p.name
     )
 
-    # 4. Load Data
-    contract = DataLoader.load_contract(selected_proj.contract_path)
-    camera_map = DataLoader.load_camera_map(selected_proj.camera_map_path)
-    
-    machines = contract.get('machines', [])
+    # 4. Load Data (process-wide: every session viewing this facility shares it)
+    project = registry.acquire(selected_proj, current_session_id(), make_telemetry)
+    camera_map, telemetry = project.camera_map, project.telemetry
+
+    machines = project.machines
     machine_names = [m['name'] for m in machines]
     
+    # 4b. Flythrough video (rendered in the background by the Builder)
+    video_status = DataLoader.load_video_status(selected_proj.video_status_path)
+    if video_status:
+        render_video_status(video_status)
+
     # 5. Selection Control
     st.sidebar.markdown("---")
-    selected_machine = st.sidebar.selectbox("Inspect Machine", ["Overview"] + machine_names)
+    sync_clicked_machine(machines)
+    if st.session_state.get("inspect_machine") not in machine_names:
+        st.session_state["inspect_machine"] = "Overview"  # Other facility selected
+    selected_machine = st.sidebar.selectbox("Inspect Machine", ["Overview"] + machine_names, key="inspect_machine")
     
     # Determine ID for camera snap
     target_id = None
@@ -59,25 +76,68 @@ def main():
     
     with col_view:
         # Construct Asset URL
-        # "scene/factory_complete.glb" is strictly relative to factory_builder/data/<proj>/
-        model_url = BackgroundAssetServer.get_url(selected_proj.name, "scene/factory_complete.glb")
+        # "scene/factory_complete[.meshopt].glb" is strictly relative to factory_builder/data/<proj>/
+        model_url = BackgroundAssetServer.get_url(selected_proj.name, selected_proj.served_scene())
+        # Per-machine chunks written by the Builder next to the scene
+        manifest_url = BackgroundAssetServer.get_url(selected_proj.name, "scene/chunks/manifest.json")
         
         st.caption(f"Live View: {selected_proj.name}")
-        render_viewer(model_url, camera_map, target_id)
+        render_viewer(model_url, camera_map, target_id, manifest_url=manifest_url)
+
+        if video_status.get("stream"):
+            with st.expander("🎬 Flythrough", expanded=video_status.get("state") == "rendering"):
+                render_flythrough(BackgroundAssetServer.get_url(selected_proj.name, video_status["stream"]))
 
     with col_data:
         st.subheader("Telemetry")
         if selected_machine != "Overview":
             # Show specific data
-            telemetry = DataLoader.generate_telemetry(machines).get(target_id, {})
             st.info(f"Machine: {selected_machine}")
-            st.metric("Status", telemetry.get("status", "N/A"))
-            st.metric("Temperature", f"{telemetry.get('temperature')} °C")
-            st.metric("Efficiency", f"{telemetry.get('efficiency')} %")
+            preview = DataLoader.load_preview_manifest(selected_proj.previews_dir).get(target_id)
+            if preview:
+                st.image(str(selected_proj.previews_dir / preview["thumbnail"]), use_container_width=True)
+                if preview.get("orbit"):
+                    st.video(str(selected_proj.previews_dir / preview["orbit"]), loop=True, autoplay=True, muted=True)
+            render_metrics(telemetry, target_id)
         else:
-            # Aggregate data
-            st.metric("Active Machines", len(machines))
-            st.metric("Overall Health", "98.2%")
+            # Aggregate data (maintained incrementally by the telemetry tick)
+            render_fleet_overview(telemetry)
+
+def make_telemetry(project: ProjectState):
+    """Live telemetry: ingested sensor data, or one background simulator per facility."""
+    if TELEMETRY_SOURCE == "ingest":
+        return TelemetryQuery(Path(TELEMETRY_STORE), [m.get('id', m.get('name')) for m in project.machines], project.lines)
+    return TelemetrySimulator.for_project(
+        project.ref.name, [m.get('id', m.get('name')) for m in project.machines], project.lines
+    )
+
+def sync_clicked_machine(machines: list):
+    """A machine clicked in the 3D view becomes the "Inspect Machine" selection (before the selectbox is drawn)."""
+    clicked = last_clicked_machine()
+    if not clicked or clicked.get("nonce") == st.session_state.get("handled_click"):
+        return
+    st.session_state["handled_click"] = clicked.get("nonce")
+    machine = next((m for m in machines if m.get('id', m.get('name')) == clicked.get("machine_id")), None)
+    if machine:
+        st.session_state["inspect_machine"] = machine['name']
+
+def render_video_status(status: dict):
+    state = status.get("state", "unknown")
+    st.sidebar.markdown("---")
+    st.sidebar.caption("🎬 Flythrough Video")
+    if state == "rendering":
+        eta = status.get("eta_seconds")
+        eta_text = f" · ETA {int(eta // 60)}m {int(eta % 60):02d}s" if eta is not None else ""
+        st.sidebar.progress(
+            min(1.0, status.get("percent", 0.0) / 100.0),
+            text=f"{status.get('frames_done', 0)}/{status.get('frames_total', '?')} frames{eta_text}",
+        )
+    elif state == "done":
+        st.sidebar.success("Video ready")
+    elif state == "failed":
+        st.sidebar.error("Video render failed")
+    else:
+        st.sidebar.info(f"Video: {state}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,26 +1,243 @@
 import http.server
-import socketserver
-import threading
+import mimetypes
 import os
-from pathlib import Path
+import threading
+import urllib.parse
+from functools import partial
+from typing import Optional, Tuple
 from loguru import logger
 
+from services.vendor_assets import PACKAGES
+
 PORT = 8000
 # We serve the builder's data folder directly
 ROOT_DIR = "/app/factory_builder/data"
+# Versioned viewer JS + decoders (services/vendor_assets.py), served under /vendor/
+VENDOR_DIR = os.getenv("VENDOR_DIR", "/app/vendor")
+VENDOR_PREFIX = "/vendor/"
+# Packages not vendored yet (no pinned sha512) are redirected here, at the exact pinned version
+VENDOR_CDN = os.getenv("VENDOR_CDN", "https://unpkg.com").rstrip("/")
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# Precompressed sidecars written by the Builder (factory_builder/services/precompress.py)
+SIDECARS = (("br", ".br"), ("gzip", ".gz"))
+
+mimetypes.add_type("model/gltf-binary", ".glb")
+mimetypes.add_type("model/gltf+json", ".gltf")
+mimetypes.add_type("image/ktx2", ".ktx2")
+mimetypes.add_type("application/vnd.apple.mpegurl", ".m3u8")
+mimetypes.add_type("video/mp2t", ".ts")
+mimetypes.add_type("text/javascript", ".js")  # Module scripts are rejected with a non-JS type
+mimetypes.add_type("application/wasm", ".wasm")  # Required by WebAssembly.instantiateStreaming
+
+
+def make_etag(st: os.stat_result, encoding: str = "") -> str:
+    """Strong validator: changes whenever the file is replaced (size / mtime / inode)."""
+    suffix = f"-{encoding}" if encoding else ""
+    return f'"{st.st_ino:x}-{st.st_size:x}-{st.st_mtime_ns:x}{suffix}"'
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Single byte range -> (start, end) inclusive. None = serve the whole file
+    (absent, malformed or multi-range). Raises ValueError if unsatisfiable.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start_s, sep, end_s = header[len("bytes="):].strip().partition("-")
+    if not sep or (start_s and not start_s.isdigit()) or (end_s and not end_s.isdigit()) or not (start_s or end_s):
+        return None  # Malformed: ignored, per RFC 9110
+
+    if size == 0:
+        raise ValueError("Range on an empty file")
+    if not start_s:
+        length = int(end_s)  # Suffix range: last N bytes
+        if length == 0:
+            raise ValueError("Empty suffix range")
+        return max(0, size - length), size - 1
+
+    start = int(start_s)
+    end = int(end_s) if end_s else size - 1
+    if start >= size or end < start:
+        raise ValueError("Range not satisfiable")
+    return start, min(end, size - 1)
 
-class CORSRequestHandler(http.server.SimpleHTTPRequestHandler):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, directory=ROOT_DIR, **kwargs)
+
+class AssetRequestHandler(http.server.BaseHTTPRequestHandler):
+    """
+    GET/HEAD for static scene assets:
+    - strong ETag + If-None-Match (304), Last-Modified
+    - single-range requests (206 / 416), with If-Range
+    - br / gzip sidecars chosen by Accept-Encoding (full responses only)
+    - body sent with socket.sendfile (zero-copy where the OS supports it)
+    - /vendor/... from the vendor directory, cached as immutable (versioned paths);
+      a package that was not vendored redirects to VENDOR_CDN at the same version
+    """
+    protocol_version = "HTTP/1.1"  # Keep-alive; every response has a Content-Length
+
+    def __init__(self, *args, directory: str = ROOT_DIR, vendor_dir: Optional[str] = VENDOR_DIR, **kwargs):
+        self.root = os.path.realpath(directory)
+        self.vendor_root = os.path.realpath(vendor_dir) if vendor_dir else None
+        super().__init__(*args, **kwargs)
 
     def end_headers(self):
         self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Expose-Headers', 'ETag, Content-Length, Content-Range, Accept-Ranges')
         super().end_headers()
-    
+
     def log_message(self, format, *args):
         # Silence default logs to keep console clean
         pass
 
+    def do_OPTIONS(self):
+        self.send_response(204)
+        self.send_header('Access-Control-Allow-Methods', 'GET, HEAD, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Range, If-None-Match, If-Range')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def _resolve(self) -> Tuple[Optional[str], bool]:
+        """(filesystem path, immutable) for the request; path is None if outside the root / not a file."""
+        url_path = urllib.parse.unquote(urllib.parse.urlsplit(self.path).path)
+        root, immutable = self.root, False
+        if self.vendor_root and url_path.startswith(VENDOR_PREFIX):
+            root, immutable = self.vendor_root, True
+            url_path = url_path[len(VENDOR_PREFIX):]
+        path = os.path.realpath(os.path.join(root, url_path.lstrip("/")))
+        if path != root and not path.startswith(root + os.sep):
+            return None, immutable
+        return (path if os.path.isfile(path) else None), immutable
+
+    def _cdn_fallback(self) -> Optional[str]:
+        """VENDOR_CDN URL for /vendor/<package>@<version>/... when that package is not vendored, else None."""
+        url_path = urllib.parse.unquote(urllib.parse.urlsplit(self.path).path)
+        if not VENDOR_CDN or not url_path.startswith(VENDOR_PREFIX):
+            return None
+        spec, _, rest = url_path[len(VENDOR_PREFIX):].partition("/")
+        if spec.startswith("@"):  # Scoped: @scope/name@version/...
+            name_part, _, rest = rest.partition("/")
+            spec = f"{spec}/{name_part}"
+        name, _, version = spec.rpartition("@")
+        if not rest or ".." in rest.split("/") or PACKAGES.get(name, (None,))[0] != version:
+            return None
+        if self.vendor_root and os.path.exists(os.path.join(self.vendor_root, spec, ".complete")):
+            return None
+        return f"{VENDOR_CDN}/{spec}/{rest}"
+
+    def _negotiate(self, path: str, st: os.stat_result):
+        """Best precompressed sidecar the client accepts (only if newer than the source)."""
+        accepted = {token.split(";")[0].strip() for token in self.headers.get("Accept-Encoding", "").split(",")}
+        for encoding, ext in SIDECARS:
+            if encoding not in accepted:
+                continue
+            try:
+                side_st = os.stat(path + ext)
+            except OSError:
+                continue
+            if side_st.st_mtime_ns >= st.st_mtime_ns:
+                return encoding, path + ext, side_st
+        return "", path, st
+
+    def _send_error(self, code: int, extra_headers: dict = None):
+        self.send_response(code)
+        for key, value in (extra_headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _serve(self, send_body: bool):
+        path, immutable = self._resolve()
+        if path is None:
+            fallback = self._cdn_fallback()
+            if fallback:
+                # Not cached: once the package is vendored the same URL is served locally
+                self._send_error(302, {"Location": fallback, "Cache-Control": "no-cache"})
+            else:
+                self._send_error(404)
+            return
+        st = os.stat(path)
+        has_sidecars = any(os.path.exists(path + ext) for _, ext in SIDECARS)
+
+        range_header = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        if range_header and if_range and if_range != make_etag(st):
+            range_header = None  # Representation changed: send it all
+
+        # Ranges address the identity bytes; compression only for full responses
+        if range_header:
+            encoding, body_path = "", path
+        else:
+            encoding, body_path, _ = self._negotiate(path, st)
+
+        try:
+            f = open(body_path, "rb")
+        except OSError:
+            self._send_error(404)
+            return
+        with f:
+            # Stat the open descriptor: the Builder may os.replace the scene meanwhile
+            self._send_file(f, os.fstat(f.fileno()), encoding, range_header, has_sidecars, send_body, path, immutable)
+
+    def _send_file(self, f, body_st, encoding, range_header, has_sidecars, send_body, path, immutable=False):
+        etag = make_etag(body_st, encoding)
+        if etag in [t.strip() for t in self.headers.get("If-None-Match", "").split(",")]:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        size = body_st.st_size
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            self._send_error(416, {"Content-Range": f"bytes */{size}"})
+            return
+
+        offset, count = 0, size
+        if byte_range:
+            offset, count = byte_range[0], byte_range[1] - byte_range[0] + 1
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {byte_range[0]}-{byte_range[1]}/{size}")
+        else:
+            self.send_response(200)
+
+        self.send_header("Content-Type", mimetypes.guess_type(path)[0] or "application/octet-stream")
+        self.send_header("Content-Length", str(count))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", self.date_time_string(body_st.st_mtime))
+        # Scenes are rebuilt in place (always revalidate); vendored files never change
+        self.send_header("Cache-Control", IMMUTABLE if immutable else "no-cache")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        if has_sidecars:
+            self.send_header("Vary", "Accept-Encoding")
+        self.end_headers()
+
+        if not send_body or count == 0:
+            return
+        try:
+            self.connection.sendfile(f, offset, count)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client went away mid-download
+
+
+class AssetHTTPServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True  # One thread per connection; never blocks interpreter exit
+    allow_reuse_address = True
+
+
+def create_server(root: str = ROOT_DIR, port: int = PORT, host: str = "", vendor_dir: Optional[str] = VENDOR_DIR) -> AssetHTTPServer:
+    return AssetHTTPServer((host, port), partial(AssetRequestHandler, directory=root, vendor_dir=vendor_dir))
+
+
 class BackgroundAssetServer:
     _instance = None
     _thread = None
@@ -34,13 +251,14 @@ class BackgroundAssetServer:
             logger.warning(f"Asset root {ROOT_DIR} does not exist yet.")
             return
 
-        handler = CORSRequestHandler
         try:
-            cls._instance = socketserver.TCPServer(("", PORT), handler)
+            cls._instance = create_server(ROOT_DIR, PORT)
             cls._thread = threading.Thread(target=cls._instance.serve_forever)
             cls._thread.daemon = True
             cls._thread.start()
             logger.info(f"🚀 Asset Server started on port {PORT} serving {ROOT_DIR}")
+            if not os.path.isdir(VENDOR_DIR):
+                logger.warning(f"Vendor dir {VENDOR_DIR} missing: viewer JS is redirected to {VENDOR_CDN or 'nowhere (VENDOR_CDN unset)'}.")
         except OSError:
             logger.warning(f"Asset server port {PORT} already in use. Assuming running.")
 
@@ -49,4 +267,4 @@ class BackgroundAssetServer:
         """Generates the localhost URL for the viewer"""
         # browser sees localhost:8000 mapped to container:8000
         # URL structure: http://localhost:8000/<project_name>/scene/factory_complete.glb
-        return f"http://localhost:8000/{project_name}/{relative_path}"
\ No newline at end of file
+        return f"http://localhost:8000/{project_name}/{relative_path}"
@@ -1,38 +1,38 @@
 import json
-import random
-import time
 from pathlib import Path
 
+from services.file_cache import file_cache
+
 class DataLoader:
+    """Reads the Builder's outputs through the process-wide mtime cache (results are shared: do not mutate)."""
+
     @staticmethod
     def load_contract(path: Path) -> dict:
-        with open(path, 'r') as f:
-            return json.load(f)
+        return file_cache.get_json(path)
 
     @staticmethod
     def load_camera_map(path: Path) -> dict:
-        if not path.exists():
+        try:
+            return file_cache.get_json(path)
+        except FileNotFoundError:
+            return {}
+
+    @staticmethod
+    def load_video_status(path: Path) -> dict:
+        """Render progress written by the Builder's video studio ({} if no video job)."""
+        if not path:
             return {}
-        with open(path, 'r') as f:
-            return json.load(f)
+        try:
+            return file_cache.get_json(path)
+        except (OSError, json.JSONDecodeError):
+            return {}  # No video job, or caught mid-write
 
     @staticmethod
-    def generate_telemetry(machines: list) -> dict:
-        """Simulates live data for the dashboard."""
-        data = {}
-        for m in machines:
-            # Deterministic ID check
-            m_id = m.get('id', m.get('name'))
-            
-            # Simulate status
-            status = "RUNNING" if random.random() > 0.1 else "IDLE"
-            if random.random() > 0.98: status = "MAINTENANCE"
-            
-            data[m_id] = {
-                "status": status,
-                "temperature": round(random.uniform(40, 85), 1),
-                "vibration": round(random.uniform(0.1, 2.5), 2),
-                "power": round(random.uniform(10, 50), 1),
-                "efficiency": int(random.uniform(70, 99))
-            }
-        return data
\ No newline at end of file
+    def load_preview_manifest(previews_dir: Path) -> dict:
+        """{machine_id: {"thumbnail": rel_path, "orbit": rel_path}} rendered by the Builder."""
+        if not previews_dir:
+            return {}
+        try:
+            return file_cache.get_json(previews_dir / "manifest.json").get("machines", {})
+        except (OSError, json.JSONDecodeError):
+            return {}  # No previews yet, or caught mid-write
@@ -0,0 +1,68 @@
+"""
+Process-wide cache for files read from the shared volume.
+
+Streamlit reruns the whole script on every widget interaction, once per
+session. Parsed files are kept here keyed on (path, mtime, size), so a rerun
+costs one stat() per file instead of a read + JSON parse, and every session
+shares the same copy. Cached values are shared: treat them as read-only.
+"""
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple
+
+Signature = Tuple[int, int]
+
+
+def file_signature(path: Path) -> Signature:
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+class FileCache:
+    def __init__(self):
+        self._entries: Dict[Tuple[str, str], Tuple[Signature, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: Path, parser: Callable[[Path], Any], tag: str = "") -> Any:
+        """
+        parser(path), reused while the file's mtime and size are unchanged.
+        Raises FileNotFoundError like open() would; parser errors are not cached.
+        """
+        key = (str(path), tag or getattr(parser, "__qualname__", repr(parser)))
+        signature = file_signature(path)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry and entry[0] == signature:
+            return entry[1]
+
+        value = parser(path)
+        # Keep the signature from *before* the read: a write racing the read
+        # leaves a newer mtime, so the next call re-reads instead of pinning it.
+        with self._lock:
+            self._entries[key] = (signature, value)
+        return value
+
+    def get_json(self, path: Path) -> Any:
+        return self.get(path, _read_json, tag="json")
+
+    def invalidate(self, path: Path = None):
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == str(path)]:
+                    del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _read_json(path: Path) -> Any:
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+# One per process: shared by every Streamlit session
+file_cache = FileCache()
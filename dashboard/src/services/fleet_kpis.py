@@ -0,0 +1,162 @@
+"""
+Fleet KPIs maintained incrementally as telemetry ticks arrive.
+
+Each tick adds one row of per-machine contributions (running flag,
+efficiency while running, per-line temperature min/max) to sliding-window
+ring buffers and subtracts the row that leaves the window, so the window
+sums are never rescanned (they are re-summed exactly once per window to
+cancel float drift). The result is a plain dict snapshot swapped in once
+per tick: the overview reads it in O(1), whatever the fleet size.
+
+KPIs (over the window):
+    availability  share of ticks a machine was RUNNING
+    performance   mean efficiency while running
+    OEE           availability x performance (no quality signal yet: quality = 100%)
+Lines follow the contract's flow order; a line's OEE is its bottleneck's.
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from services.telemetry_schema import MAINTENANCE, METRICS, RUNNING
+
+_TEMPERATURE = METRICS.index("temperature")
+_EFFICIENCY = METRICS.index("efficiency")
+
+
+def production_lines(contract: dict) -> List[List[str]]:
+    """
+    Machine ids grouped into lines, each in contract (flow) order. Lines are the
+    connected components of the contract's relationships; without relationships
+    the whole fleet is one line.
+    """
+    ids = [m.get("id", m.get("name")) for m in contract.get("machines", [])]
+    position = {m_id: i for i, m_id in enumerate(ids)}
+    parent = list(range(len(ids)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    links = contract.get("relationships") or []
+    for link in links:
+        a, b = position.get(link.get("from_id")), position.get(link.get("to_id"))
+        if a is not None and b is not None:
+            parent[find(a)] = find(b)
+    if not links:
+        return [ids] if ids else []
+
+    lines: Dict[int, List[str]] = {}
+    for i, m_id in enumerate(ids):
+        lines.setdefault(find(i), []).append(m_id)
+    return sorted(lines.values(), key=lambda line: position[line[0]])
+
+
+class FleetKPIs:
+    def __init__(self, machine_ids: List[str], lines: Optional[List[List[str]]], window_ticks: int):
+        self.machine_ids = list(machine_ids)
+        n = len(self.machine_ids)
+        lines = [line for line in (lines or [self.machine_ids]) if line]
+        index = {m_id: i for i, m_id in enumerate(self.machine_ids)}
+
+        # Machines missing from the lines get a line of their own at the end
+        assigned = {m_id for line in lines for m_id in line}
+        orphans = [m_id for m_id in self.machine_ids if m_id not in assigned]
+        self.lines = lines + ([orphans] if orphans else [])
+        self.line_of = np.zeros(n, dtype=np.int64)
+        self.station = np.zeros(n, dtype=np.int64)  # Position within its line (flow order)
+        for l, line in enumerate(self.lines):
+            for s, m_id in enumerate(line):
+                if m_id in index:
+                    self.line_of[index[m_id]] = l
+                    self.station[index[m_id]] = s
+        n_lines = len(self.lines)
+        self.line_sizes = np.bincount(self.line_of, minlength=n_lines)
+
+        self.window = window_ticks
+        self.ring_running = np.zeros((window_ticks, n), dtype=bool)
+        self.ring_efficiency = np.zeros((window_ticks, n), dtype=np.float32)
+        self.ring_line_tmin = np.full((window_ticks, n_lines), np.inf, dtype=np.float32)
+        self.ring_line_tmax = np.full((window_ticks, n_lines), -np.inf, dtype=np.float32)
+        self.sum_running = np.zeros(n, dtype=np.int64)
+        self.sum_efficiency = np.zeros(n, dtype=np.float64)
+        self.ticks = 0
+        self.snapshot: dict = {}
+
+    def update(self, status: np.ndarray, values: np.ndarray):
+        """Adds one tick of fleet state (status codes + METRICS columns) and republishes the snapshot."""
+        head = self.ticks % self.window
+        running = status == RUNNING
+        efficiency = np.where(running, values[:, _EFFICIENCY], 0).astype(np.float32)
+        temperature = values[:, _TEMPERATURE]
+
+        if self.ticks >= self.window:
+            self.sum_running -= self.ring_running[head]
+            self.sum_efficiency -= self.ring_efficiency[head]
+        self.ring_running[head] = running
+        self.ring_efficiency[head] = efficiency
+        self.sum_running += running
+        self.sum_efficiency += efficiency
+
+        n_lines = len(self.lines)
+        tmin = np.full(n_lines, np.inf, dtype=np.float32)
+        tmax = np.full(n_lines, -np.inf, dtype=np.float32)
+        np.minimum.at(tmin, self.line_of, temperature)
+        np.maximum.at(tmax, self.line_of, temperature)
+        self.ring_line_tmin[head] = tmin
+        self.ring_line_tmax[head] = tmax
+
+        self.ticks += 1
+        if self.ticks % self.window == 0:
+            # Exact re-sum once per window: incremental float sums never drift
+            self.sum_running = self.ring_running.sum(axis=0, dtype=np.int64)
+            self.sum_efficiency = self.ring_efficiency.sum(axis=0, dtype=np.float64)
+
+        self.snapshot = self._summarize(status, temperature)
+
+    def _summarize(self, status: np.ndarray, temperature: np.ndarray) -> dict:
+        filled = min(self.ticks, self.window)
+        availability = self.sum_running / filled
+        performance = self.sum_efficiency / np.maximum(self.sum_running, 1) / 100.0
+        oee = availability * performance
+
+        n_lines = len(self.lines)
+        sizes = np.maximum(self.line_sizes, 1)
+        line_availability = np.bincount(self.line_of, availability, n_lines) / sizes
+        line_temperature = np.bincount(self.line_of, temperature, n_lines) / sizes
+        line_maintenance = np.bincount(self.line_of, status == MAINTENANCE, n_lines)
+        window_tmin = self.ring_line_tmin[:filled].min(axis=0)
+        window_tmax = self.ring_line_tmax[:filled].max(axis=0)
+
+        # Serial line: throughput is capped by its weakest station (ties go upstream)
+        ordered = np.lexsort((self.station, oee, self.line_of))
+        firsts = ordered[np.r_[0, np.flatnonzero(np.diff(self.line_of[ordered])) + 1]] if len(ordered) else ordered
+
+        lines = []
+        for l, bottleneck in zip(self.line_of[firsts], firsts):
+            lines.append({
+                "machines": self.lines[l],
+                "oee": float(oee[bottleneck]),
+                "availability": float(line_availability[l]),
+                "bottleneck": self.machine_ids[bottleneck],
+                "mean_temperature": float(line_temperature[l]),
+                "window_min_temperature": float(window_tmin[l]),
+                "window_max_temperature": float(window_tmax[l]),
+                "in_maintenance": int(line_maintenance[l]),
+            })
+
+        running_ticks = int(self.sum_running.sum())
+        return {
+            "machines": len(self.machine_ids),
+            "running": int((status == RUNNING).sum()),
+            "in_maintenance": int((status == MAINTENANCE).sum()),
+            "availability": float(availability.mean()) if len(availability) else 0.0,
+            "performance": float(self.sum_efficiency.sum() / max(running_ticks, 1) / 100.0),
+            "oee": float(oee.mean()) if len(oee) else 0.0,
+            "mean_temperature": float(temperature.mean()) if len(temperature) else 0.0,
+            "window_max_temperature": float(window_tmax.max()) if n_lines else 0.0,
+            "window_ticks": filled,
+            "lines": lines,
+        }
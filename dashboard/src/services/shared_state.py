@@ -0,0 +1,136 @@
+"""
+Process-wide project state shared by every Streamlit session.
+
+A session acquires the ProjectState of the facility it shows; the registry
+counts which live sessions hold each project. The first session builds
+the state (parsed contract, camera map, production lines, telemetry);
+every other session reuses it, so memory and I/O grow with the number of
+facilities on screen, not with the number of viewers. A project nobody
+has held for SHARED_IDLE_SECONDS (or beyond SHARED_MAX_PROJECTS, least
+recently used first) is evicted: its simulator stops and its cached files
+are dropped.
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set
+
+from loguru import logger
+
+from core.context import ProjectReference
+from services.data_loader import DataLoader
+from services.file_cache import file_cache
+from services.fleet_kpis import production_lines
+from services.telemetry_sim import TelemetrySimulator
+
+IDLE_SECONDS = float(os.getenv("SHARED_IDLE_SECONDS", "300"))
+MAX_PROJECTS = int(os.getenv("SHARED_MAX_PROJECTS", "8"))
+SWEEP_SECONDS = 10.0
+
+
+@dataclass
+class ProjectState:
+    ref: ProjectReference
+    contract: dict = field(default_factory=dict)
+    camera_map: dict = field(default_factory=dict)
+    machines: List[dict] = field(default_factory=list)
+    lines: List[List[str]] = field(default_factory=list)
+    telemetry: Optional[object] = None
+
+    def refresh(self, telemetry_factory: Callable[["ProjectState"], object]):
+        """Re-reads inputs through the mtime cache (one stat each when unchanged)."""
+        contract = DataLoader.load_contract(self.ref.contract_path)
+        self.camera_map = DataLoader.load_camera_map(self.ref.camera_map_path)
+        if contract is not self.contract:  # New parse = the file changed
+            self.contract = contract
+            self.machines = contract.get('machines', [])
+            self.lines = production_lines(contract)
+            self.telemetry = telemetry_factory(self)
+        return self
+
+    def close(self):
+        if isinstance(self.telemetry, TelemetrySimulator):
+            TelemetrySimulator.release_project(self.ref.name)
+        for path in (self.ref.contract_path, self.ref.camera_map_path):
+            file_cache.invalidate(path)
+
+
+@dataclass
+class _Entry:
+    state: ProjectState
+    sessions: Set[str] = field(default_factory=set)
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class SharedRegistry:
+    def __init__(self, is_session_alive: Callable[[str], bool], idle_seconds: float = IDLE_SECONDS, max_projects: int = MAX_PROJECTS):
+        self.is_session_alive = is_session_alive
+        self.idle_seconds = idle_seconds
+        self.max_projects = max_projects
+        self._entries: Dict[str, _Entry] = {}
+        self._held: Dict[str, str] = {}  # session -> project it currently holds
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+
+    def acquire(self, ref: ProjectReference, session_id: str, telemetry_factory: Callable[[ProjectState], object]) -> ProjectState:
+        """The shared state of `ref`, held by `session_id` until it switches project or disconnects."""
+        with self._lock:
+            previous = self._held.get(session_id)
+            if previous and previous != ref.name and previous in self._entries:
+                self._entries[previous].sessions.discard(session_id)
+            self._held[session_id] = ref.name
+
+            entry = self._entries.get(ref.name)
+            if entry is None or entry.state.ref != ref:
+                if entry is not None:
+                    entry.state.close()
+                entry = self._entries[ref.name] = _Entry(ProjectState(ref))
+            entry.sessions.add(session_id)
+            entry.last_used = time.monotonic()
+            # Serialized with acquire: two sessions opening a project build it once
+            state = entry.state.refresh(telemetry_factory)
+
+            if entry.last_used - self._last_sweep >= SWEEP_SECONDS:
+                self._sweep(entry.last_used)
+        return state
+
+    def _sweep(self, now: float):
+        self._last_sweep = now
+        for session_id in [s for s in self._held if not self.is_session_alive(s)]:
+            project = self._held.pop(session_id)
+            if project in self._entries:
+                self._entries[project].sessions.discard(session_id)
+
+        idle = [name for name, e in self._entries.items() if not e.sessions]
+        expired = [name for name in idle if now - self._entries[name].last_used >= self.idle_seconds]
+        overflow = len(self._entries) - len(expired) - self.max_projects
+        if overflow > 0:
+            survivors = sorted((n for n in idle if n not in expired), key=lambda n: self._entries[n].last_used)
+            expired += survivors[:overflow]
+        for name in expired:
+            self._entries.pop(name).state.close()
+            logger.info(f"🧹 Evicted shared state of {name} (no active sessions)")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {name: len(e.sessions) for name, e in self._entries.items()}
+
+
+def current_session_id() -> str:
+    """Streamlit session of the running script ("local" outside a Streamlit run)."""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else "local"
+
+
+def _streamlit_session_alive(session_id: str) -> bool:
+    # Imported lazily: the registry itself does not depend on Streamlit
+    from streamlit import runtime
+    if not runtime.exists():
+        return True  # Cannot tell (e.g. AppTest): keep the hold
+    return runtime.get_instance().is_active_session(session_id)
+
+
+# One per process: shared by every Streamlit session
+registry = SharedRegistry(_streamlit_session_alive)
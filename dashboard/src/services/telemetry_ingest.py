@@ -0,0 +1,186 @@
+"""
+Local telemetry ingestion service (runs next to the Twin).
+
+    POST /ingest   {"points": [[ts, machine_id, metric, value], ...]}  -> 204
+    UDP datagram   same JSON body (one batch per datagram, no reply)
+    GET  /query?machine=M1&metric=temperature&start=..&end=..&resolution=1m
+    GET  /health   {"points_total": ..., "series": ...}
+
+Batches go straight into TelemetryStore; a timer closes finished rollup
+buckets every second even when no data is arriving.
+
+Run from dashboard/src:  python -m services.telemetry_ingest
+"""
+import argparse
+import http.server
+import json
+import os
+import signal
+import socketserver
+import threading
+import time
+import urllib.parse
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+from loguru import logger
+
+from services.telemetry_store import TelemetryQuery, TelemetryStore
+
+STORE_ROOT = os.getenv("TELEMETRY_STORE", "/app/shared_data/.telemetry")
+HTTP_PORT = int(os.getenv("TELEMETRY_HTTP_PORT", "8600"))
+UDP_PORT = int(os.getenv("TELEMETRY_UDP_PORT", "8601"))
+MAX_BODY = 64 << 20
+
+
+def _decode(body: bytes) -> list:
+    payload = json.loads(body)
+    points = payload.get("points") if isinstance(payload, dict) else None
+    if not isinstance(points, list):
+        raise ValueError('Expected {"points": [[ts, machine_id, metric, value], ...]}')
+    return points
+
+
+class IngestHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive: load generators and gateways reuse the connection
+
+    def __init__(self, *args, store: TelemetryStore, query: TelemetryQuery, **kwargs):
+        self.store = store
+        self.query_api = query
+        super().__init__(*args, **kwargs)
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, code: int, payload=None):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.send_response(code)
+        if body:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if urllib.parse.urlsplit(self.path).path != "/ingest":
+            self._reply(404)
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        if length > MAX_BODY:
+            self._reply(413)
+            self.close_connection = True
+            return
+        try:
+            self.store.append_points(_decode(self.rfile.read(length)))
+        except (ValueError, TypeError, IndexError) as e:
+            self._reply(400, {"error": str(e)})
+            return
+        self._reply(204)
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        if url.path == "/health":
+            self._reply(200, {"points_total": self.store.points_total, "series": len(self.store.series)})
+            return
+        if url.path != "/query":
+            self._reply(404)
+            return
+
+        params = dict(urllib.parse.parse_qsl(url.query))
+        try:
+            end = float(params.get("end", time.time()))
+            start = float(params.get("start", end - 3600))
+            result = self.query_api.query(params["machine"], params["metric"], start, end, params.get("resolution", "1m"))
+        except (KeyError, ValueError) as e:
+            self._reply(400, {"error": f"Bad query: {e}"})
+            return
+        self._reply(200, {name: np.asarray(values).tolist() for name, values in result.items()})
+
+
+class IngestHTTPServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class UDPIngestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        data, _sock = self.request
+        try:
+            self.server.store.append_points(_decode(data))
+        except (ValueError, TypeError, IndexError):
+            self.server.dropped += 1  # Fire-and-forget: nobody to tell
+
+
+class UDPIngestServer(socketserver.UDPServer):
+    max_packet_size = 65507
+    allow_reuse_address = True
+
+    def __init__(self, address, store: TelemetryStore):
+        super().__init__(address, UDPIngestHandler)
+        self.store = store
+        self.dropped = 0
+
+
+class IngestService:
+    def __init__(self, root: Path = STORE_ROOT, host: str = "", http_port: int = HTTP_PORT, udp_port: int = UDP_PORT):
+        self.store = TelemetryStore(Path(root))
+        handler = partial(IngestHandler, store=self.store, query=TelemetryQuery(Path(root)))
+        self.http = IngestHTTPServer((host, http_port), handler)
+        self.udp = UDPIngestServer((host, udp_port), self.store) if udp_port is not None and udp_port >= 0 else None
+        self._stop = threading.Event()
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.store.flush_seconds):
+            self.store.flush()
+
+    def serve_forever(self):
+        threading.Thread(target=self._flush_loop, name="telemetry-flush", daemon=True).start()
+        if self.udp:
+            threading.Thread(target=self.udp.serve_forever, name="telemetry-udp", daemon=True).start()
+        logger.info(
+            f"📥 Telemetry ingest on http://{self.http.server_address[0] or '0.0.0.0'}:{self.http.server_address[1]}"
+            + (f" and udp:{self.udp.server_address[1]}" if self.udp else "")
+            + f" -> {self.store.root}"
+        )
+        try:
+            self.http.serve_forever()
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        if self.udp:
+            self.udp.shutdown()
+            self.udp.server_close()
+        self.http.server_close()
+        self.store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Twin telemetry ingestion service")
+    parser.add_argument("--root", default=STORE_ROOT)
+    parser.add_argument("--host", default="")
+    parser.add_argument("--http-port", type=int, default=HTTP_PORT)
+    parser.add_argument("--udp-port", type=int, default=UDP_PORT, help="-1 disables UDP")
+    args = parser.parse_args()
+
+    service = IngestService(args.root, args.host, args.http_port, args.udp_port)
+
+    def _terminate(signum, frame):
+        # docker stop: unwind serve_forever so open rollup buckets are written
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, _terminate)
+    try:
+        service.serve_forever()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
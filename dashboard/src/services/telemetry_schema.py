@@ -0,0 +1,7 @@
+"""Status codes and metric columns shared by the telemetry simulator, store and KPIs."""
+import numpy as np
+
+RUNNING, IDLE, MAINTENANCE = 0, 1, 2
+STATUS_NAMES = np.array(["RUNNING", "IDLE", "MAINTENANCE"])
+
+METRICS = ("temperature", "vibration", "power", "efficiency")
@@ -0,0 +1,196 @@
+"""
+Background telemetry simulator for the Twin.
+
+All machines of a project live in one set of NumPy arrays that a daemon
+thread advances at a fixed tick: status is a Markov chain, the analog
+signals mean-revert towards per-status targets with noise, so values are
+coherent over time. Every tick is written as one row of fixed-size ring
+buffers (history x machines), so reads never depend on how often Streamlit
+reruns: the latest sample is an index lookup and a window is one slice.
+
+One simulator per project is shared by every session (TelemetrySimulator.for_project).
+Each tick also feeds the project's FleetKPIs (services/fleet_kpis.py).
+"""
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+from loguru import logger
+
+from services.fleet_kpis import FleetKPIs
+from services.telemetry_schema import IDLE, MAINTENANCE, METRICS, RUNNING, STATUS_NAMES
+
+TICK_SECONDS = float(os.getenv("TELEMETRY_TICK_SECONDS", "1"))
+# Ring buffer memory (samples + KPI window): history x machines x 22 bytes (~66 MB for 10k machines at 300)
+HISTORY_TICKS = int(os.getenv("TELEMETRY_HISTORY", "300"))  # 5 min at 1 Hz
+
+_DECIMALS = (1, 2, 1, 0)
+
+# Per-status targets, rows = status, columns = METRICS
+_TARGETS = np.array([
+    [70.0, 1.20, 35.0, 90.0],   # RUNNING
+    [45.0, 0.30, 12.0, 0.0],    # IDLE
+    [30.0, 0.05, 2.0, 0.0],     # MAINTENANCE
+], dtype=np.float32)
+_NOISE = np.array([0.6, 0.08, 1.2, 0.8], dtype=np.float32)
+_REVERSION = np.float32(0.1)  # Fraction of the gap to the target closed per tick
+_LIMITS = np.array([[15.0, 0.0, 0.0, 0.0], [95.0, 3.0, 60.0, 100.0]], dtype=np.float32)
+
+# Status transition probabilities per tick, rows = from, columns = to
+_TRANSITIONS = np.array([
+    [0.9895, 0.0100, 0.0005],
+    [0.1000, 0.9000, 0.0000],
+    [0.0200, 0.0000, 0.9800],
+], dtype=np.float64)
+_CUMULATIVE = np.cumsum(_TRANSITIONS, axis=1)
+
+
+class TelemetrySimulator:
+    _projects: Dict[str, "TelemetrySimulator"] = {}
+    _projects_lock = threading.Lock()
+
+    def __init__(
+        self,
+        machine_ids: List[str],
+        history: int = HISTORY_TICKS,
+        tick_seconds: float = TICK_SECONDS,
+        seed: Optional[int] = None,
+        lines: Optional[List[List[str]]] = None,
+    ):
+        self.machine_ids = list(machine_ids)
+        self.index = {m_id: i for i, m_id in enumerate(self.machine_ids)}
+        self.history = history
+        self.tick_seconds = tick_seconds
+        self.rng = np.random.default_rng(seed)
+
+        n = len(self.machine_ids)
+        self.status = np.where(self.rng.random(n) < 0.9, RUNNING, IDLE).astype(np.int8)
+        # Each machine has its own operating point around the status target
+        self.offsets = (self.rng.standard_normal((n, len(METRICS))) * _NOISE * 4).astype(np.float32)
+        self.values = np.clip(_TARGETS[self.status] + self.offsets, _LIMITS[0], _LIMITS[1])
+
+        # Ring buffers: one row per tick (a tick is a single contiguous write)
+        self.samples = np.zeros((history, n, len(METRICS)), dtype=np.float32)
+        self.statuses = np.zeros((history, n), dtype=np.int8)
+        self.timestamps = np.zeros(history, dtype=np.float64)
+        self.ticks = 0
+        self.last_step_seconds = 0.0
+
+        self.kpis = FleetKPIs(self.machine_ids, lines, history)
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._record(time.time())
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    @classmethod
+    def for_project(cls, project: str, machine_ids: List[str], lines: Optional[List[List[str]]] = None) -> "TelemetrySimulator":
+        """The running simulator of a project; restarted if its machines or lines changed."""
+        with cls._projects_lock:
+            sim = cls._projects.get(project)
+            if sim is None or sim.machine_ids != list(machine_ids) or (lines is not None and sim.kpis.lines != lines):
+                if sim is not None:
+                    sim.stop()
+                sim = cls(machine_ids, lines=lines)
+                sim.start()
+                cls._projects[project] = sim
+                logger.info(f"📡 Telemetry simulator started for {project}: {len(machine_ids)} machines @ {1 / sim.tick_seconds:g} Hz")
+            return sim
+
+    @classmethod
+    def release_project(cls, project: str):
+        """Stops and forgets a project's simulator (shared state eviction)."""
+        with cls._projects_lock:
+            sim = cls._projects.pop(project, None)
+        if sim is not None:
+            sim.stop()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="telemetry-sim", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2 * self.tick_seconds)
+            self._thread = None
+
+    def _run(self):
+        next_tick = time.monotonic() + self.tick_seconds
+        while not self._stop.wait(max(0.0, next_tick - time.monotonic())):
+            self.step()
+            # Fixed rate: a slow tick is not followed by a burst of catch-up ticks
+            next_tick = max(next_tick + self.tick_seconds, time.monotonic())
+
+    # ------------------------------------------------------------------
+    # Simulation
+    # ------------------------------------------------------------------
+    def step(self, now: Optional[float] = None):
+        """Advances every machine by one tick (vectorized over machines)."""
+        started = time.perf_counter()
+        n = len(self.machine_ids)
+
+        # Status: inverse-CDF sampling of each machine's transition row
+        draws = self.rng.random(n)[:, None]
+        status = np.minimum((draws > _CUMULATIVE[self.status]).sum(axis=1), MAINTENANCE).astype(np.int8)
+
+        # Signals: mean reversion towards the status target + Gaussian noise
+        targets = _TARGETS[status] + np.where(status[:, None] == RUNNING, self.offsets, 0)
+        noise = self.rng.standard_normal((n, len(METRICS)), dtype=np.float32) * _NOISE
+        values = self.values + _REVERSION * (targets - self.values) + noise
+        np.clip(values, _LIMITS[0], _LIMITS[1], out=values)
+
+        with self._lock:
+            self.status, self.values = status, values
+            self._record(time.time() if now is None else now)
+        self.last_step_seconds = time.perf_counter() - started
+
+    def _record(self, now: float):
+        head = self.ticks % self.history
+        self.samples[head] = self.values
+        self.statuses[head] = self.status
+        self.timestamps[head] = now
+        self.ticks += 1
+        self.kpis.update(self.status, self.values)
+
+    # ------------------------------------------------------------------
+    # Reads (cost independent of fleet size)
+    # ------------------------------------------------------------------
+    def fleet_kpis(self) -> dict:
+        """Precomputed fleet / line KPIs of the last tick."""
+        return self.kpis.snapshot
+
+    def latest(self, machine_id: str) -> dict:
+        """Current values of one machine, {} if unknown."""
+        i = self.index.get(machine_id)
+        if i is None:
+            return {}
+        with self._lock:
+            values, status = self.values[i].copy(), int(self.status[i])
+        data = {"status": str(STATUS_NAMES[status])}
+        for name, value, decimals in zip(METRICS, values, _DECIMALS):
+            data[name] = round(float(value), decimals) if decimals else int(round(float(value)))
+        return data
+
+    def window(self, machine_id: str, seconds: float) -> dict:
+        """History of one machine over the last `seconds`, oldest first: {"timestamp": ..., <metric>: ...}."""
+        i = self.index.get(machine_id)
+        if i is None:
+            return {}
+        count = int(min(max(1, round(seconds / self.tick_seconds)), self.history))
+        with self._lock:
+            count = min(count, self.ticks)
+            rows = (np.arange(self.ticks - count, self.ticks) % self.history)
+            samples = self.samples[rows, i]
+            statuses = self.statuses[rows, i]
+            timestamps = self.timestamps[rows]
+        data = {"timestamp": timestamps, "status": STATUS_NAMES[statuses]}
+        for k, name in enumerate(METRICS):
+            data[name] = samples[:, k]
+        return data
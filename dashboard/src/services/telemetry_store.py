@@ -0,0 +1,492 @@
+"""
+Append-only columnar telemetry store with 1s / 1m / 1h rollups.
+
+Layout under the store root (one directory per UTC hour and kind):
+
+    series.json                          "<machine>\\t<metric>" -> series id
+    raw/20250101T13/ts.f64 series.u32 value.f32
+    rollup_1s/20250101T13/bucket.i64 series.u32 count.u32 sum.f64 min.f32 max.f32
+    rollup_1m/...   rollup_1h/...
+
+Every column is a flat little-endian array appended with one write per batch,
+so ingest cost is a few vectorized NumPy ops plus sequential I/O. Readers
+memory-map the columns; a partially written tail (crash mid-append) is
+ignored by trimming every column to the shortest one, and the writer cuts
+the files to that length when it reopens a partition, so later appends stay
+aligned across columns.
+
+Rollup rows are written in runs sorted by (bucket, series); index.i64 lists
+each run as (bucket, first row, rows). A query reads the index, keeps the
+runs of the buckets it needs and binary-searches its series inside each,
+so chart queries cost O(buckets x log(series)), whatever the fleet size.
+
+Rollup buckets stay in memory until they close (GRACE_SECONDS after the
+newest sample or the wall clock passes their end) and are then appended.
+Late samples for a closed bucket append a second row for it; queries merge
+rows of the same bucket, so nothing is ever rewritten.
+
+TelemetryQuery.fleet_kpis() replays the 1s rollups (status + METRICS of every
+machine) into a FleetKPIs, one tick per second, so the fleet overview works
+with ingested data as it does with the simulator.
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.file_cache import file_cache
+from services.fleet_kpis import FleetKPIs
+from services.telemetry_schema import IDLE, METRICS, STATUS_NAMES
+
+PARTITION_SECONDS = 3600
+GRACE_SECONDS = 2.0
+RESOLUTIONS = {"1s": 1, "1m": 60, "1h": 3600}
+SERIES_FILE = "series.json"
+INDEX_FILE = "index.i64"  # Rollups: (bucket, first row, rows) per sorted run
+MAX_OPEN_PARTITIONS = 16
+KPI_WINDOW_SECONDS = int(os.getenv("TELEMETRY_HISTORY", "300"))  # Same window as the simulator's KPIs
+
+RAW_COLUMNS = (("ts", np.float64), ("series", np.uint32), ("value", np.float32))
+ROLLUP_COLUMNS = (
+    ("bucket", np.int64), ("series", np.uint32), ("count", np.uint32),
+    ("sum", np.float64), ("min", np.float32), ("max", np.float32),
+)
+_SUFFIX = {np.float64: "f64", np.float32: "f32", np.uint32: "u32", np.int64: "i64"}
+
+
+def partition_name(hour: int) -> str:
+    return time.strftime("%Y%m%dT%H", time.gmtime(hour * PARTITION_SECONDS))
+
+
+def series_key(machine_id: str, metric: str) -> str:
+    return f"{machine_id}\t{metric}"
+
+
+def combine(bucket, series, count, total, low, high):
+    """Merges rows with the same (bucket, series): counts and sums add, min/max reduce."""
+    if len(bucket) == 0:
+        return bucket, series, count, total, low, high
+    order = np.lexsort((series, bucket))
+    bucket, series = bucket[order], series[order]
+    starts = np.flatnonzero(np.r_[True, (bucket[1:] != bucket[:-1]) | (series[1:] != series[:-1])])
+    return (
+        bucket[starts],
+        series[starts],
+        np.add.reduceat(count[order], starts).astype(np.uint32),
+        np.add.reduceat(total[order], starts),
+        np.minimum.reduceat(low[order], starts),
+        np.maximum.reduceat(high[order], starts),
+    )
+
+
+def run_index(bucket: np.ndarray, series: np.ndarray, offset: int = 0) -> np.ndarray:
+    """(bucket, first row, rows) of every run of one bucket with increasing series."""
+    n = len(bucket)
+    if n == 0:
+        return np.empty((0, 3), np.int64)
+    breaks = np.r_[True, (bucket[1:] != bucket[:-1]) | (series[1:] <= series[:-1])]
+    starts = np.flatnonzero(breaks)
+    return np.column_stack([bucket[starts], starts + offset, np.diff(np.r_[starts, n])]).astype(np.int64)
+
+
+def _read_index(path: Path, rows: int) -> Optional[np.ndarray]:
+    """Complete index entries that only reference rows already on disk; None if there is no index."""
+    if not path.exists():
+        return None
+    entries = np.fromfile(path, dtype=np.int64)
+    entries = entries[: len(entries) // 3 * 3].reshape(-1, 3)
+    return entries[entries[:, 1] + entries[:, 2] <= rows]
+
+
+class _Partition:
+    """Open column files of one partition (plus the run index for rollups)."""
+    def __init__(self, directory: Path, columns, indexed: bool):
+        directory.mkdir(parents=True, exist_ok=True)
+        self.dtypes = [dtype for _, dtype in columns]
+        paths = [directory / f"{name}.{_SUFFIX[dtype]}" for name, dtype in columns]
+        sizes = [p.stat().st_size if p.exists() else 0 for p in paths]
+
+        # Torn append (crash between column writes): cut every column to the rows all of them have
+        self.rows = min(size // np.dtype(dtype).itemsize for size, dtype in zip(sizes, self.dtypes))
+        for path, size, dtype in zip(paths, sizes, self.dtypes):
+            if size != self.rows * np.dtype(dtype).itemsize:
+                os.truncate(path, self.rows * np.dtype(dtype).itemsize)
+        self.files = [open(p, "ab") for p in paths]
+
+        self.index = None
+        if indexed:
+            index_path = directory / INDEX_FILE
+            entries = _read_index(index_path, self.rows)
+            entries = entries if entries is not None else np.empty((0, 3), np.int64)
+            # Rows no entry covers (index written before the rows were, or a partition
+            # from before the index existed) are indexed from the data: it is in sorted runs
+            covered = int((entries[:, 1] + entries[:, 2]).max()) if len(entries) else 0
+            if covered < self.rows:
+                bucket, series = (np.fromfile(p, dtype, self.rows)[covered:] for p, dtype in zip(paths[:2], self.dtypes[:2]))
+                entries = np.concatenate([entries, run_index(bucket, series, covered)])
+            tmp = index_path.with_suffix(".tmp")
+            with open(tmp, "wb") as f:
+                f.write(entries.tobytes())
+            os.replace(tmp, index_path)  # Readers never see a half-written index
+            self.index = open(index_path, "ab")
+
+    def append(self, arrays):
+        first = self.rows
+        for f, dtype, array in zip(self.files, self.dtypes, arrays):
+            f.write(np.ascontiguousarray(array, dtype=dtype).tobytes())
+        self.rows += len(arrays[0])
+        if self.index is not None:
+            # After the columns: a reader ignores entries whose rows are not there yet
+            self.index.write(run_index(arrays[0], arrays[1], first).tobytes())
+
+    def flush(self):
+        for f in self.files + ([self.index] if self.index else []):
+            f.flush()
+
+    def close(self):
+        for f in self.files + ([self.index] if self.index else []):
+            f.close()
+
+
+class _Rollup:
+    """Open (not yet flushed) buckets of one resolution, kept compact as columns."""
+    def __init__(self, seconds: int):
+        self.seconds = seconds
+        self.rows = (
+            np.empty(0, np.int64), np.empty(0, np.uint32), np.empty(0, np.uint32),
+            np.empty(0, np.float64), np.empty(0, np.float32), np.empty(0, np.float32),
+        )
+
+    def add(self, ts: np.ndarray, series: np.ndarray, values: np.ndarray):
+        bucket = np.floor(ts / self.seconds).astype(np.int64)
+        batch = (bucket, series, np.ones(len(ts), np.uint32), values.astype(np.float64), values, values)
+        self.rows = combine(*(np.concatenate(pair) for pair in zip(self.rows, batch)))
+
+    def pop_closed(self, watermark: float):
+        """Rows of buckets that ended before `watermark`."""
+        closed = (self.rows[0] + 1) * self.seconds <= watermark
+        if not closed.any():
+            return None
+        out = tuple(col[closed] for col in self.rows)
+        self.rows = tuple(col[~closed] for col in self.rows)
+        return out
+
+    def pop_all(self):
+        out, self.rows = self.rows, tuple(col[:0] for col in self.rows)
+        return out if len(out[0]) else None
+
+
+class TelemetryStore:
+    """Single writer. Thread-safe: HTTP / UDP handlers call append_points concurrently."""
+
+    def __init__(self, root: Path, flush_seconds: float = 1.0):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.flush_seconds = flush_seconds
+        self.series: Dict[str, int] = self._load_series()
+        self.rollups = {name: _Rollup(seconds) for name, seconds in RESOLUTIONS.items()}
+        self.max_ts = 0.0
+        self.points_total = 0
+        self._partitions: Dict[Tuple[str, str], _Partition] = {}
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _load_series(self) -> Dict[str, int]:
+        path = self.root / SERIES_FILE
+        if not path.exists():
+            return {}
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def _save_series(self):
+        path = self.root / SERIES_FILE
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.series, f)
+        os.replace(tmp, path)
+
+    def _series_ids(self, machines: Iterable[str], metrics: Iterable[str], count: int) -> np.ndarray:
+        ids = np.empty(count, dtype=np.uint32)
+        known, added = self.series, False
+        for i, key in enumerate(map(series_key, machines, metrics)):
+            sid = known.get(key)
+            if sid is None:
+                sid = known[key] = len(known)
+                added = True
+            ids[i] = sid
+        if added:
+            self._save_series()
+        return ids
+
+    # ------------------------------------------------------------------
+    # Ingest
+    # ------------------------------------------------------------------
+    def append_points(self, points: Sequence[Sequence]):
+        """points: [[ts, machine_id, metric, value], ...] (ts in Unix seconds)."""
+        n = len(points)
+        if not n:
+            return
+        ts = np.fromiter((p[0] for p in points), np.float64, n)
+        values = np.fromiter((p[3] for p in points), np.float32, n)
+        with self._lock:
+            series = self._series_ids((p[1] for p in points), (p[2] for p in points), n)
+            self._append(ts, series, values)
+
+    def append_arrays(self, ts: np.ndarray, machine_ids: Sequence[str], metrics: Sequence[str], values: np.ndarray):
+        """Columnar form of append_points."""
+        with self._lock:
+            series = self._series_ids(machine_ids, metrics, len(ts))
+            self._append(np.asarray(ts, np.float64), series, np.asarray(values, np.float32))
+
+    def _append(self, ts: np.ndarray, series: np.ndarray, values: np.ndarray):
+        hours = (ts // PARTITION_SECONDS).astype(np.int64)
+        for hour in np.unique(hours):
+            rows = hours == hour
+            self._write("raw", partition_name(hour), RAW_COLUMNS, (ts[rows], series[rows], values[rows]))
+        for rollup in self.rollups.values():
+            rollup.add(ts, series, values)
+        self.max_ts = max(self.max_ts, float(ts.max()))
+        self.points_total += len(ts)
+        if time.monotonic() - self._last_flush >= self.flush_seconds:
+            self._flush(time.time())
+
+    def _write(self, kind: str, partition: str, columns, arrays):
+        key = (kind, partition)
+        part = self._partitions.get(key)
+        if part is None:
+            if len(self._partitions) >= MAX_OPEN_PARTITIONS:
+                self._close_files()  # Hour rolled over: drop handles of old partitions
+            part = self._partitions[key] = _Partition(self.root / kind / partition, columns, indexed=kind != "raw")
+        part.append(arrays)
+
+    def _write_rollup(self, name: str, rows):
+        seconds = RESOLUTIONS[name]
+        hours = rows[0] * seconds // PARTITION_SECONDS
+        for hour in np.unique(hours):
+            mask = hours == hour
+            self._write(f"rollup_{name}", partition_name(hour), ROLLUP_COLUMNS, tuple(col[mask] for col in rows))
+
+    def _flush(self, now: float):
+        watermark = max(self.max_ts, now) - GRACE_SECONDS
+        for name, rollup in self.rollups.items():
+            rows = rollup.pop_closed(watermark)
+            if rows is not None:
+                self._write_rollup(name, rows)
+        for part in self._partitions.values():
+            part.flush()
+        self._last_flush = time.monotonic()
+
+    def flush(self, now: Optional[float] = None):
+        """Closes finished buckets and flushes OS buffers (called by the ingest service's timer)."""
+        with self._lock:
+            self._flush(time.time() if now is None else now)
+
+    def close(self):
+        with self._lock:
+            for name, rollup in self.rollups.items():
+                rows = rollup.pop_all()
+                if rows is not None:
+                    self._write_rollup(name, rows)
+            self._close_files()
+
+    def _close_files(self):
+        for part in self._partitions.values():
+            part.close()
+        self._partitions.clear()
+
+
+def _read_columns(directory: Path, columns) -> Optional[List[np.ndarray]]:
+    paths = [directory / f"{name}.{_SUFFIX[dtype]}" for name, dtype in columns]
+    if not all(p.exists() for p in paths):
+        return None
+    # Torn tail after a crash: every column is cut to the rows all of them have
+    rows = min(p.stat().st_size // np.dtype(dtype).itemsize for p, (_, dtype) in zip(paths, columns))
+    if rows == 0:
+        return None
+    return [np.memmap(p, dtype=dtype, mode="r", shape=(rows,)) for p, (_, dtype) in zip(paths, columns)]
+
+
+def _rollup_rows(directory: Path, cols, sids: np.ndarray, lo: int, hi: int) -> np.ndarray:
+    """Row numbers of `sids` in buckets [lo, hi): binary search inside each indexed run."""
+    index = _read_index(directory / INDEX_FILE, len(cols[0]))
+    if index is None:  # Partition no writer has indexed yet: full scan
+        return np.flatnonzero(np.isin(cols[1], sids) & (cols[0] >= lo) & (cols[0] < hi))
+    rows = []
+    series = cols[1]
+    for _bucket, first, count in index[(index[:, 0] >= lo) & (index[:, 0] < hi)]:
+        run = series[first:first + count]
+        found = np.searchsorted(run, sids)
+        hit = found < count
+        hit[hit] = run[found[hit]] == sids[hit]
+        rows.append(first + found[hit])
+    return np.concatenate(rows) if rows else np.empty(0, np.int64)
+
+
+def _empty_result(resolution: str) -> dict:
+    names = ("t", "value") if resolution == "raw" else ("t", "mean", "min", "max", "count")
+    return {name: np.empty(0) for name in names}
+
+
+class TelemetryQuery:
+    """
+    Read side (any process). latest() / window() / fleet_kpis() match TelemetrySimulator,
+    so the Twin's panels can show ingested data instead of the simulation.
+    """
+    LATEST_LOOKBACK = 60
+    KPI_COLUMNS = ("status",) + METRICS
+
+    def __init__(self, root: Path, machine_ids: Optional[List[str]] = None, lines: Optional[List[List[str]]] = None):
+        self.root = Path(root)
+        self.machine_ids = list(machine_ids or [])
+        self.kpis = FleetKPIs(self.machine_ids, lines, KPI_WINDOW_SECONDS) if self.machine_ids else None
+        # Last known status + METRICS per machine (carried over seconds without a sample)
+        self._kpi_state = np.zeros((len(self.machine_ids), len(self.KPI_COLUMNS)), dtype=np.float32)
+        self._kpi_state[:, 0] = IDLE
+        self._kpi_next = None  # First 1s bucket not replayed yet
+        self._kpi_series = (None, None, None)  # (series.json dict, sorted sids, flat state cell of each)
+        self._kpi_lock = threading.Lock()
+
+    def _series_id(self, machine_id: str, metric: str) -> Optional[int]:
+        try:
+            return file_cache.get_json(self.root / SERIES_FILE).get(series_key(machine_id, metric))
+        except FileNotFoundError:
+            return None
+
+    def _partitions(self, kind: str, start: float, end: float) -> List[Path]:
+        first, last = int(start // PARTITION_SECONDS), int(end // PARTITION_SECONDS)
+        return [self.root / kind / partition_name(h) for h in range(first, last + 1)]
+
+    def query(self, machine_id: str, metric: str, start: float, end: float, resolution: str = "1m") -> dict:
+        """Rollup (t, mean, min, max, count) or, for resolution "raw", (t, value) in [start, end)."""
+        return self.query_metrics(machine_id, [metric], start, end, resolution)[metric]
+
+    def query_metrics(self, machine_id: str, metrics: Sequence[str], start: float, end: float, resolution: str = "1m") -> Dict[str, dict]:
+        """query() for several metrics of one machine, reading each partition once."""
+        sids = {m: self._series_id(machine_id, m) for m in metrics}
+        wanted = np.array([sid for sid in sids.values() if sid is not None], dtype=np.uint32)
+        if not len(wanted):
+            return {m: _empty_result(resolution) for m in metrics}
+        if resolution == "raw":
+            return self._query_raw(sids, wanted, start, end)
+
+        seconds = RESOLUTIONS[resolution]
+        lo, hi = int(start // seconds), int(np.ceil(end / seconds))
+        parts = []
+        for directory in self._partitions(f"rollup_{resolution}", start, end):
+            cols = _read_columns(directory, ROLLUP_COLUMNS)
+            if cols is None:
+                continue
+            rows = _rollup_rows(directory, cols, wanted, lo, hi)
+            parts.append([np.asarray(c[rows]) for c in cols])
+        if not parts:
+            return {m: _empty_result(resolution) for m in metrics}
+
+        bucket, series, count, total, low, high = combine(*(np.concatenate(c) for c in zip(*parts)))
+        results = {}
+        for metric, sid in sids.items():
+            mine = series == sid
+            results[metric] = {
+                "t": bucket[mine] * float(seconds), "mean": total[mine] / count[mine],
+                "min": low[mine], "max": high[mine], "count": count[mine],
+            }
+        return results
+
+    def _query_raw(self, sids: dict, wanted: np.ndarray, start: float, end: float) -> Dict[str, dict]:
+        # Raw rows are in arrival order: an (ad hoc, API only) scan of the partitions
+        parts = []
+        for directory in self._partitions("raw", start, end):
+            cols = _read_columns(directory, RAW_COLUMNS)
+            if cols is None:
+                continue
+            mask = np.isin(cols[1], wanted) & (cols[0] >= start) & (cols[0] < end)
+            parts.append([np.asarray(c[mask]) for c in cols])
+        ts, series, values = (np.concatenate(c) for c in zip(*parts)) if parts else (np.empty(0), np.empty(0, np.uint32), np.empty(0, np.float32))
+        order = np.argsort(ts, kind="stable")
+        ts, series, values = ts[order], series[order], values[order]
+        return {m: {"t": ts[series == sid], "value": values[series == sid]} for m, sid in sids.items()}
+
+    def latest(self, machine_id: str) -> dict:
+        now = time.time()
+        metrics = ("status",) + METRICS
+        results = self.query_metrics(machine_id, metrics, now - self.LATEST_LOOKBACK, now + 1, "1s")
+        data = {m: float(r["mean"][-1]) for m, r in results.items() if len(r["t"])}
+        if not data:
+            return {}
+        status = data.pop("status", None)
+        data["status"] = str(STATUS_NAMES[int(round(status))]) if status is not None and 0 <= round(status) < len(STATUS_NAMES) else "N/A"
+        for metric, decimals in zip(METRICS, (1, 2, 1, 0)):
+            if metric in data:
+                data[metric] = round(data[metric], decimals) if decimals else int(round(data[metric]))
+        return data
+
+    def fleet_kpis(self) -> dict:
+        """Fleet / line KPIs over the last KPI_WINDOW_SECONDS of closed 1s buckets; {} before any data."""
+        if self.kpis is None:
+            return {}
+        with self._kpi_lock:  # Shared by every session viewing the project
+            end = int(time.time() - 2 * GRACE_SECONDS)  # Buckets the writer has closed by now
+            start = end - KPI_WINDOW_SECONDS if self._kpi_next is None else max(self._kpi_next, end - KPI_WINDOW_SECONDS)
+            if start < end:
+                self._replay(start, end)
+                self._kpi_next = end
+            return self.kpis.snapshot if self.kpis.ticks else {}
+
+    def _kpi_cells(self):
+        """Series ids of the KPI columns of every machine, sorted, with their cell in _kpi_state."""
+        try:
+            known = file_cache.get_json(self.root / SERIES_FILE)
+        except FileNotFoundError:
+            return None, None
+        if known is not self._kpi_series[0]:  # New parse = series were added
+            sids, cells = [], []
+            width = len(self.KPI_COLUMNS)
+            for m, machine_id in enumerate(self.machine_ids):
+                for c, metric in enumerate(self.KPI_COLUMNS):
+                    sid = known.get(series_key(machine_id, metric))
+                    if sid is not None:
+                        sids.append(sid)
+                        cells.append(m * width + c)
+            order = np.argsort(sids)
+            self._kpi_series = (known, np.array(sids, np.uint32)[order], np.array(cells, np.int64)[order])
+        return self._kpi_series[1], self._kpi_series[2]
+
+    def _replay(self, start: int, end: int):
+        """Feeds the 1s buckets in [start, end) to the KPIs, one tick per bucket that has data."""
+        sids, cells = self._kpi_cells()
+        if sids is None or not len(sids):
+            return
+        parts = []
+        for directory in self._partitions("rollup_1s", start, end - 1):
+            cols = _read_columns(directory, ROLLUP_COLUMNS)
+            if cols is None:
+                continue
+            rows = _rollup_rows(directory, cols, sids, start, end)
+            parts.append([np.asarray(c[rows]) for c in cols])
+        if not parts:
+            return
+        bucket, series, count, total, _low, _high = combine(*(np.concatenate(c) for c in zip(*parts)))
+        cell = cells[np.searchsorted(sids, series)]
+        mean = (total / count).astype(np.float32)
+
+        state = self._kpi_state.reshape(-1)
+        starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+        for first, stop in zip(starts, np.r_[starts[1:], len(bucket)]):
+            state[cell[first:stop]] = mean[first:stop]
+            status = np.rint(self._kpi_state[:, 0]).astype(np.int8)
+            self.kpis.update(status, self._kpi_state[:, 1:])
+
+    def window(self, machine_id: str, seconds: float) -> dict:
+        """1s means over the last `seconds`, aligned on one timestamp axis (NaN where a metric has no sample)."""
+        now = time.time()
+        results = self.query_metrics(machine_id, METRICS, now - seconds, now + 1, "1s")
+        t = np.unique(np.concatenate([r["t"] for r in results.values()]))
+        data = {"timestamp": t}
+        for metric, result in results.items():
+            column = np.full(len(t), np.nan, dtype=np.float32)
+            column[np.searchsorted(t, result["t"])] = result["mean"]
+            data[metric] = column
+        return data
@@ -0,0 +1,145 @@
+"""
+Vendored JavaScript for the 3D viewer, served by the asset server under /vendor/.
+
+The viewer used to import Three.js, its addons and tween.js from unpkg on every
+load. This script downloads pinned npm tarballs once (at image build), checks
+them against the sha512 committed below (never against the registry's own
+answer) and extracts only the files the viewer imports into
+VENDOR_DIR/<package>@<version>/. The decoders for
+compressed assets come along (meshopt, Draco and the Basis/KTX2 transcoder),
+and so does three-mesh-bvh for picking.
+Versioned paths never change content, so the asset server marks them immutable.
+Each JS/WASM file also gets a .gz sidecar.
+A package without a pinned hash is skipped with a warning: the asset server
+then redirects its /vendor/ paths to the same version on VENDOR_CDN.
+
+Run:  python dashboard/src/services/vendor_assets.py --out /app/vendor
+Pin:  python dashboard/src/services/vendor_assets.py --pin
+      (prints the registry's hashes after a version bump: review, then commit them)
+"""
+import argparse
+import base64
+import gzip
+import hashlib
+import io
+import json
+import os
+import tarfile
+import urllib.request
+from pathlib import Path
+from typing import Optional
+
+from loguru import logger
+
+VENDOR_DIR = os.getenv("VENDOR_DIR", "/app/vendor")
+REGISTRY = os.getenv("NPM_REGISTRY", "https://registry.npmjs.org")
+
+# package -> (version, tarball sha512 (npm "integrity"), files or directories inside the tarball's package/)
+# A package without a pinned hash is not vendored (served from the CDN at this exact version):
+# run --pin on a trusted machine and commit the output.
+PACKAGES = {
+    "three": ("0.160.0", None, [
+        "build/three.module.js",
+        "examples/jsm/controls/OrbitControls.js",
+        "examples/jsm/loaders/GLTFLoader.js",
+        "examples/jsm/loaders/DRACOLoader.js",
+        "examples/jsm/loaders/KTX2Loader.js",
+        "examples/jsm/utils/BufferGeometryUtils.js",
+        "examples/jsm/utils/WorkerPool.js",
+        "examples/jsm/libs/meshopt_decoder.module.js",
+        "examples/jsm/libs/ktx-parse.module.js",
+        "examples/jsm/libs/zstddec.module.js",
+        "examples/jsm/libs/draco/gltf/",
+        "examples/jsm/libs/basis/",
+    ]),
+    "@tweenjs/tween.js": ("23.1.1", None, ["dist/tween.esm.js"]),
+    # ES module sources (bare "three" imports resolve through the viewer's import map)
+    "three-mesh-bvh": ("0.7.3", None, ["src/"]),
+    # Flythrough player (components/video.py) in browsers without native HLS
+    "hls.js": ("1.5.7", None, ["dist/hls.min.js"]),
+}
+SIDECAR_SUFFIXES = (".js", ".wasm")
+
+
+def _fetch(url: str) -> bytes:
+    with urllib.request.urlopen(url, timeout=60) as resp:
+        return resp.read()
+
+
+def _integrity(data: bytes) -> str:
+    return "sha512-" + base64.b64encode(hashlib.sha512(data).digest()).decode()
+
+
+def _registry_meta(name: str, version: str) -> dict:
+    return json.loads(_fetch(f"{REGISTRY}/{name.replace('/', '%2F')}/{version}"))
+
+
+def vendor_package(name: str, version: str, integrity: Optional[str], wanted: list, out_dir: Path) -> int:
+    """Extracts the wanted files of name@version into out_dir/name@version/; returns the file count."""
+    target = out_dir / f"{name}@{version}"
+    if (target / ".complete").exists():
+        return 0
+    if not integrity:
+        raise ValueError(f"{name}@{version} has no pinned sha512 in PACKAGES (run with --pin)")
+
+    tarball = _fetch(_registry_meta(name, version)["dist"]["tarball"])
+    actual = _integrity(tarball)
+    if actual != integrity:
+        raise ValueError(f"Integrity mismatch for {name}@{version}: got {actual}")
+
+    count = 0
+    with tarfile.open(fileobj=io.BytesIO(tarball), mode="r:gz") as tar:
+        for member in tar.getmembers():
+            rel = member.name.split("/", 1)[-1]  # Strip "package/"
+            if not member.isfile() or ".." in Path(rel).parts:
+                continue
+            if not any(rel == w or (w.endswith("/") and rel.startswith(w)) for w in wanted):
+                continue
+            dest = target / rel
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            data = tar.extractfile(member).read()
+            dest.write_bytes(data)
+            if dest.suffix in SIDECAR_SUFFIXES:
+                Path(str(dest) + ".gz").write_bytes(gzip.compress(data, compresslevel=9, mtime=0))
+            count += 1
+
+    missing = [w for w in wanted if not w.endswith("/") and not (target / w).exists()]
+    if missing:
+        raise FileNotFoundError(f"{name}@{version} has no {', '.join(missing)}")
+    (target / ".complete").touch()
+    return count
+
+
+def vendor_all(out_dir: Path = VENDOR_DIR):
+    out_dir = Path(out_dir)
+    for name, (version, integrity, wanted) in PACKAGES.items():
+        if not integrity:
+            logger.warning(f"⚠️ {name}@{version} is not pinned (run with --pin): served from the CDN instead")
+            continue
+        count = vendor_package(name, version, integrity, wanted, out_dir)
+        logger.info(f"📦 {name}@{version}: " + (f"{count} files vendored" if count else "already vendored"))
+
+
+def print_pins():
+    """Hashes of the tarballs as downloaded now, to review and paste into PACKAGES."""
+    for name, (version, integrity, _) in PACKAGES.items():
+        meta = _registry_meta(name, version)
+        actual = _integrity(_fetch(meta["dist"]["tarball"]))
+        note = "" if actual == meta["dist"]["integrity"] else "  # differs from the registry's own hash!"
+        status = "pinned" if actual == integrity else "NEW"
+        print(f'{status:>6}  "{name}": ("{version}", "{actual}", ...),{note}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vendor the viewer's JavaScript dependencies")
+    parser.add_argument("--out", default=VENDOR_DIR)
+    parser.add_argument("--pin", action="store_true", help="Print the sha512 of every package instead of vendoring")
+    args = parser.parse_args()
+    if args.pin:
+        print_pins()
+    else:
+        vendor_all(Path(args.out))
+
+
+if __name__ == "__main__":
+    main()
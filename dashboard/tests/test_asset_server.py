@@ -0,0 +1,115 @@
+import gzip
+import http.client
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services import asset_server
+from services.asset_server import create_server, parse_range
+
+
+class TestParseRange(unittest.TestCase):
+    def test_forms(self):
+        self.assertEqual(parse_range("bytes=0-99", 1000), (0, 99))
+        self.assertEqual(parse_range("bytes=900-", 1000), (900, 999))
+        self.assertEqual(parse_range("bytes=-100", 1000), (900, 999))
+        self.assertEqual(parse_range("bytes=990-5000", 1000), (990, 999))
+        self.assertIsNone(parse_range("bytes=0-1,5-6", 1000))  # Multi-range: full body
+        self.assertIsNone(parse_range("items=0-1", 1000))
+        with self.assertRaises(ValueError):
+            parse_range("bytes=1000-", 1000)
+
+
+class TestAssetServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.payload = b"glTF" + bytes(range(256)) * 64
+        with open(os.path.join(cls.tmp.name, "scene.glb"), "wb") as f:
+            f.write(cls.payload)
+        with open(os.path.join(cls.tmp.name, "scene.glb.gz"), "wb") as f:
+            f.write(gzip.compress(cls.payload))
+
+        cls.vendor = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(cls.vendor.name, "three@0.160.0", "build"))
+        with open(os.path.join(cls.vendor.name, "three@0.160.0", "build", "three.module.js"), "w") as f:
+            f.write("export const REVISION = '160';")
+
+        cls.server = create_server(cls.tmp.name, 0, "127.0.0.1", vendor_dir=cls.vendor.name)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.tmp.cleanup()
+        cls.vendor.cleanup()
+
+    def request(self, path="/scene.glb", **headers):
+        conn = http.client.HTTPConnection("127.0.0.1", self.server.server_address[1])
+        conn.request("GET", path, headers=headers)
+        resp = conn.getresponse()
+        body = resp.read()
+        conn.close()
+        return resp, body
+
+    def test_range(self):
+        resp, body = self.request(Range="bytes=4-11")
+        self.assertEqual(resp.status, 206)
+        self.assertEqual(body, self.payload[4:12])
+        self.assertEqual(resp.getheader("Content-Range"), f"bytes 4-11/{len(self.payload)}")
+
+        resp, _ = self.request(Range=f"bytes={len(self.payload)}-")
+        self.assertEqual(resp.status, 416)
+
+    def test_etag_revalidation(self):
+        resp, body = self.request()
+        self.assertEqual(body, self.payload)
+        resp, body = self.request(**{"If-None-Match": resp.getheader("ETag")})
+        self.assertEqual(resp.status, 304)
+        self.assertEqual(body, b"")
+
+    def test_gzip_sidecar(self):
+        resp, body = self.request(**{"Accept-Encoding": "br;q=1, gzip"})
+        self.assertEqual(resp.getheader("Content-Encoding"), "gzip")
+        self.assertEqual(gzip.decompress(body), self.payload)
+        self.assertIn("gzip", resp.getheader("ETag"))  # Distinct strong validator per encoding
+
+    def test_outside_root(self):
+        resp, _ = self.request("/../../etc/passwd")
+        self.assertEqual(resp.status, 404)
+        resp, _ = self.request("/vendor/../scene.glb")
+        self.assertEqual(resp.status, 404)
+
+    def test_vendor_immutable(self):
+        resp, body = self.request("/vendor/three@0.160.0/build/three.module.js")
+        self.assertEqual(resp.status, 200)
+        self.assertEqual(resp.getheader("Content-Type"), "text/javascript")
+        self.assertIn("immutable", resp.getheader("Cache-Control"))
+        resp, _ = self.request()
+        self.assertEqual(resp.getheader("Cache-Control"), "no-cache")
+
+    def test_unvendored_package_redirects_to_cdn(self):
+        resp, _ = self.request("/vendor/hls.js@1.5.7/dist/hls.min.js")
+        self.assertEqual(resp.status, 302)
+        self.assertEqual(resp.getheader("Location"), f"{asset_server.VENDOR_CDN}/hls.js@1.5.7/dist/hls.min.js")
+        self.assertEqual(resp.getheader("Cache-Control"), "no-cache")
+        resp, _ = self.request("/vendor/@tweenjs/tween.js@23.1.1/dist/tween.esm.js")
+        self.assertEqual(resp.getheader("Location"), f"{asset_server.VENDOR_CDN}/@tweenjs/tween.js@23.1.1/dist/tween.esm.js")
+        # Only the pinned versions, and never for a file missing from a vendored package
+        resp, _ = self.request("/vendor/hls.js@9.9.9/dist/hls.min.js")
+        self.assertEqual(resp.status, 404)
+        open(os.path.join(self.vendor.name, "three@0.160.0", ".complete"), "w").close()
+        try:
+            resp, _ = self.request("/vendor/three@0.160.0/build/missing.js")
+            self.assertEqual(resp.status, 404)
+        finally:
+            os.remove(os.path.join(self.vendor.name, "three@0.160.0", ".complete"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.data_loader import DataLoader
+
+
+class TestPreviewManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_reads_machines(self):
+        machines = {"M1": {"thumbnail": "M1/thumbnail.png", "orbit": "M1/orbit.mp4"}}
+        (self.dir / "manifest.json").write_text(json.dumps({"machines": machines}))
+        self.assertEqual(DataLoader.load_preview_manifest(self.dir), machines)
+
+    def test_missing_or_mid_write_is_empty(self):
+        self.assertEqual(DataLoader.load_preview_manifest(self.dir), {})
+        (self.dir / "manifest.json").write_text('{"machines": {"M1": {"thumb')  # Builder still writing
+        self.assertEqual(DataLoader.load_preview_manifest(self.dir), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
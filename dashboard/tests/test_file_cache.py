@@ -0,0 +1,106 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from core import project_index
+from core.project_index import ProjectIndex
+from services.file_cache import FileCache
+
+
+class TestFileCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "contract.json"
+        self.cache = FileCache()
+        self.reads = 0
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def parse(self, path):
+        self.reads += 1
+        return json.loads(path.read_text())
+
+    def write(self, data, mtime_ns):
+        self.path.write_text(json.dumps(data))
+        os.utime(self.path, ns=(mtime_ns, mtime_ns))
+
+    def test_reuses_until_file_changes(self):
+        self.write({"machines": [1]}, 1_000_000_000)
+        self.assertEqual(self.cache.get(self.path, self.parse), {"machines": [1]})
+        self.cache.get(self.path, self.parse)
+        self.assertEqual(self.reads, 1)
+
+        self.write({"machines": [2]}, 2_000_000_000)
+        self.assertEqual(self.cache.get(self.path, self.parse), {"machines": [2]})
+        self.assertEqual(self.reads, 2)
+
+    def test_missing_file_raises(self):
+        with self.assertRaises(FileNotFoundError):
+            self.cache.get_json(self.path)
+
+
+class TestProjectIndex(unittest.TestCase):
+    def test_rescans_only_when_invalidated(self):
+        scans = []
+
+        def scan():
+            scans.append(1)
+            return [len(scans)]
+
+        index = ProjectIndex([Path("/nonexistent")], scan, poll_seconds=3600, watch=False)
+        self.assertEqual(index.projects(), [1])
+        self.assertEqual(index.projects(), [1])
+        index.invalidate()
+        self.assertEqual(index.projects(), [2])
+        self.assertEqual(len(scans), 2)
+
+    def test_polls_without_watcher(self):
+        index = ProjectIndex([Path("/nonexistent")], lambda: [object()], poll_seconds=0, watch=False)
+        self.assertIsNot(index.projects(), index.projects())
+
+    def test_watch_false_never_starts_an_observer(self):
+        started = []
+
+        class RecordingObserver:
+            daemon = False
+
+            def schedule(self, handler, path, recursive):
+                pass
+
+            def start(self):
+                started.append(self)
+
+            def stop(self):
+                pass
+
+            def join(self, timeout=None):
+                pass
+
+        observer = project_index.Observer
+        project_index.Observer = RecordingObserver
+        try:
+            with tempfile.TemporaryDirectory() as root:
+                polling = ProjectIndex([Path(root)], list, poll_seconds=0, watch=False)
+                polling.projects()
+                polling.projects()  # Poll interval elapsed: must not switch to watching
+                self.assertFalse(polling.watching)
+                self.assertEqual(started, [])
+
+                watching = ProjectIndex([Path(root)], list, poll_seconds=0)
+                self.assertTrue(watching.watching)
+                watching.stop()
+                watching.projects()
+                self.assertFalse(watching.watching)
+                self.assertEqual(len(started), 1)
+        finally:
+            project_index.Observer = observer
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.fleet_kpis import FleetKPIs, production_lines
+from services.telemetry_schema import IDLE, MAINTENANCE, RUNNING
+from services.telemetry_sim import TelemetrySimulator
+
+
+def tick(kpis, status, efficiency, temperature):
+    values = np.zeros((len(status), 4), dtype=np.float32)
+    values[:, 0] = temperature
+    values[:, 3] = efficiency
+    kpis.update(np.array(status, dtype=np.int8), values)
+
+
+class TestProductionLines(unittest.TestCase):
+    def test_components_in_flow_order(self):
+        contract = {
+            "machines": [{"id": i} for i in ("A1", "B1", "A2", "B2", "C1")],
+            "relationships": [{"from_id": "A1", "to_id": "A2"}, {"from_id": "B1", "to_id": "B2"}],
+        }
+        self.assertEqual(production_lines(contract), [["A1", "A2"], ["B1", "B2"], ["C1"]])
+        self.assertEqual(production_lines({"machines": [{"id": "A"}, {"name": "B"}]}), [["A", "B"]])
+
+
+class TestFleetKPIs(unittest.TestCase):
+    def test_sliding_window(self):
+        kpis = FleetKPIs(["A1", "A2", "B1"], [["A1", "A2"], ["B1"]], window_ticks=2)
+        tick(kpis, [RUNNING, RUNNING, IDLE], [80, 60, 0], [50, 70, 30])
+        tick(kpis, [RUNNING, IDLE, MAINTENANCE], [100, 0, 0], [60, 40, 20])
+
+        snap = kpis.snapshot
+        self.assertEqual(snap["in_maintenance"], 1)
+        self.assertAlmostEqual(snap["availability"], (1.0 + 0.5 + 0.0) / 3)
+        self.assertAlmostEqual(snap["performance"], (80 + 60 + 100) / 3 / 100)
+        line_a = snap["lines"][0]
+        self.assertEqual(line_a["bottleneck"], "A2")  # 0.5 x 0.6 < 1.0 x 0.9
+        self.assertAlmostEqual(line_a["oee"], 0.3)
+        self.assertEqual(line_a["window_max_temperature"], 70)
+
+        # The first tick leaves the window
+        tick(kpis, [RUNNING, RUNNING, RUNNING], [100, 100, 50], [40, 40, 40])
+        self.assertAlmostEqual(kpis.snapshot["availability"], (1.0 + 0.5 + 0.5) / 3)
+        self.assertEqual(kpis.snapshot["lines"][0]["window_max_temperature"], 60)
+
+    def test_fed_by_simulator(self):
+        sim = TelemetrySimulator([f"M{i}" for i in range(20)], history=5, seed=3, lines=[[f"M{i}" for i in range(20)]])
+        for _ in range(12):
+            sim.step()
+        snap = sim.fleet_kpis()
+        self.assertEqual(snap["machines"], 20)
+        self.assertEqual(snap["window_ticks"], 5)
+        self.assertTrue(0.0 <= snap["oee"] <= 1.0)
+        np.testing.assert_array_equal(sim.kpis.sum_running, sim.kpis.ring_running.sum(axis=0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from core.context import ProjectReference
+from services import shared_state
+from services.shared_state import SharedRegistry
+
+
+class TestSharedRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.alive = set()
+        self.built = []
+        self.registry = SharedRegistry(lambda s: s in self.alive, idle_seconds=60, max_projects=8)
+        self.now = 1000.0
+        self._monotonic = shared_state.time.monotonic
+        shared_state.time.monotonic = lambda: self.now
+
+    def tearDown(self):
+        shared_state.time.monotonic = self._monotonic
+        self.tmp.cleanup()
+
+    def ref(self, name: str) -> ProjectReference:
+        folder = Path(self.tmp.name) / name
+        folder.mkdir(exist_ok=True)
+        contract = folder / "layout_contract.json"
+        if not contract.exists():
+            contract.write_text(json.dumps({"machines": [{"id": f"{name}-M1", "name": "Press"}]}))
+        return ProjectReference(name, contract, folder / "camera_map.json", folder / "scene.glb")
+
+    def factory(self, state):
+        self.built.append(state.ref.name)
+        return object()
+
+    def acquire(self, name: str, session: str):
+        self.alive.add(session)
+        return self.registry.acquire(self.ref(name), session, self.factory)
+
+    def test_sessions_share_one_state(self):
+        first = self.acquire("plant", "s1")
+        second = self.acquire("plant", "s2")
+        self.assertIs(first, second)
+        self.assertIs(first.telemetry, second.telemetry)
+        self.assertEqual(self.built, ["plant"])
+        self.assertEqual(first.machines[0]["id"], "plant-M1")
+        self.assertEqual(self.registry.stats(), {"plant": 2})
+
+    def test_switching_project_releases_the_hold(self):
+        self.acquire("plant", "s1")
+        self.acquire("depot", "s1")
+        self.assertEqual(self.registry.stats(), {"plant": 0, "depot": 1})
+
+    def test_idle_project_evicted_after_timeout(self):
+        self.acquire("plant", "s1")
+        self.alive.discard("s1")  # Browser tab closed
+
+        self.now += 30
+        self.acquire("depot", "s2")  # Sweep: plant released but not yet idle long enough
+        self.assertIn("plant", self.registry.stats())
+
+        self.now += 60
+        self.acquire("depot", "s2")
+        self.assertEqual(self.registry.stats(), {"depot": 1})
+
+        # Reopened later: rebuilt from the files
+        self.acquire("plant", "s3")
+        self.assertEqual(self.built, ["plant", "depot", "plant"])
+
+    def test_overflow_evicts_least_recently_used(self):
+        self.registry.max_projects = 2
+        for name in ("a", "b", "c"):
+            self.acquire(name, "viewer")
+            self.now += 1
+        self.now += shared_state.SWEEP_SECONDS
+        self.acquire("c", "viewer")
+        self.assertEqual(self.registry.stats(), {"b": 0, "c": 1})
+
+    def test_contract_change_rebuilds_telemetry(self):
+        state = self.acquire("plant", "s1")
+        contract = state.ref.contract_path
+        contract.write_text(json.dumps({"machines": [{"id": "plant-M1", "name": "Press"}, {"id": "plant-M2", "name": "Lathe"}]}))
+        os.utime(contract, ns=(1, 1))
+        state = self.acquire("plant", "s2")
+        self.assertEqual(len(state.machines), 2)
+        self.assertEqual(self.built, ["plant", "plant"])
+
+
+if __name__ == "__main__":
+    unittest.main()
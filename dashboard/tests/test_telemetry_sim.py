@@ -0,0 +1,43 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.telemetry_sim import METRICS, STATUS_NAMES, TelemetrySimulator
+
+
+class TestTelemetrySimulator(unittest.TestCase):
+    def setUp(self):
+        self.sim = TelemetrySimulator([f"M{i}" for i in range(50)], history=10, tick_seconds=1.0, seed=7)
+
+    def test_latest_has_dashboard_fields(self):
+        latest = self.sim.latest("M3")
+        self.assertIn(latest["status"], set(STATUS_NAMES))
+        self.assertEqual(set(latest) - {"status"}, set(METRICS))
+        self.assertIsInstance(latest["efficiency"], int)
+        self.assertEqual(self.sim.latest("unknown"), {})
+
+    def test_window_wraps_oldest_first(self):
+        for t in range(1, 25):
+            self.sim.step(now=float(t))
+        window = self.sim.window("M0", seconds=5)
+        np.testing.assert_array_equal(window["timestamp"], [20, 21, 22, 23, 24])
+
+        # Never more than the ring holds
+        self.assertEqual(len(self.sim.window("M0", seconds=3600)["temperature"]), 10)
+        self.assertEqual(float(window["temperature"][-1]), float(self.sim.values[0, 0]))
+
+    def test_values_stay_coherent_and_bounded(self):
+        before = self.sim.values.copy()
+        self.sim.step()
+        running = (self.sim.status == 0) & (before[:, 3] > 50)
+        # One tick moves temperature by a few degrees, not a fresh random draw
+        self.assertLess(np.abs(self.sim.values[running, 0] - before[running, 0]).max(), 10)
+        self.assertTrue(((self.sim.values[:, 3] >= 0) & (self.sim.values[:, 3] <= 100)).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+import http.client
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services import telemetry_store
+from services.telemetry_ingest import IngestService
+from services.telemetry_schema import MAINTENANCE, RUNNING
+from services.telemetry_store import TelemetryQuery, TelemetryStore
+
+T0 = 1_700_000_040.0  # Minute-aligned
+
+
+class TestTelemetryStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_rollups_and_late_samples(self):
+        store = TelemetryStore(self.root)
+        store.append_points([[T0 + 0.2, "M1", "temperature", 10.0], [T0 + 0.7, "M1", "temperature", 20.0],
+                             [T0 + 1.5, "M1", "temperature", 30.0], [T0 + 0.5, "M2", "temperature", 99.0]])
+        store.flush(now=T0 + 10)  # Closes the 1s buckets, not the minute
+        store.append_points([[T0 + 0.9, "M1", "temperature", 60.0]])  # Late: bucket already flushed
+        store.close()
+
+        query = TelemetryQuery(self.root)
+        sec = query.query("M1", "temperature", T0, T0 + 60, "1s")
+        np.testing.assert_array_equal(sec["t"], [T0, T0 + 1])
+        np.testing.assert_allclose(sec["mean"], [30.0, 30.0])  # (10 + 20 + 60) / 3
+        np.testing.assert_array_equal(sec["count"], [3, 1])
+        np.testing.assert_array_equal(sec["max"], [60.0, 30.0])
+
+        minute = query.query("M1", "temperature", T0, T0 + 60, "1m")
+        np.testing.assert_array_equal(minute["count"], [4])
+        self.assertEqual(len(query.query("M1", "temperature", T0, T0 + 60, "raw")["t"]), 4)
+        self.assertEqual(len(query.query("M3", "temperature", T0, T0 + 60, "1s")["t"]), 0)
+
+    def test_torn_tail_is_ignored(self):
+        store = TelemetryStore(self.root)
+        store.append_points([[T0, "M1", "power", 1.0], [T0 + 1, "M1", "power", 2.0]])
+        store.close()
+        raw_ts = next((self.root / "raw").glob("*/ts.f64"))
+        with open(raw_ts, "ab") as f:
+            f.write(b"\x00" * 12)  # Crash mid-append: one and a half timestamps, no values
+
+        self.assertEqual(len(TelemetryQuery(self.root).query("M1", "power", T0, T0 + 60, "raw")["t"]), 2)
+
+    def test_reopen_realigns_torn_columns(self):
+        store = TelemetryStore(self.root)
+        store.append_points([[T0, "M1", "power", 1.0]])
+        store.close()
+        raw_ts = next((self.root / "raw").glob("*/ts.f64"))
+        with open(raw_ts, "ab") as f:
+            f.write(np.float64(T0 + 1).tobytes())  # Killed after the ts column of the next batch
+
+        store = TelemetryStore(self.root)
+        store.append_points([[T0 + 2, "M1", "power", 3.0]])
+        store.close()
+        raw = TelemetryQuery(self.root).query("M1", "power", T0, T0 + 60, "raw")
+        np.testing.assert_array_equal(raw["t"], [T0, T0 + 2])
+        np.testing.assert_array_equal(raw["value"], [1.0, 3.0])
+
+    def test_indexed_query_matches_full_scan(self):
+        rng = np.random.default_rng(3)
+        store = TelemetryStore(self.root)
+        machines = [f"M{i}" for i in range(50)]
+        for second in range(20):
+            ts = T0 + second + rng.random(len(machines))
+            store.append_arrays(ts, machines, ["temperature"] * len(machines), rng.random(len(machines)) * 100)
+            store.flush(now=T0 + second + 3)
+        store.append_points([[T0 + 1.5, "M7", "temperature", 500.0]])  # Late row for a flushed bucket
+        store.close()
+
+        query = TelemetryQuery(self.root)
+        indexed = query.query("M7", "temperature", T0, T0 + 60, "1s")
+        for index in self.root.glob("rollup_1s/*/index.i64"):
+            index.unlink()  # Same partition, unindexed: full scan
+        scanned = query.query("M7", "temperature", T0, T0 + 60, "1s")
+        self.assertEqual(len(indexed["t"]), 20)
+        for name in ("t", "mean", "count", "max"):
+            np.testing.assert_array_equal(indexed[name], scanned[name])
+        self.assertEqual(indexed["max"][1], 500.0)
+
+        # The next writer rebuilds the missing index from the sorted runs
+        store = TelemetryStore(self.root)
+        store.append_points([[T0 + 30, "M7", "temperature", 1.0]])
+        store.close()
+        self.assertEqual(len(query.query("M7", "temperature", T0, T0 + 60, "1s")["t"]), 21)
+        self.assertTrue(any(self.root.glob("rollup_1s/*/index.i64")))
+
+    def test_fleet_kpis_from_rollups(self):
+        store = TelemetryStore(self.root)
+        for second in range(10):
+            # M1 runs at 80 % (in maintenance for the last 2 s), M2 runs at 50 % but only reports every other second
+            m1 = MAINTENANCE if second >= 8 else RUNNING
+            points = [[T0 + second, "M1", "status", m1], [T0 + second, "M1", "efficiency", 80.0],
+                      [T0 + second, "M1", "temperature", 60.0]]
+            if second % 2 == 0:
+                points += [[T0 + second, "M2", "status", RUNNING], [T0 + second, "M2", "efficiency", 50.0],
+                           [T0 + second, "M2", "temperature", 40.0]]
+            store.append_points(points)
+        store.close()
+
+        now = [T0 + 5 + 2 * telemetry_store.GRACE_SECONDS]
+        clock = telemetry_store.time.time
+        telemetry_store.time.time = lambda: now[0]
+        try:
+            self.assertEqual(TelemetryQuery(self.root).fleet_kpis(), {})  # No machines given
+            query = TelemetryQuery(self.root, ["M1", "M2", "M3"], [["M1", "M2"], ["M3"]])
+            kpis = query.fleet_kpis()
+            self.assertEqual(kpis["window_ticks"], 5)  # Buckets 0..4 are closed
+            self.assertEqual(kpis["running"], 2)
+
+            now[0] = T0 + 20 + 2 * telemetry_store.GRACE_SECONDS
+            kpis = query.fleet_kpis()  # Replays only the new buckets
+        finally:
+            telemetry_store.time.time = clock
+
+        self.assertEqual(kpis["window_ticks"], 10)
+        self.assertEqual(kpis["in_maintenance"], 1)
+        m1, m2 = kpis["lines"][0], kpis["lines"][1]
+        self.assertEqual(m1["machines"], ["M1", "M2"])
+        self.assertEqual(m1["bottleneck"], "M2")  # Carried over between its samples: 10/10 s at 50 %
+        self.assertAlmostEqual(m1["oee"], 0.5)
+        self.assertAlmostEqual(m1["availability"], (0.8 + 1.0) / 2)
+        self.assertEqual(m1["window_max_temperature"], 60.0)
+        self.assertEqual(m2["machines"], ["M3"])  # Never reported: idle
+        self.assertEqual(m2["availability"], 0.0)
+
+
+class TestIngestService(unittest.TestCase):
+    def test_http_ingest_and_query(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            service = IngestService(tmp, "127.0.0.1", 0, udp_port=None)
+            threading.Thread(target=service.http.serve_forever, daemon=True).start()
+            port = service.http.server_address[1]
+            try:
+                conn = http.client.HTTPConnection("127.0.0.1", port)
+                conn.request("POST", "/ingest", body=json.dumps({"points": [[T0, "M1", "vibration", 0.5]]}))
+                resp = conn.getresponse()
+                resp.read()
+                self.assertEqual(resp.status, 204)
+                conn.request("POST", "/ingest", body=b'{"rows": []}')
+                resp = conn.getresponse()
+                resp.read()
+                self.assertEqual(resp.status, 400)
+
+                service.store.flush(now=T0 + 10)
+                conn.request("GET", f"/query?machine=M1&metric=vibration&start={T0}&end={T0 + 5}&resolution=1s")
+                result = json.loads(conn.getresponse().read())
+                self.assertEqual(result["t"], [T0])
+                self.assertEqual(result["mean"], [0.5])
+                conn.close()
+            finally:
+                service.http.shutdown()
+                service.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
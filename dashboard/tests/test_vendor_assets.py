@@ -0,0 +1,78 @@
+import io
+import json
+import os
+import sys
+import tarfile
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services import vendor_assets
+from services.vendor_assets import _integrity, vendor_package
+
+
+def tarball(files: dict) -> bytes:
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w:gz") as tar:
+        for name, data in files.items():
+            info = tarfile.TarInfo(f"package/{name}")
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return buf.getvalue()
+
+
+class TestVendorPackage(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.out = Path(self.tmp.name)
+        self.tarball = tarball({"dist/hls.min.js": b"var Hls;", "README.md": b"docs"})
+        # The registry vouches for whatever it serves: only the committed pin may count
+        self.responses = {
+            f"{vendor_assets.REGISTRY}/hls.js/1.5.7": json.dumps({
+                "dist": {"tarball": "https://example.test/hls.tgz", "integrity": _integrity(self.tarball)},
+            }).encode(),
+            "https://example.test/hls.tgz": self.tarball,
+        }
+        self._fetch = vendor_assets._fetch
+        vendor_assets._fetch = lambda url: self.responses[url]
+
+    def tearDown(self):
+        vendor_assets._fetch = self._fetch
+        self.tmp.cleanup()
+
+    def test_pinned_tarball_extracts_wanted_files(self):
+        count = vendor_package("hls.js", "1.5.7", _integrity(self.tarball), ["dist/hls.min.js"], self.out)
+        target = self.out / "hls.js@1.5.7"
+        self.assertEqual(count, 1)
+        self.assertEqual((target / "dist/hls.min.js").read_bytes(), b"var Hls;")
+        self.assertTrue((target / "dist/hls.min.js.gz").exists())
+        self.assertFalse((target / "README.md").exists())
+        self.assertEqual(vendor_package("hls.js", "1.5.7", _integrity(self.tarball), ["dist/hls.min.js"], self.out), 0)
+
+    def test_tarball_not_matching_pin_is_refused(self):
+        with self.assertRaises(ValueError):
+            vendor_package("hls.js", "1.5.7", _integrity(b"something else"), ["dist/hls.min.js"], self.out)
+        self.assertFalse((self.out / "hls.js@1.5.7").exists())
+
+    def test_unpinned_package_is_refused(self):
+        with self.assertRaises(ValueError):
+            vendor_package("hls.js", "1.5.7", None, ["dist/hls.min.js"], self.out)
+
+    def test_vendor_all_skips_unpinned_packages(self):
+        packages = vendor_assets.PACKAGES
+        vendor_assets.PACKAGES = {
+            "hls.js": ("1.5.7", _integrity(self.tarball), ["dist/hls.min.js"]),
+            "three": ("0.160.0", None, ["build/three.module.js"]),  # Left to the asset server's CDN fallback
+        }
+        try:
+            vendor_assets.vendor_all(self.out)
+        finally:
+            vendor_assets.PACKAGES = packages
+        self.assertTrue((self.out / "hls.js@1.5.7" / ".complete").exists())
+        self.assertFalse((self.out / "three@0.160.0").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
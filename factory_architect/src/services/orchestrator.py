@@ -98,6 +98,7 @@ class PipelineOrchestrator:
             "project": self.ctx.project_name,
             "architecture_file": str(self.ctx.shared_dxf),
             "machines": [m.model_dump() for m in data.machines],
+            "relationships": [r.model_dump() for r in data.relationships],
             "layout_coordinates": [m.model_dump() for m in layout.machines]
         }
         
@@ -0,0 +1,90 @@
+"""
+Benchmark: batched connection geometry vs. one trimesh primitive per segment.
+
+Usage (from repo root):
+    python factory_builder/benchmarks/bench_connection_geometry.py --connections 5000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.getcwd())
+
+from factory_builder.services.connection_geometry import ConnectionGeometryBuilder
+
+
+def random_manhattan_paths(count: int, seed: int = 7):
+    """Generates `count` orthogonal polylines with 2-5 segments each."""
+    rng = np.random.default_rng(seed)
+    connections = []
+    for i in range(count):
+        n_seg = rng.integers(2, 6)
+        pts = [rng.uniform(0, 100_000, size=2)]
+        for s in range(n_seg):
+            step = rng.uniform(1_000, 8_000) * rng.choice([-1, 1])
+            delta = np.array([step, 0.0]) if s % 2 == 0 else np.array([0.0, step])
+            pts.append(pts[-1] + delta)
+        conn_type = "pipe" if i % 3 == 0 else "conveyor"
+        connections.append((conn_type, np.array(pts)))
+    return connections
+
+
+def naive_per_segment(connections):
+    """The old approach: a trimesh primitive per segment, concatenated at the end."""
+    import trimesh
+
+    meshes = []
+    for conn_type, pts in connections:
+        for a, b in zip(pts[:-1], pts[1:]):
+            length = float(np.linalg.norm(b - a))
+            angle = float(np.arctan2(b[1] - a[1], b[0] - a[0]))
+            mid = (a + b) / 2.0
+            if "pipe" in conn_type:
+                prim = trimesh.creation.cylinder(radius=100.0, height=length, sections=12)
+                prim.apply_transform(trimesh.transformations.rotation_matrix(np.pi / 2, [0, 1, 0]))
+                z = 2500.0
+            else:
+                prim = trimesh.creation.box(extents=(length, 800.0, 150.0))
+                z = 825.0
+            prim.apply_transform(trimesh.transformations.rotation_matrix(angle, [0, 0, 1]))
+            prim.apply_translation([mid[0], mid[1], z])
+            meshes.append(prim)
+    return trimesh.util.concatenate(meshes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--connections", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--skip-naive", action="store_true", help="Do not time the per-segment trimesh path")
+    args = parser.parse_args()
+
+    connections = random_manhattan_paths(args.connections)
+    segments = sum(len(p) - 1 for _, p in connections)
+    print(f"Connections: {args.connections}  Segments: {segments}")
+
+    builder = ConnectionGeometryBuilder()
+    timings = []
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        buffers = builder.build(connections)
+        timings.append(time.perf_counter() - t0)
+
+    for kind, buf in buffers.items():
+        print(f"  {kind:<9} vertices={len(buf.vertices):>9,} triangles={len(buf.indices):>9,}")
+    print(f"Batched NumPy:    best {min(timings) * 1000:8.1f} ms   median {np.median(timings) * 1000:8.1f} ms")
+
+    if not args.skip_naive:
+        try:
+            t0 = time.perf_counter()
+            naive_per_segment(connections)
+            print(f"Per-segment mesh: {(time.perf_counter() - t0) * 1000:8.1f} ms")
+        except ImportError:
+            print("trimesh not installed; skipping per-segment baseline.")
+
+
+if __name__ == "__main__":
+    main()
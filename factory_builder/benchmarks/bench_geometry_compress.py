@@ -0,0 +1,83 @@
+"""
+Benchmark: bytes on the wire for the Twin's scene, plain vs. meshopt (gltfpack -cc),
+each as served (identity / gzip / brotli sidecars). Needs gltfpack on PATH.
+
+Usage (from repo root):
+    python factory_builder/benchmarks/bench_geometry_compress.py --machines 200
+    python factory_builder/benchmarks/bench_geometry_compress.py --scene factory_builder/data/<proj>/scene/factory_complete.glb
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(os.getcwd())
+
+from factory_builder.services.geometry_compress import GeometryCompressor
+from factory_builder.services.glb_io import StreamingGLBWriter
+from factory_builder.services.precompress import write_sidecars
+
+
+def synthetic_scene(path: Path, machines: int, segments: int = 64):
+    """One UV-sphere-like machine body (with normals) per machine, laid out on a grid."""
+    u, v = np.meshgrid(np.linspace(0, 2 * np.pi, segments), np.linspace(0, np.pi, segments))
+    normals = np.stack([np.cos(u) * np.sin(v), np.cos(v), np.sin(u) * np.sin(v)], axis=-1).reshape(-1, 3)
+    quads = np.arange((segments - 1) * segments).reshape(segments - 1, segments)[:, :-1].reshape(-1)
+    indices = np.stack([quads, quads + segments, quads + 1, quads + 1, quads + segments, quads + segments + 1], axis=1)
+
+    with StreamingGLBWriter(path) as writer:
+        for i in range(machines):
+            matrix = np.eye(4)
+            matrix[:3, 3] = [(i % 20) * 4000.0, 0.0, (i // 20) * 4000.0]
+            group = writer.add_group(f"M{i}", matrix=matrix, extras={"machine_id": f"M{i}"})
+            writer.add_mesh(f"M{i}_body", normals * 1000.0, indices, normals=normals, parent=group)
+
+
+def served_sizes(path: Path) -> dict:
+    write_sidecars(path)
+    sizes = {"identity": path.stat().st_size}
+    for encoding, ext in (("gzip", ".gz"), ("br", ".br")):
+        sidecar = Path(str(path) + ext)
+        if sidecar.exists():
+            sizes[encoding] = sidecar.stat().st_size
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plain vs. meshopt scene transfer size")
+    parser.add_argument("--scene", type=Path, help="Existing GLB (default: synthetic scene)")
+    parser.add_argument("--machines", type=int, default=200)
+    args = parser.parse_args()
+
+    compressor = GeometryCompressor(mode="meshopt")
+    if not compressor.enabled:
+        sys.exit("gltfpack not found on PATH")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        scene = Path(tmp) / "factory_complete.glb"
+        if args.scene:
+            shutil.copyfile(args.scene, scene)
+        else:
+            synthetic_scene(scene, args.machines)
+
+        started = time.perf_counter()
+        packed = compressor.compress(scene)
+        elapsed = time.perf_counter() - started
+        if packed is None:
+            sys.exit("meshopt variant not smaller than the source")
+
+        plain, meshopt = served_sizes(scene), served_sizes(packed)
+        print(f"gltfpack: {elapsed:.2f}s")
+        print(f"{'encoding':>9} {'plain MB':>10} {'meshopt MB':>11} {'ratio':>7}")
+        for encoding, size in plain.items():
+            other = meshopt.get(encoding, meshopt["identity"])
+            print(f"{encoding:>9} {size / 1e6:>10.2f} {other / 1e6:>11.2f} {size / other:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
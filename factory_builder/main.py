@@ -1,5 +1,9 @@
 import json
+import os
 import shutil
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 from loguru import logger
 
@@ -8,11 +12,22 @@ from factory_builder.services.web_scraper import ImageScraper
 from factory_builder.services.cloud_client import CloudRenderer
 from factory_builder.services.scene_composer import SceneComposer
 from factory_builder.services.dxf_parser import DxfParser
+from factory_builder.services.image_dedup import ReferenceImageIndex
+from factory_builder.services.texture_stage import TextureStage
+from factory_builder.services.camera_map import publish_camera_map
+from factory_builder.services.placeholders import build_placeholder_glb
+from factory_builder.services.precompress import write_sidecars
+from factory_builder.services.geometry_compress import GeometryCompressor
+from factory_builder.services.scene_chunks import write_scene_chunks
+from factory_builder.services.video_studio.manager import VideoStudio
 from factory_builder.utils import sanitize_filename, get_logger
 
 # Initialize main logger
 log = get_logger("BuilderMain")
 
+# Late models finishing within this window are swapped in with one recompose
+HOT_SWAP_SETTLE_SECONDS = 5.0
+
 class FactoryBuilder:
     def __init__(self, context):
         """
@@ -26,6 +41,9 @@ class FactoryBuilder:
         self.machines_dir = self.project_root / "machines"
         self.scene_dir = self.project_root / "scene"
 
+        # Shared across projects: factory_builder/data/.cache/
+        self.cache_root = self.project_root.parent / ".cache"
+
     def execute(self):
         log.info("="*60)
         log.info(f"🔨 FACTORY BUILDER STARTED: {self.ctx.project_name}")
@@ -44,81 +62,249 @@ class FactoryBuilder:
         layout = DxfParser().parse(str(self.ctx.shared_dxf))
         log.info(f"📋 Layout loaded: {len(layout.entities)} entities")
 
-        # 3. ASSET PIPELINE (Images & Models)
-        self._process_assets(layout)
-
+        # 3. ASSET PIPELINE (Images & Models), bounded by ASSET_BUDGET_SECONDS
+        # Machines still waiting on the GPU get a placeholder; the real model arrives later
+        pending = self._process_assets(layout)
 
         # 4. SCENE CONSTRUCTION
+        if self._compose(layout):
+            log.success(f"🎉 BUILD COMPLETE")
+
+            if pending:
+                # 5. HOT-SWAP late models, then render the video of the final scene
+                threading.Thread(target=self._hot_swap, args=(layout, pending), name="hot-swap", daemon=False).start()
+            else:
+                self._start_video()
+        else:
+            log.error("❌ Scene composition failed.")
+
+    def _compose(self, layout) -> bool:
+        """
+        Composes the scene, processes textures and publishes the camera map.
+        The scene is built next to the live one and swapped in atomically,
+        since the Twin may already be showing it.
+        """
         log.info("🏗️  Assembling Final Scene...")
         self.scene_dir.mkdir(parents=True, exist_ok=True)
         final_scene_path = self.ctx.final_scene_glb
-        
+        staging_path = final_scene_path.with_name(final_scene_path.stem + ".staging.glb")
+
         composer = SceneComposer()
-        success = composer.build(layout, str(final_scene_path))
-        
-        if success:
-            log.success(f"🎉 BUILD COMPLETE")
-            
-            # 5. VIDEO PRODUCTION (New Step)
-            log.info("🎥 Starting Video Production Phase...")
-            studio = VideoStudio(self.ctx)
-            studio.produce()
-            
-        else:
-            log.error("❌ Scene composition failed.")        
-        
+        if not composer.build(layout, str(staging_path)):
+            return False
+
+        # 4b. TEXTURES (Dedupe + Downscale, cached per texture hash)
+        try:
+            TextureStage(self.cache_root / "textures").process(staging_path)
+        except (OSError, ValueError) as e:
+            log.warning(f"⚠️ Texture stage skipped (scene keeps its original textures): {e}")
+        os.replace(staging_path, final_scene_path)
+        # Served by the Twin's asset server per Accept-Encoding (older sidecars are ignored)
+        write_sidecars(final_scene_path)
+        # Meshopt variant the Twin loads instead (when gltfpack is installed)
+        compressor = GeometryCompressor()
+        compressor.compress(final_scene_path)
+
+        # 4c. CAMERA MAP (Published now, no need to wait for the video)
+        machine_ids = self._contract_machine_ids()
+        self._publish_camera_map(final_scene_path, machine_ids)
+
+        # 4d. CHUNKS (The Twin streams machines progressively instead of one big GLB)
+        try:
+            write_scene_chunks(final_scene_path, self.scene_dir / "chunks", machine_ids, compressor)
+        except (OSError, ValueError) as e:
+            log.warning(f"⚠️ Scene chunks not written (Twin falls back to the full scene): {e}")
+        return True
+
+    def _start_video(self):
+        # 5. VIDEO PRODUCTION (Background: the Twin can open the scene right away)
+        log.info("🎥 Starting Video Production Phase...")
+        studio = VideoStudio(self.ctx)
+        studio.start()
+
+    def _hot_swap(self, layout, pending: dict):
+        """
+        Waits for the background model jobs; each batch that finishes replaces its
+        placeholders and recomposes the scene. The video starts on the final scene.
+        """
+        remaining = dict(pending)
+        while remaining:
+            done, _ = wait(remaining, return_when=FIRST_COMPLETED)
+            # Give close finishers a moment so they share one recompose
+            more, _ = wait([f for f in remaining if f not in done], timeout=HOT_SWAP_SETTLE_SECONDS)
+            done |= more
+
+            swapped = []
+            for future in done:
+                machine = remaining.pop(future)
+                model_path = self._asset_result(future, machine)
+                if model_path:
+                    machine.model_path = str(model_path)
+                    swapped.append(machine.name)
+
+            if swapped:
+                log.info(f"🔁 Hot-swapping {len(swapped)} real model(s) into the scene ({len(remaining)} still pending)")
+                if self._compose(layout):
+                    log.success(f"🔁 Scene updated with: {', '.join(swapped)}")
 
-    def _process_assets(self, layout):
+        self._start_video()
+
+    def _process_assets(self, layout) -> dict:
         """
-        Iterates through machines, creating folders and generating assets.
+        Fetches images and generates models for all machines on a thread pool
+        (MAX_WORKERS), within a per-build latency budget (ASSET_BUDGET_SECONDS).
+
+        Machines without a model at the deadline, or whose generation failed, get a
+        parametric placeholder from their DXF footprint.
+        :return: {future: machine} of jobs still running in the background
         """
         scraper = ImageScraper()
         renderer = CloudRenderer()
+        dedup = ReferenceImageIndex(self.cache_root / "reference_index.json")
 
         machines = [e for e in layout.entities if e.type == "MACHINE"]
         total = len(machines)
+        budget = float(os.getenv("ASSET_BUDGET_SECONDS") or 600)
+        workers = int(os.getenv("MAX_WORKERS") or 1)
 
-        log.info(f"🎨 Starting Asset Pipeline for {total} machines...")
-
-        for idx, machine in enumerate(machines, 1):
-            log.info(f"🔹 [{idx}/{total}] Machine: {machine.name}")
+        log.info(f"🎨 Starting Asset Pipeline for {total} machines ({workers} workers, budget {budget:.0f}s)...")
+        deadline = time.monotonic() + budget
 
-            # A. Create Unique Folder for this Machine
-            # Path: factory_builder/data/<project>/machines/<Safe_Name>/
-            safe_name = sanitize_filename(machine.name)
-            machine_folder = self.machines_dir / safe_name
-            machine_folder.mkdir(parents=True, exist_ok=True)
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="asset")
+        futures = {
+            pool.submit(self._build_machine_asset, machine, idx, total, scraper, renderer, dedup): machine
+            for idx, machine in enumerate(machines, 1)
+        }
+        # Jobs keep running after the deadline; the pool is not joined here
+        pool.shutdown(wait=False)
 
-            # Define specific file paths for this machine
-            img_path = machine_folder / "reference_image.png"
-            model_path = machine_folder / "3d_model.glb"
+        done, not_done = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+        dims = self._machine_dimensions()
 
-            # B. Scrape Image (If missing)
-            if not img_path.exists():
-                log.info(f"     📷 Scraping reference image...")
-                success = scraper.find_and_save(machine.name, img_path)
-                if success:
-                    log.info("     ✅ Image saved.")
-                    machine.image_path = str(img_path)
-                else:
-                    log.warning(f"     ⚠️ Image scrape failed.")
+        for future in done:
+            machine = futures[future]
+            model_path = self._asset_result(future, machine)
+            if model_path:
+                machine.model_path = str(model_path)
             else:
-                log.info("     ✅ Image already exists.")
+                self._use_placeholder(machine, dims)
+
+        pending = {future: futures[future] for future in not_done}
+        for machine in pending.values():
+            self._use_placeholder(machine, dims)
+        if pending:
+            log.warning(f"⏱️  Asset budget reached: {len(pending)}/{total} machines use placeholders until their model is ready")
+        return pending
+
+    def _build_machine_asset(self, machine, idx, total, scraper, renderer, dedup):
+        """
+        Image + 3D model for one machine (runs on the asset pool).
+        Returns the model path, or None if no model could be produced.
+        """
+        log.info(f"🔹 [{idx}/{total}] Machine: {machine.name}")
+
+        # A. Create Unique Folder for this Machine
+        # Path: factory_builder/data/<project>/machines/<Safe_Name>/
+        safe_name = sanitize_filename(machine.name)
+        machine_folder = self.machines_dir / safe_name
+        machine_folder.mkdir(parents=True, exist_ok=True)
+
+        # Define specific file paths for this machine
+        img_path = machine_folder / "reference_image.png"
+        model_path = machine_folder / "3d_model.glb"
+
+        # B. Scrape Image (If missing)
+        if not img_path.exists():
+            log.info(f"     📷 Scraping reference image...")
+            success = scraper.find_and_save(machine.name, img_path)
+            if success:
+                log.info("     ✅ Image saved.")
                 machine.image_path = str(img_path)
+            else:
+                log.warning(f"     ⚠️ Image scrape failed.")
+        else:
+            log.info("     ✅ Image already exists.")
+            machine.image_path = str(img_path)
 
-            # C. Generate 3D Model (If missing and image exists)
-            if not model_path.exists():
-                if machine.image_path:
-                    log.info(f"     🧠 Generating 3D Model (Cloud GPU)...")
-                    success = renderer.generate(machine.image_path, model_path)
-                    if success:
-                        machine.model_path = str(model_path)
+        # C. Generate 3D Model (If missing and image exists)
+        if not model_path.exists():
+            if machine.image_path:
+                # Near-duplicate reference images share one GPU generation
+                claim, reuse_path = dedup.acquire(machine.image_path)
+                if reuse_path:
+                    log.info(f"     ♻️  Reusing model of near-duplicate image: {reuse_path}")
+                    shutil.copy(reuse_path, model_path)
                 else:
-                    log.warning("     ⚠️ Skipping 3D gen (no image).")
+                    log.info(f"     🧠 Generating 3D Model (Cloud GPU)...")
+                    completed = False
+                    try:
+                        if renderer.generate(machine.image_path, model_path):
+                            dedup.complete(claim, model_path)
+                            completed = True
+                    finally:
+                        if not completed:
+                            dedup.fail(claim)  # Waiters must never block on a job that died
             else:
-                log.info("     ✅ 3D Model already exists.")
-                machine.model_path = str(model_path)
+                log.warning("     ⚠️ Skipping 3D gen (no image).")
+        else:
+            log.info("     ✅ 3D Model already exists.")
+            if machine.image_path:
+                dedup.register(machine.image_path, model_path)
+
+        # D. Ensure Composer knows the path (even if cached)
+        return model_path if model_path.exists() else None
+
+    def _asset_result(self, future, machine):
+        try:
+            return future.result()
+        except Exception as e:
+            log.error(f"❌ Asset job failed for {machine.name}: {e}")
+            return None
+
+    def _use_placeholder(self, machine, dims: dict):
+        """Points the machine at a parametric placeholder built from its footprint."""
+        footprint = dims.get(getattr(machine, "id", None)) or dims.get(machine.name)
+        if not footprint:
+            log.warning(f"     ⚠️ No dimensions for {machine.name}; no placeholder.")
+            return
+
+        placeholder = self.machines_dir / sanitize_filename(machine.name) / "placeholder.glb"
+        if not placeholder.exists():
+            build_placeholder_glb(placeholder, *footprint, name=sanitize_filename(machine.name))
+        machine.model_path = str(placeholder)
+        log.info(f"     🧱 Placeholder for {machine.name} ({footprint[0]:.0f} x {footprint[1]:.0f} mm)")
+
+    def _contract_machine_ids(self) -> list:
+        with open(self.ctx.shared_json, "r") as f:
+            contract = json.load(f)
+        return [m.get("id", m.get("name")) for m in contract.get("machines", [])]
+
+    def _publish_camera_map(self, scene_path, machine_ids: list):
+        """
+        Computes per-machine snap coordinates from the composed scene and
+        publishes them to the Shared Bridge for the Twin (and the Blender script).
+        """
+        try:
+            publish_camera_map(
+                scene_path,
+                machine_ids,
+                [self.ctx.builder_scene / "camera_map.json", self.ctx.shared_root / "camera_map.json"],
+            )
+        except (OSError, ValueError) as e:
+            log.warning(f"⚠️ Camera map not published: {e}")
+
+    def _machine_dimensions(self) -> dict:
+        """
+        Footprints from the contract, indexed by machine ID and name.
+        """
+        with open(self.ctx.shared_json, "r") as f:
+            contract = json.load(f)
 
-            # D. Ensure Composer knows the path (even if cached)
-            if model_path.exists():
-                machine.model_path = str(model_path)
\ No newline at end of file
+        dims = {}
+        for m in contract.get("machines", []):
+            d = m.get("dimensions", {})
+            if "length" in d and "width" in d:
+                footprint = (float(d["length"]), float(d["width"]))
+                dims[m.get("id")] = footprint
+                dims[m.get("name")] = footprint
+        return dims
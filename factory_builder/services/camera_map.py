@@ -0,0 +1,162 @@
+"""
+Per-machine camera snap coordinates computed straight from the composed GLB.
+
+Bounds come from the POSITION accessors' min/max (mandatory in glTF), so
+no vertex data is read. All machine boxes are transformed to world space
+in one batched NumPy pass. The map is in the GLB's own coordinate frame,
+which is what the Three.js viewer uses.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from factory_builder.services.glb_io import read_glb
+from factory_builder.utils import get_logger
+
+log = get_logger("CameraMap")
+
+ZOOM_FACTOR = 2.5  # Same framing as SceneComposer._compute_camera_coords
+
+# Unit cube corners used to expand (min, max) into 8 points
+_CORNERS = np.array([[i, j, k] for i in (0, 1) for j in (0, 1) for k in (0, 1)], dtype=np.float64)
+
+
+def _local_matrix(node: dict) -> np.ndarray:
+    if "matrix" in node:
+        return np.asarray(node["matrix"], dtype=np.float64).reshape(4, 4).T
+
+    t = np.asarray(node.get("translation", [0, 0, 0]), dtype=np.float64)
+    x, y, z, w = node.get("rotation", [0, 0, 0, 1])
+    s = np.asarray(node.get("scale", [1, 1, 1]), dtype=np.float64)
+    rot = np.array([
+        [1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)],
+        [2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)],
+        [2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)],
+    ])
+    m = np.eye(4)
+    m[:3, :3] = rot * s[None, :]
+    m[:3, 3] = t
+    return m
+
+
+def _mesh_bounds(gltf: dict, mesh_index: int) -> Optional[np.ndarray]:
+    """Local (2, 3) AABB of a mesh from its POSITION accessor bounds."""
+    lo, hi = [], []
+    for prim in gltf["meshes"][mesh_index].get("primitives", []):
+        acc_idx = prim.get("attributes", {}).get("POSITION")
+        if acc_idx is None:
+            continue
+        acc = gltf["accessors"][acc_idx]
+        if "min" in acc and "max" in acc:
+            lo.append(acc["min"])
+            hi.append(acc["max"])
+    if not lo:
+        return None
+    return np.array([np.min(lo, axis=0), np.max(hi, axis=0)], dtype=np.float64)
+
+
+def root_bounds(gltf: dict) -> Dict[int, np.ndarray]:
+    """
+    World-space (2, 3) AABB of every scene root's subtree.
+    Traversal is a plain walk over nodes; the box math is batched.
+    """
+    nodes = gltf.get("nodes", [])
+    scenes = gltf.get("scenes", [])
+    roots = scenes[gltf.get("scene", 0)].get("nodes", []) if scenes else []
+
+    owners, matrices, boxes = [], [], []
+    mesh_cache = {}
+    for root in roots:
+        stack = [(root, np.eye(4))]
+        while stack:
+            idx, parent = stack.pop()
+            node = nodes[idx]
+            world = parent @ _local_matrix(node)
+            if "mesh" in node:
+                if node["mesh"] not in mesh_cache:
+                    mesh_cache[node["mesh"]] = _mesh_bounds(gltf, node["mesh"])
+                box = mesh_cache[node["mesh"]]
+                if box is not None:
+                    owners.append(root)
+                    matrices.append(world)
+                    boxes.append(box)
+            stack.extend((c, world) for c in node.get("children", []))
+
+    if not boxes:
+        return {}
+
+    boxes = np.asarray(boxes)        # (M, 2, 3)
+    matrices = np.asarray(matrices)  # (M, 4, 4)
+    owners = np.asarray(owners)
+
+    # (M, 8, 3) local corners -> world space in one einsum
+    corners = boxes[:, 0, None, :] + _CORNERS[None, :, :] * (boxes[:, 1, None, :] - boxes[:, 0, None, :])
+    world = np.einsum("mij,mkj->mki", matrices[:, :3, :3], corners) + matrices[:, None, :3, 3]
+    lo, hi = world.min(axis=1), world.max(axis=1)
+
+    # Reduce per root
+    order = np.argsort(owners, kind="stable")
+    owners, lo, hi = owners[order], lo[order], hi[order]
+    starts = np.flatnonzero(np.r_[True, owners[1:] != owners[:-1]])
+    lo = np.minimum.reduceat(lo, starts, axis=0)
+    hi = np.maximum.reduceat(hi, starts, axis=0)
+    return {int(owners[s]): np.stack([l, h]) for s, l, h in zip(starts, lo, hi)}
+
+
+def compute_camera_coords(centers: np.ndarray, sizes: np.ndarray):
+    """
+    Vectorized SceneComposer._compute_camera_coords:
+    target = bbox centre, position = centre + (max dimension * ZOOM_FACTOR) on every axis.
+    """
+    zoom = sizes.max(axis=1, keepdims=True) * ZOOM_FACTOR
+    return centers, centers + zoom
+
+
+def node_key(node: dict) -> Optional[str]:
+    extras = node.get("extras") or {}
+    return extras.get("machine_id") or node.get("name")
+
+
+def build_camera_map(scene_path: Path, machine_ids: Optional[Iterable[str]] = None) -> dict:
+    """
+    {machine_id: {"target": {x,y,z}, "position": {x,y,z}}} for every machine root node.
+    Root nodes that are not machines (conveyors, pipes, floor) are skipped.
+    """
+    gltf = read_glb(scene_path).gltf
+    bounds = root_bounds(gltf)
+
+    wanted = set(machine_ids or [])
+    keys, boxes = [], []
+    for root, box in bounds.items():
+        key = node_key(gltf["nodes"][root])
+        if key and (not wanted or key in wanted):
+            keys.append(key)
+            boxes.append(box)
+
+    if not boxes:
+        return {}
+
+    boxes = np.asarray(boxes)
+    targets, positions = compute_camera_coords(boxes.mean(axis=1), boxes[:, 1] - boxes[:, 0])
+
+    def _xyz(v):
+        return {"x": float(v[0]), "y": float(v[1]), "z": float(v[2])}
+
+    return {k: {"target": _xyz(t), "position": _xyz(p)} for k, t, p in zip(keys, targets, positions)}
+
+
+def publish_camera_map(scene_path: Path, machine_ids: List[str], destinations: List[Path]) -> dict:
+    """Computes the map and writes it atomically to every destination."""
+    camera_map = build_camera_map(scene_path, machine_ids)
+    for dst in destinations:
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dst.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(camera_map, f, indent=4)
+        os.replace(tmp, dst)
+
+    log.info(f"📍 Camera map for {len(camera_map)} machines published to: {destinations[-1]}")
+    return camera_map
@@ -0,0 +1,279 @@
+"""
+Batched geometry for flow connections (conveyors & pipes).
+
+Every connection polyline computed by the Architect is swept in a single
+NumPy pass per connection type. The result is ONE vertex buffer and ONE
+index buffer per type instead of one trimesh primitive per segment.
+"""
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+CONVEYOR = "conveyor"
+PIPE = "pipe"
+
+# Unit box corners, indexed as (end * 4 + side * 2 + level).
+# end: 0 = segment start, 1 = segment end
+# side: 0 = right of travel, 1 = left of travel
+# level: 0 = bottom, 1 = top
+_BOX_END = np.array([0, 0, 0, 0, 1, 1, 1, 1])
+_BOX_SIDE = np.array([-1.0, -1.0, 1.0, 1.0, -1.0, -1.0, 1.0, 1.0])
+_BOX_LEVEL = np.array([0, 1, 0, 1, 0, 1, 0, 1])
+
+
+def _box_faces() -> np.ndarray:
+    """Triangle template (12 x 3) for the unit box, wound outwards."""
+    quads = [
+        [(0, 0, 0), (0, 1, 0), (1, 1, 0), (1, 0, 0)],  # bottom
+        [(0, 0, 1), (1, 0, 1), (1, 1, 1), (0, 1, 1)],  # top
+        [(0, 0, 0), (1, 0, 0), (1, 0, 1), (0, 0, 1)],  # right side
+        [(0, 1, 0), (0, 1, 1), (1, 1, 1), (1, 1, 0)],  # left side
+        [(0, 0, 0), (0, 0, 1), (0, 1, 1), (0, 1, 0)],  # start cap
+        [(1, 0, 0), (1, 1, 0), (1, 1, 1), (1, 0, 1)],  # end cap
+    ]
+    faces = []
+    for quad in quads:
+        a, b, c, d = [e * 4 + s * 2 + l for e, s, l in quad]
+        faces.append((a, b, c))
+        faces.append((a, c, d))
+    return np.array(faces, dtype=np.int64)
+
+
+_BOX_FACES = _box_faces()
+
+
+def connection_kind(conn_type: str) -> Optional[str]:
+    """
+    Maps a DXF connection type to the geometry it is drawn with.
+    Mirrors the Architect's layer mapping; AGV paths are floor markings only.
+    """
+    ct = (conn_type or "").lower()
+    if "pipe" in ct or "pump" in ct:
+        return PIPE
+    if "agv" in ct:
+        return None
+    return CONVEYOR
+
+
+@dataclass
+class ConnectionBuffer:
+    """A single batched mesh: float32 vertices (N, 3) and uint32 triangles (M, 3)."""
+    vertices: np.ndarray
+    indices: np.ndarray
+
+    @property
+    def is_empty(self) -> bool:
+        return len(self.indices) == 0
+
+    def to_trimesh(self):
+        import trimesh
+        return trimesh.Trimesh(vertices=self.vertices, faces=self.indices, process=False)
+
+
+def _empty_buffer() -> ConnectionBuffer:
+    return ConnectionBuffer(
+        vertices=np.zeros((0, 3), dtype=np.float32),
+        indices=np.zeros((0, 3), dtype=np.uint32),
+    )
+
+
+def _flatten_paths(paths: Sequence[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """Concatenates polylines into one point array plus a path id per point."""
+    counts = np.array([len(p) for p in paths], dtype=np.int64)
+    points = np.concatenate(paths, axis=0)[:, :2].astype(np.float64)
+    path_ids = np.repeat(np.arange(len(paths)), counts)
+    return points, path_ids
+
+
+def _segments_and_bends(points: np.ndarray, path_ids: np.ndarray, eps: float = 1e-6):
+    """
+    Returns (starts, ends) of every non-degenerate segment and
+    (bend_points, incoming_dirs) of every interior vertex where the path turns.
+    """
+    same_path = path_ids[:-1] == path_ids[1:]
+    starts = points[:-1][same_path]
+    ends = points[1:][same_path]
+
+    lengths = np.linalg.norm(ends - starts, axis=1)
+    keep = lengths > eps
+    starts, ends = starts[keep], ends[keep]
+
+    # Bends: interior points whose incoming and outgoing directions differ
+    if len(points) < 3:
+        return starts, ends, np.zeros((0, 2)), np.zeros((0, 2))
+
+    interior = same_path[:-1] & same_path[1:]
+    prev_pts, mid_pts, next_pts = points[:-2], points[1:-1], points[2:]
+    d_in = mid_pts - prev_pts
+    d_out = next_pts - mid_pts
+    n_in = np.linalg.norm(d_in, axis=1)
+    n_out = np.linalg.norm(d_out, axis=1)
+    valid = interior & (n_in > eps) & (n_out > eps)
+
+    d_in = d_in[valid] / n_in[valid, None]
+    d_out = d_out[valid] / n_out[valid, None]
+    cross = d_in[:, 0] * d_out[:, 1] - d_in[:, 1] * d_out[:, 0]
+    dot = np.einsum("ij,ij->i", d_in, d_out)
+    bends = (np.abs(cross) > eps) | (dot < 0)
+
+    return starts, ends, mid_pts[valid][bends], d_in[bends]
+
+
+def _horizontal_frame(starts: np.ndarray, ends: np.ndarray):
+    """Unit travel direction and its left-hand horizontal normal per segment."""
+    direction = ends - starts
+    direction /= np.linalg.norm(direction, axis=1)[:, None]
+    normal = np.stack([-direction[:, 1], direction[:, 0]], axis=1)
+    return direction, normal
+
+
+class ConnectionGeometryBuilder:
+    """
+    Sweeps all connection paths of a layout into batched buffers.
+    Units follow the DXF (mm), Z is up.
+    """
+
+    def __init__(
+        self,
+        conveyor_width: float = 800.0,
+        conveyor_thickness: float = 150.0,
+        conveyor_elevation: float = 900.0,
+        pipe_radius: float = 100.0,
+        pipe_elevation: float = 2500.0,
+        pipe_sides: int = 12,
+        joint_rings: int = 6,
+    ):
+        self.conveyor_width = conveyor_width
+        self.conveyor_thickness = conveyor_thickness
+        self.conveyor_elevation = conveyor_elevation
+        self.pipe_radius = pipe_radius
+        self.pipe_elevation = pipe_elevation
+        self.pipe_sides = pipe_sides
+        self.joint_rings = joint_rings
+
+    def build(self, connections: Iterable[Tuple[str, Sequence[Sequence[float]]]]) -> Dict[str, ConnectionBuffer]:
+        """
+        :param connections: (connection_type, path_points) pairs; points are (x, y)
+        :return: {"conveyor": ConnectionBuffer, "pipe": ConnectionBuffer}
+        """
+        grouped = {CONVEYOR: [], PIPE: []}
+        for conn_type, points in connections:
+            kind = connection_kind(conn_type)
+            pts = np.asarray(points, dtype=np.float64)
+            if kind is None or pts.ndim != 2 or len(pts) < 2:
+                continue
+            grouped[kind].append(pts)
+
+        return {
+            CONVEYOR: self.build_conveyors(grouped[CONVEYOR]),
+            PIPE: self.build_pipes(grouped[PIPE]),
+        }
+
+    # ------------------------------------------------------------------
+    # Conveyors: swept boxes, with a square joint box at every bend
+    # ------------------------------------------------------------------
+    def build_conveyors(self, paths: Sequence[np.ndarray]) -> ConnectionBuffer:
+        if not paths:
+            return _empty_buffer()
+
+        points, path_ids = _flatten_paths(paths)
+        starts, ends, bend_pts, bend_dirs = _segments_and_bends(points, path_ids)
+
+        # A joint is a box one belt-width long, centred on the bend
+        half = self.conveyor_width / 2.0
+        starts = np.concatenate([starts, bend_pts - bend_dirs * half])
+        ends = np.concatenate([ends, bend_pts + bend_dirs * half])
+        if len(starts) == 0:
+            return _empty_buffer()
+
+        _, normal = _horizontal_frame(starts, ends)
+        seg_ends = np.stack([starts, ends], axis=1)  # (S, 2, 2)
+
+        xy = seg_ends[:, _BOX_END, :] + _BOX_SIDE[None, :, None] * normal[:, None, :] * half
+        z_top = self.conveyor_elevation
+        z_bottom = z_top - self.conveyor_thickness
+        z = np.broadcast_to(np.where(_BOX_LEVEL == 1, z_top, z_bottom), xy.shape[:2])
+
+        vertices = np.concatenate([xy, z[..., None]], axis=2).reshape(-1, 3)
+        offsets = (np.arange(len(starts)) * 8)[:, None, None]
+        indices = (_BOX_FACES[None, :, :] + offsets).reshape(-1, 3)
+
+        return ConnectionBuffer(vertices.astype(np.float32), indices.astype(np.uint32))
+
+    # ------------------------------------------------------------------
+    # Pipes: open tubes per segment, with a sphere joint at every bend
+    # ------------------------------------------------------------------
+    def build_pipes(self, paths: Sequence[np.ndarray]) -> ConnectionBuffer:
+        if not paths:
+            return _empty_buffer()
+
+        points, path_ids = _flatten_paths(paths)
+        starts, ends, bend_pts, _ = _segments_and_bends(points, path_ids)
+
+        tube_v, tube_f = self._tubes(starts, ends)
+        joint_v, joint_f = self._joints(bend_pts)
+
+        vertices = np.concatenate([tube_v, joint_v])
+        indices = np.concatenate([tube_f, joint_f + len(tube_v)])
+        return ConnectionBuffer(vertices.astype(np.float32), indices.astype(np.uint32))
+
+    def _tubes(self, starts: np.ndarray, ends: np.ndarray):
+        k = self.pipe_sides
+        if len(starts) == 0:
+            return np.zeros((0, 3)), np.zeros((0, 3), dtype=np.int64)
+
+        _, normal = _horizontal_frame(starts, ends)
+        theta = np.linspace(0.0, 2.0 * np.pi, k, endpoint=False)
+        cos_t, sin_t = np.cos(theta) * self.pipe_radius, np.sin(theta) * self.pipe_radius
+
+        # Ring offsets in the plane spanned by the horizontal normal and +Z
+        ring_xy = cos_t[None, :, None] * normal[:, None, :]           # (S, k, 2)
+        seg_ends = np.stack([starts, ends], axis=1)                     # (S, 2, 2)
+        xy = seg_ends[:, :, None, :] + ring_xy[:, None, :, :]          # (S, 2, k, 2)
+        z = np.broadcast_to(self.pipe_elevation + sin_t, xy.shape[:3])  # (S, 2, k)
+        vertices = np.concatenate([xy, z[..., None]], axis=3).reshape(-1, 3)
+
+        # Side quads between ring 0 (start) and ring 1 (end), wound outwards
+        ring = np.arange(k)
+        nxt = (ring + 1) % k
+        a, b, c, d = ring, nxt, nxt + k, ring + k
+        template = np.concatenate([np.stack([a, b, c], 1), np.stack([a, c, d], 1)])
+        offsets = (np.arange(len(starts)) * 2 * k)[:, None, None]
+        faces = (template[None, :, :] + offsets).reshape(-1, 3)
+        return vertices, faces
+
+    def _joints(self, centres: np.ndarray):
+        if len(centres) == 0:
+            return np.zeros((0, 3)), np.zeros((0, 3), dtype=np.int64)
+
+        template_v, template_f = self._sphere_template()
+        origin = np.concatenate([centres, np.full((len(centres), 1), self.pipe_elevation)], axis=1)
+        vertices = (origin[:, None, :] + template_v[None, :, :] * self.pipe_radius).reshape(-1, 3)
+        offsets = (np.arange(len(centres)) * len(template_v))[:, None, None]
+        faces = (template_f[None, :, :] + offsets).reshape(-1, 3)
+        return vertices, faces
+
+    def _sphere_template(self):
+        """Unit UV sphere with poles, (rings - 1) latitude bands and pipe_sides longitudes."""
+        k, rings = self.pipe_sides, self.joint_rings
+        phi = np.linspace(0.0, np.pi, rings + 1)[1:-1]
+        theta = np.linspace(0.0, 2.0 * np.pi, k, endpoint=False)
+        p, t = np.meshgrid(phi, theta, indexing="ij")
+        band = np.stack([np.sin(p) * np.cos(t), np.sin(p) * np.sin(t), np.cos(p)], axis=2).reshape(-1, 3)
+        vertices = np.concatenate([[[0.0, 0.0, 1.0]], band, [[0.0, 0.0, -1.0]]])
+
+        top, bottom = 0, len(vertices) - 1
+        col = np.arange(k)
+        nxt = (col + 1) % k
+        faces = [np.stack([np.full(k, top), 1 + col, 1 + nxt], 1)]
+        for r in range(rings - 2):
+            a = 1 + r * k + col
+            b = 1 + r * k + nxt
+            c = 1 + (r + 1) * k + nxt
+            d = 1 + (r + 1) * k + col
+            faces.append(np.stack([a, d, c], 1))
+            faces.append(np.stack([a, c, b], 1))
+        last = 1 + (rings - 2) * k
+        faces.append(np.stack([np.full(k, bottom), last + nxt, last + col], 1))
+        return vertices, np.concatenate(faces)
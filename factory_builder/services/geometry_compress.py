@@ -0,0 +1,82 @@
+"""
+Meshopt-compressed variants of the GLBs served to the Twin.
+
+`gltfpack -cc` (meshoptimizer) quantizes vertex attributes
+(KHR_mesh_quantization) and encodes buffers with EXT_meshopt_compression.
+Output is typically 3-8x smaller, and roughly 2x smaller again behind the
+gzip/brotli sidecars. The Twin decodes it with the vendored
+meshopt_decoder.module.js. Named nodes, materials and extras are kept,
+because the camera map and click-picking rely on them.
+
+The variant is written next to the source as <stem>.meshopt.glb. It is
+optional: without gltfpack on PATH (GLTFPACK_BIN), or with
+GEOMETRY_COMPRESSION=off, the Twin loads the plain GLB.
+"""
+import os
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Optional
+
+from factory_builder.services.precompress import write_sidecars
+from factory_builder.utils import get_logger
+
+log = get_logger("GeometryCompress")
+
+COMPRESSED_SUFFIX = ".meshopt.glb"
+TIMEOUT_SECONDS = 600
+
+
+def compressed_path(path: Path) -> Path:
+    """<stem>.meshopt.glb next to `path`."""
+    path = Path(path)
+    return path.with_name(path.stem + COMPRESSED_SUFFIX)
+
+
+class GeometryCompressor:
+    def __init__(self, mode: Optional[str] = None, binary: Optional[str] = None):
+        self.mode = (mode if mode is not None else os.getenv("GEOMETRY_COMPRESSION", "meshopt")).lower()
+        self.binary = binary or os.getenv("GLTFPACK_BIN", "gltfpack")
+
+        if self.mode not in ("meshopt", "off", ""):
+            log.warning(f"Unknown GEOMETRY_COMPRESSION={self.mode}. Geometry compression disabled.")
+            self.mode = "off"
+        if self.mode == "meshopt" and not shutil.which(self.binary):
+            log.warning(f"{self.binary} not found on PATH. Geometry compression disabled.")
+            self.mode = "off"
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode == "meshopt"
+
+    def compress(self, src: Path, dst: Optional[Path] = None) -> Optional[Path]:
+        """
+        Writes the compressed variant of `src` (plus sidecars) and returns its path.
+        Returns None, and removes any older variant, if disabled, failed or not smaller.
+        """
+        src = Path(src)
+        dst = Path(dst or compressed_path(src))
+        if not self.enabled:
+            dst.unlink(missing_ok=True)
+            return None
+
+        tmp = dst.with_name(dst.name + ".tmp.glb")
+        try:
+            subprocess.run(
+                [self.binary, "-i", str(src), "-o", str(tmp), "-cc", "-kn", "-km", "-ke"],
+                check=True, capture_output=True, timeout=TIMEOUT_SECONDS,
+            )
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError) as e:
+            stderr = getattr(e, "stderr", b"") or b""
+            log.warning(f"⚠️ gltfpack failed on {src.name}: {stderr.decode(errors='replace').strip() or e}")
+            tmp.unlink(missing_ok=True)
+            dst.unlink(missing_ok=True)
+            return None
+
+        if tmp.stat().st_size >= src.stat().st_size:
+            tmp.unlink()
+            dst.unlink(missing_ok=True)
+            return None
+        os.replace(tmp, dst)
+        write_sidecars(dst)
+        return dst
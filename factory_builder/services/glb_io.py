@@ -0,0 +1,568 @@
+"""
+Low-level GLB (binary glTF 2.0) reading and streaming writing.
+
+The writer never holds more than one source model in memory: buffer views
+are copied block-by-block into a temporary BIN chunk on disk, and the JSON
+header is only serialized once every model has been appended.
+"""
+import json
+import os
+import struct
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+GLB_MAGIC = 0x46546C67  # b"glTF"
+CHUNK_JSON = 0x4E4F534A
+CHUNK_BIN = 0x004E4942
+
+# glTF component types / buffer targets
+FLOAT = 5126
+UNSIGNED_INT = 5125
+ARRAY_BUFFER = 34962
+ELEMENT_ARRAY_BUFFER = 34963
+
+COPY_BLOCK = 1 << 20
+
+
+def _pad4(n: int) -> int:
+    return (4 - n % 4) % 4
+
+
+@dataclass
+class GlbFile:
+    """Parsed GLB header: the glTF JSON plus where the BIN chunk lives on disk."""
+    path: Path
+    gltf: dict
+    bin_offset: int
+    bin_length: int
+
+    def read_view(self, view_index: int) -> bytes:
+        """Reads a single buffer view. Use only for small views (images, indices)."""
+        view = self.gltf["bufferViews"][view_index]
+        with open(self.path, "rb") as f:
+            f.seek(self.bin_offset + view.get("byteOffset", 0))
+            return f.read(view["byteLength"])
+
+
+def read_glb(path) -> GlbFile:
+    """Reads the GLB header and JSON chunk only; the BIN chunk stays on disk."""
+    path = Path(path)
+    with open(path, "rb") as f:
+        magic, version, _length = struct.unpack("<III", f.read(12))
+        if magic != GLB_MAGIC:
+            raise ValueError(f"Not a GLB file: {path}")
+        if version != 2:
+            raise ValueError(f"Unsupported glTF version {version}: {path}")
+
+        json_len, json_type = struct.unpack("<II", f.read(8))
+        if json_type != CHUNK_JSON:
+            raise ValueError(f"First GLB chunk is not JSON: {path}")
+        gltf = json.loads(f.read(json_len))
+
+        bin_offset, bin_length = 0, 0
+        header = f.read(8)
+        if len(header) == 8:
+            bin_length, bin_type = struct.unpack("<II", header)
+            if bin_type == CHUNK_BIN:
+                bin_offset = f.tell()
+
+    return GlbFile(path=path, gltf=gltf, bin_offset=bin_offset, bin_length=bin_length)
+
+
+def matrix_to_gltf(matrix) -> List[float]:
+    """Row-major 4x4 (numpy/trimesh convention) -> column-major glTF list."""
+    return [float(v) for v in np.asarray(matrix, dtype=np.float64).reshape(4, 4).T.reshape(-1)]
+
+
+def _collect_nodes(gltf: dict, roots: Iterable[int]) -> List[int]:
+    nodes = gltf.get("nodes", [])
+    seen, stack = [], list(roots)
+    while stack:
+        idx = stack.pop()
+        if idx in seen:
+            continue
+        seen.append(idx)
+        stack.extend(nodes[idx].get("children", []))
+    return sorted(seen)
+
+
+def _texture_refs(obj) -> Iterable[dict]:
+    """Yields every textureInfo dict (`{"index": ...}`) nested in a material."""
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            if key.lower().endswith("texture") and isinstance(value, dict) and "index" in value:
+                yield value
+            yield from _texture_refs(value)
+    elif isinstance(obj, list):
+        for value in obj:
+            yield from _texture_refs(value)
+
+
+def _texture_sources(texture: dict) -> Iterable[dict]:
+    """The texture itself plus any image-source extensions (basisu, webp, ...)."""
+    if "source" in texture:
+        yield texture
+    for ext in texture.get("extensions", {}).values():
+        if isinstance(ext, dict) and "source" in ext:
+            yield ext
+
+
+class StreamingGLBWriter:
+    """
+    Builds a single GLB from many source models with bounded memory.
+
+    Usage:
+        with StreamingGLBWriter(out_path) as writer:
+            writer.add_glb(model_path, name="M1", matrix=transform)
+            writer.add_mesh("Conveyors", vertices, indices, color=(0.3, 0.3, 0.3, 1))
+    """
+
+    def __init__(self, output_path, tmp_dir: Optional[str] = None, generator: str = "factory_builder"):
+        self.output_path = Path(output_path)
+        self.gltf = {
+            "asset": {"version": "2.0", "generator": generator},
+            "scene": 0,
+            "scenes": [{"nodes": []}],
+            "nodes": [],
+            "meshes": [],
+            "accessors": [],
+            "bufferViews": [],
+            "materials": [],
+            "textures": [],
+            "images": [],
+            "samplers": [],
+        }
+        self._extensions_used = set()
+        self._extensions_required = set()
+
+        tmp_dir = tmp_dir or str(self.output_path.parent)
+        self._bin = tempfile.NamedTemporaryFile(dir=tmp_dir, prefix=".glb_bin_", delete=False)
+        self._bin_length = 0
+        self._closed = False
+
+    # ------------------------------------------------------------------
+    # Context manager
+    # ------------------------------------------------------------------
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    # ------------------------------------------------------------------
+    # Binary chunk
+    # ------------------------------------------------------------------
+    def _align(self):
+        pad = _pad4(self._bin_length)
+        if pad:
+            self._bin.write(b"\x00" * pad)
+            self._bin_length += pad
+
+    def _append_bytes(self, data: bytes) -> int:
+        self._align()
+        offset = self._bin_length
+        self._bin.write(data)
+        self._bin_length += len(data)
+        return offset
+
+    def _append_from_file(self, src, offset: int, length: int) -> int:
+        """Copies `length` bytes from an open file, COPY_BLOCK at a time."""
+        self._align()
+        start = self._bin_length
+        src.seek(offset)
+        remaining = length
+        while remaining:
+            block = src.read(min(COPY_BLOCK, remaining))
+            if not block:
+                raise ValueError("Unexpected end of GLB binary chunk")
+            self._bin.write(block)
+            remaining -= len(block)
+        self._bin_length += length
+        return start
+
+    def _add_view(self, offset: int, length: int, **extra) -> int:
+        view = {"buffer": 0, "byteOffset": offset, "byteLength": length}
+        view.update({k: v for k, v in extra.items() if v is not None})
+        self.gltf["bufferViews"].append(view)
+        return len(self.gltf["bufferViews"]) - 1
+
+    def _add_accessor(self, array: np.ndarray, component_type: int, acc_type: str, target: int, bounds: bool = False) -> int:
+        data = np.ascontiguousarray(array)
+        offset = self._append_bytes(data.tobytes())
+        view = self._add_view(offset, data.nbytes, target=target)
+        accessor = {
+            "bufferView": view,
+            "componentType": component_type,
+            "count": int(len(data) if acc_type != "SCALAR" else data.size),
+            "type": acc_type,
+        }
+        if bounds and len(data):
+            accessor["min"] = [float(v) for v in data.min(axis=0)]
+            accessor["max"] = [float(v) for v in data.max(axis=0)]
+        self.gltf["accessors"].append(accessor)
+        return len(self.gltf["accessors"]) - 1
+
+    # ------------------------------------------------------------------
+    # Scene graph
+    # ------------------------------------------------------------------
+    def _add_node(self, node: dict, parent: Optional[int]) -> int:
+        self.gltf["nodes"].append(node)
+        idx = len(self.gltf["nodes"]) - 1
+        if parent is None:
+            self.gltf["scenes"][0]["nodes"].append(idx)
+        else:
+            self.gltf["nodes"][parent].setdefault("children", []).append(idx)
+        return idx
+
+    def add_group(self, name: str, matrix=None, extras: Optional[dict] = None, parent: Optional[int] = None) -> int:
+        """Adds an empty node to parent other nodes under."""
+        node = {"name": name}
+        if matrix is not None:
+            node["matrix"] = matrix_to_gltf(matrix)
+        if extras:
+            node["extras"] = extras
+        return self._add_node(node, parent)
+
+    def add_mesh(
+        self,
+        name: str,
+        vertices: np.ndarray,
+        indices: np.ndarray,
+        color=None,
+        normals: Optional[np.ndarray] = None,
+        matrix=None,
+        extras: Optional[dict] = None,
+        parent: Optional[int] = None,
+    ) -> int:
+        """Appends a triangle mesh from NumPy buffers. Returns the node index."""
+        vertices = np.asarray(vertices, dtype=np.float32).reshape(-1, 3)
+        indices = np.asarray(indices, dtype=np.uint32).reshape(-1)
+
+        attributes = {"POSITION": self._add_accessor(vertices, FLOAT, "VEC3", ARRAY_BUFFER, bounds=True)}
+        if normals is not None:
+            normals = np.asarray(normals, dtype=np.float32).reshape(-1, 3)
+            attributes["NORMAL"] = self._add_accessor(normals, FLOAT, "VEC3", ARRAY_BUFFER)
+
+        primitive = {
+            "attributes": attributes,
+            "indices": self._add_accessor(indices, UNSIGNED_INT, "SCALAR", ELEMENT_ARRAY_BUFFER),
+            "mode": 4,
+        }
+        if color is not None:
+            rgba = [float(c) for c in color] + [1.0] * (4 - len(color))
+            self.gltf["materials"].append({
+                "name": f"{name}_Material",
+                "pbrMetallicRoughness": {"baseColorFactor": rgba[:4], "metallicFactor": 0.1, "roughnessFactor": 0.7},
+            })
+            primitive["material"] = len(self.gltf["materials"]) - 1
+
+        self.gltf["meshes"].append({"name": name, "primitives": [primitive]})
+        node = {"name": name, "mesh": len(self.gltf["meshes"]) - 1}
+        if matrix is not None:
+            node["matrix"] = matrix_to_gltf(matrix)
+        if extras:
+            node["extras"] = extras
+        return self._add_node(node, parent)
+
+    def add_glb(
+        self,
+        path,
+        name: str,
+        matrix=None,
+        extras: Optional[dict] = None,
+        roots: Optional[List[int]] = None,
+        parent: Optional[int] = None,
+    ) -> int:
+        """
+        Appends a GLB model under a new wrapper node and returns its index.
+        Only the buffer views actually referenced by `roots` (default: the
+        source's default scene) are copied, one block at a time. `path` may
+        also be an already parsed GlbFile (when splitting one source many ways).
+        """
+        src = path if isinstance(path, GlbFile) else read_glb(path)
+        g = src.gltf
+
+        for buf in g.get("buffers", []):
+            if "uri" in buf:
+                raise ValueError(f"External buffers are not supported: {path}")
+
+        if roots is None:
+            scenes = g.get("scenes", [])
+            roots = scenes[g.get("scene", 0)].get("nodes", []) if scenes else []
+        node_ids = _collect_nodes(g, roots)
+
+        # 1. Reachability: nodes -> meshes -> accessors / materials -> textures -> images
+        src_nodes = g.get("nodes", [])
+        src_meshes = g.get("meshes", [])
+        src_accessors = g.get("accessors", [])
+        src_materials = g.get("materials", [])
+        src_textures = g.get("textures", [])
+        src_images = g.get("images", [])
+
+        mesh_ids = sorted({src_nodes[n]["mesh"] for n in node_ids if "mesh" in src_nodes[n]})
+        accessor_ids, material_ids, extra_views = set(), set(), set()
+        for m in mesh_ids:
+            for prim in src_meshes[m].get("primitives", []):
+                accessor_ids.update(prim.get("attributes", {}).values())
+                for target in prim.get("targets", []):
+                    accessor_ids.update(target.values())
+                if "indices" in prim:
+                    accessor_ids.add(prim["indices"])
+                if "material" in prim:
+                    material_ids.add(prim["material"])
+                for ext in prim.get("extensions", {}).values():
+                    if isinstance(ext, dict) and "bufferView" in ext:
+                        extra_views.add(ext["bufferView"])
+
+        texture_ids = set()
+        for m in material_ids:
+            texture_ids.update(ref["index"] for ref in _texture_refs(src_materials[m]))
+        image_ids, sampler_ids = set(), set()
+        for t in texture_ids:
+            image_ids.update(s["source"] for s in _texture_sources(src_textures[t]))
+            if "sampler" in src_textures[t]:
+                sampler_ids.add(src_textures[t]["sampler"])
+
+        view_ids = set(extra_views)
+        for a in accessor_ids:
+            acc = src_accessors[a]
+            if "bufferView" in acc:
+                view_ids.add(acc["bufferView"])
+            sparse = acc.get("sparse")
+            if sparse:
+                view_ids.add(sparse["indices"]["bufferView"])
+                view_ids.add(sparse["values"]["bufferView"])
+        for i in image_ids:
+            if "bufferView" in src_images[i]:
+                view_ids.add(src_images[i]["bufferView"])
+
+        # 2. Stream the referenced buffer views into our BIN chunk
+        view_map: Dict[int, int] = {}
+        src_views = g.get("bufferViews", [])
+        with open(src.path, "rb") as f:
+            for v in sorted(view_ids, key=lambda i: src_views[i].get("byteOffset", 0)):
+                view = src_views[v]
+                new_offset = self._append_from_file(
+                    f, src.bin_offset + view.get("byteOffset", 0), view["byteLength"]
+                )
+                self.gltf["bufferViews"].append(
+                    {**view, "buffer": 0, "byteOffset": new_offset}
+                )
+                view_map[v] = len(self.gltf["bufferViews"]) - 1
+
+        # 3. Remap and append JSON objects
+        def _append(key: str, ids, remap) -> Dict[int, int]:
+            mapping = {}
+            for old in sorted(ids):
+                self.gltf[key].append(remap(json.loads(json.dumps(g[key][old]))))
+                mapping[old] = len(self.gltf[key]) - 1
+            return mapping
+
+        sampler_map = _append("samplers", sampler_ids, lambda s: s)
+
+        def _remap_image(img):
+            if "bufferView" in img:
+                img["bufferView"] = view_map[img["bufferView"]]
+            return img
+        image_map = _append("images", image_ids, _remap_image)
+
+        def _remap_texture(tex):
+            for s in _texture_sources(tex):
+                s["source"] = image_map[s["source"]]
+            if "sampler" in tex:
+                tex["sampler"] = sampler_map[tex["sampler"]]
+            return tex
+        texture_map = _append("textures", texture_ids, _remap_texture)
+
+        def _remap_material(mat):
+            for ref in _texture_refs(mat):
+                ref["index"] = texture_map[ref["index"]]
+            return mat
+        material_map = _append("materials", material_ids, _remap_material)
+
+        def _remap_accessor(acc):
+            if "bufferView" in acc:
+                acc["bufferView"] = view_map[acc["bufferView"]]
+            if "sparse" in acc:
+                acc["sparse"]["indices"]["bufferView"] = view_map[acc["sparse"]["indices"]["bufferView"]]
+                acc["sparse"]["values"]["bufferView"] = view_map[acc["sparse"]["values"]["bufferView"]]
+            return acc
+        accessor_map = _append("accessors", accessor_ids, _remap_accessor)
+
+        def _remap_mesh(mesh):
+            for prim in mesh.get("primitives", []):
+                prim["attributes"] = {k: accessor_map[v] for k, v in prim.get("attributes", {}).items()}
+                if "targets" in prim:
+                    prim["targets"] = [{k: accessor_map[v] for k, v in t.items()} for t in prim["targets"]]
+                if "indices" in prim:
+                    prim["indices"] = accessor_map[prim["indices"]]
+                if "material" in prim:
+                    prim["material"] = material_map[prim["material"]]
+                for ext in prim.get("extensions", {}).values():
+                    if isinstance(ext, dict) and "bufferView" in ext:
+                        ext["bufferView"] = view_map[ext["bufferView"]]
+            return mesh
+        mesh_map = _append("meshes", mesh_ids, _remap_mesh)
+
+        base = len(self.gltf["nodes"]) + 1  # +1: the wrapper node comes first
+        node_map = {old: base + i for i, old in enumerate(node_ids)}
+
+        wrapper = {"name": name, "children": [node_map[r] for r in roots]}
+        if matrix is not None:
+            wrapper["matrix"] = matrix_to_gltf(matrix)
+        if extras:
+            wrapper["extras"] = extras
+        wrapper_idx = self._add_node(wrapper, parent)
+
+        for old in node_ids:
+            node = json.loads(json.dumps(src_nodes[old]))
+            node.pop("skin", None)
+            node.pop("camera", None)
+            if "mesh" in node:
+                node["mesh"] = mesh_map[node["mesh"]]
+            if "children" in node:
+                node["children"] = [node_map[c] for c in node["children"]]
+            self.gltf["nodes"].append(node)
+
+        self._extensions_used.update(g.get("extensionsUsed", []))
+        self._extensions_required.update(g.get("extensionsRequired", []))
+        return wrapper_idx
+
+    # ------------------------------------------------------------------
+    # Finalize
+    # ------------------------------------------------------------------
+    def close(self) -> Path:
+        """Writes header + JSON chunk, then streams the temp BIN chunk behind it."""
+        if self._closed:
+            return self.output_path
+        self._closed = True
+        self._align()
+        self._bin.close()
+
+        gltf = {k: v for k, v in self.gltf.items() if v != []}
+        if self._bin_length:
+            gltf["buffers"] = [{"byteLength": self._bin_length}]
+        else:
+            gltf.pop("bufferViews", None)
+        if self._extensions_used:
+            gltf["extensionsUsed"] = sorted(self._extensions_used)
+        if self._extensions_required:
+            gltf["extensionsRequired"] = sorted(self._extensions_required)
+
+        json_bytes = json.dumps(gltf, separators=(",", ":")).encode("utf-8")
+        json_bytes += b" " * _pad4(len(json_bytes))
+
+        total = 12 + 8 + len(json_bytes)
+        if self._bin_length:
+            total += 8 + self._bin_length
+
+        tmp_out = self.output_path.with_name(self.output_path.name + ".part")
+        try:
+            with open(tmp_out, "wb") as out:
+                out.write(struct.pack("<III", GLB_MAGIC, 2, total))
+                out.write(struct.pack("<II", len(json_bytes), CHUNK_JSON))
+                out.write(json_bytes)
+                if self._bin_length:
+                    out.write(struct.pack("<II", self._bin_length, CHUNK_BIN))
+                    with open(self._bin.name, "rb") as bin_src:
+                        while True:
+                            block = bin_src.read(COPY_BLOCK)
+                            if not block:
+                                break
+                            out.write(block)
+            os.replace(tmp_out, self.output_path)
+        finally:
+            os.unlink(self._bin.name)
+            if tmp_out.exists():
+                tmp_out.unlink()
+        return self.output_path
+
+    def abort(self):
+        """Discards everything written so far."""
+        if self._closed:
+            return
+        self._closed = True
+        self._bin.close()
+        os.unlink(self._bin.name)
+
+
+def _referenced_views(gltf: dict) -> set:
+    views = set()
+    for acc in gltf.get("accessors", []):
+        if "bufferView" in acc:
+            views.add(acc["bufferView"])
+        sparse = acc.get("sparse")
+        if sparse:
+            views.add(sparse["indices"]["bufferView"])
+            views.add(sparse["values"]["bufferView"])
+    for img in gltf.get("images", []):
+        if "bufferView" in img:
+            views.add(img["bufferView"])
+    for mesh in gltf.get("meshes", []):
+        for prim in mesh.get("primitives", []):
+            for ext in prim.get("extensions", {}).values():
+                if isinstance(ext, dict) and "bufferView" in ext:
+                    views.add(ext["bufferView"])
+    return views
+
+
+def rewrite_glb(src: GlbFile, gltf: dict, output_path, replaced_views: Optional[Dict[int, bytes]] = None) -> Path:
+    """
+    Writes `gltf` (an edited copy of src.gltf, same bufferView indices) as a new GLB.
+    Buffer views are streamed from `src`, except those given in `replaced_views`;
+    views no longer referenced are dropped and the indices compacted.
+    """
+    replaced_views = replaced_views or {}
+    gltf = json.loads(json.dumps(gltf))
+    src_views = gltf.get("bufferViews", [])
+    used = sorted(_referenced_views(gltf))
+
+    writer = StreamingGLBWriter(output_path)
+    try:
+        view_map = {}
+        with open(src.path, "rb") as f:
+            for v in used:
+                view = dict(src_views[v])
+                if v in replaced_views:
+                    data = replaced_views[v]
+                    view.update(byteOffset=writer._append_bytes(data), byteLength=len(data))
+                else:
+                    view["byteOffset"] = writer._append_from_file(
+                        f, src.bin_offset + view.get("byteOffset", 0), view["byteLength"]
+                    )
+                view["buffer"] = 0
+                writer.gltf["bufferViews"].append(view)
+                view_map[v] = len(writer.gltf["bufferViews"]) - 1
+
+        for acc in gltf.get("accessors", []):
+            if "bufferView" in acc:
+                acc["bufferView"] = view_map[acc["bufferView"]]
+            if "sparse" in acc:
+                acc["sparse"]["indices"]["bufferView"] = view_map[acc["sparse"]["indices"]["bufferView"]]
+                acc["sparse"]["values"]["bufferView"] = view_map[acc["sparse"]["values"]["bufferView"]]
+        for img in gltf.get("images", []):
+            if "bufferView" in img:
+                img["bufferView"] = view_map[img["bufferView"]]
+        for mesh in gltf.get("meshes", []):
+            for prim in mesh.get("primitives", []):
+                for ext in prim.get("extensions", {}).values():
+                    if isinstance(ext, dict) and "bufferView" in ext:
+                        ext["bufferView"] = view_map[ext["bufferView"]]
+
+        for key in ("bufferViews", "buffers"):
+            gltf.pop(key, None)
+        writer._extensions_used.update(gltf.pop("extensionsUsed", []))
+        writer._extensions_required.update(gltf.pop("extensionsRequired", []))
+        writer.gltf.update(gltf)
+    except Exception:
+        writer.abort()
+        raise
+    return writer.close()
@@ -0,0 +1,16 @@
+"""
+Content hashing helpers shared by the builder caches.
+"""
+import hashlib
+from pathlib import Path
+
+HASH_BLOCK = 1 << 20
+
+
+def file_sha256(path) -> str:
+    """Streams a file through SHA-256 without loading it into memory."""
+    digest = hashlib.sha256()
+    with open(Path(path), "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
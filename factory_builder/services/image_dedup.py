@@ -0,0 +1,196 @@
+"""
+Perceptual-hash index of scraped reference images -> generated GLB models.
+
+Different machine names often scrape the same (or a re-encoded / resized)
+product photo. Before submitting a GPU job, the builder looks the image up
+here: a near-duplicate reuses the already generated model, or waits for the
+job that is currently generating it, instead of paying for a new one.
+"""
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from factory_builder.utils import get_logger
+
+log = get_logger("ImageDedup")
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+try:
+    import fcntl  # Index file shared by concurrent builders (POSIX)
+except ImportError:
+    fcntl = None
+
+# A waiter never outlives the generation it waits for (cloud API timeout + margin)
+WAIT_TIMEOUT = float(os.getenv("API_TIMEOUT", "1200")) + 60
+
+_DCT_SIZE = 32
+_HASH_SIZE = 8
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    return np.cos(np.pi * (2 * i + 1) * k / (2 * n))
+
+
+_DCT = _dct_matrix(_DCT_SIZE)
+
+
+def perceptual_hash(image_path) -> int:
+    """
+    64-bit DCT perceptual hash (pHash): grayscale 32x32, keep the 8x8
+    lowest frequencies, threshold against their median.
+    """
+    with Image.open(image_path) as img:
+        gray = img.convert("L").resize((_DCT_SIZE, _DCT_SIZE), Image.LANCZOS)
+        pixels = np.asarray(gray, dtype=np.float64)
+
+    low = (_DCT @ pixels @ _DCT.T)[:_HASH_SIZE, :_HASH_SIZE].reshape(-1)
+    bits = low > np.median(low[1:])  # DC term excluded from the median
+    return int("".join("1" if b else "0" for b in bits), 2)
+
+
+class Claim:
+    """One caller's in-flight generation for a hash; only its owner may complete or fail it."""
+    __slots__ = ("phash", "event")
+
+    def __init__(self, phash: int):
+        self.phash = phash
+        self.event = threading.Event()
+
+
+class ReferenceImageIndex:
+    """
+    Persistent {phash -> model_path} index plus in-flight generation tracking.
+
+    Usage:
+        claim, model = index.acquire(image_path)
+        if model is None:             # we own the generation
+            ok = renderer.generate(...)
+            index.complete(claim, out) if ok else index.fail(claim)
+    """
+
+    def __init__(self, index_path: Path, max_distance: Optional[int] = None):
+        self.index_path = Path(index_path)
+        self.max_distance = max_distance if max_distance is not None else int(os.getenv("PHASH_MAX_DISTANCE", "6"))
+        self._lock = threading.Lock()
+        self._pending: List[Claim] = []
+        self._entries: Dict[int, str] = self._read()
+
+    def _read(self) -> Dict[int, str]:
+        if not self.index_path.exists():
+            return {}
+        try:
+            with open(self.index_path, "r") as f:
+                raw = json.load(f)
+            return {int(h, 16): path for h, path in raw.items()}
+        except (OSError, ValueError) as e:
+            log.warning(f"Ignoring unreadable reference index {self.index_path}: {e}")
+            return {}
+
+    def _save(self):
+        """Merges with the file on disk under an exclusive lock: other builders write it too."""
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.index_path.with_suffix(".lock"), "w") as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            self._entries = {**self._read(), **self._entries}
+            tmp = self.index_path.with_suffix(".tmp")
+            with open(tmp, "w") as f:
+                json.dump({f"{h:016x}": path for h, path in self._entries.items()}, f, indent=2)
+            os.replace(tmp, self.index_path)
+
+    def _nearest(self, candidates, phash: int) -> Optional[int]:
+        """Closest known hash within the threshold (vectorized popcount)."""
+        keys = np.fromiter(candidates, dtype=np.uint64)
+        if len(keys) == 0:
+            return None
+        xor = keys ^ np.uint64(phash)
+        dist = np.unpackbits(xor.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+        best = int(np.argmin(dist))
+        return int(keys[best]) if dist[best] <= self.max_distance else None
+
+    def _match_completed(self, phash: int) -> Optional[str]:
+        live = {h: p for h, p in self._entries.items() if Path(p).exists()}
+        best = self._nearest(live.keys(), phash)
+        return live[best] if best is not None else None
+
+    def acquire(self, image_path, timeout: Optional[float] = WAIT_TIMEOUT) -> Tuple[Optional[Claim], Optional[str]]:
+        """
+        Returns (claim, model_path). model_path is set when a near-duplicate
+        model exists (or an in-flight job for one finished while we waited);
+        otherwise the caller owns the returned claim (also when the wait
+        timed out) and must pass it to complete() or fail().
+        """
+        if not PIL_AVAILABLE:
+            return None, None
+        try:
+            phash = perceptual_hash(image_path)
+        except OSError as e:
+            log.warning(f"     ⚠️ Could not hash {image_path}: {e}")
+            return None, None
+
+        while True:
+            with self._lock:
+                model = self._match_completed(phash)
+                if model:
+                    return None, model
+
+                in_flight = self._nearest((c.phash for c in self._pending), phash)
+                if in_flight is None:
+                    return self._claim(phash), None
+                event = next(c.event for c in self._pending if c.phash == in_flight)
+
+            log.info("     ⏳ Near-duplicate image is already being generated. Waiting...")
+            if not event.wait(timeout):
+                log.warning("     ⚠️ Timed out waiting for the near-duplicate job. Generating instead.")
+                with self._lock:
+                    return self._claim(phash), None
+
+    def _claim(self, phash: int) -> Claim:
+        claim = Claim(phash)
+        self._pending.append(claim)
+        return claim
+
+    def _release(self, claim: Claim):
+        # By identity: an equal hash may belong to another caller's claim
+        self._pending = [c for c in self._pending if c is not claim]
+
+    def complete(self, claim: Optional[Claim], model_path) -> None:
+        """Records a finished model and wakes up any waiters."""
+        if claim is None:
+            return
+        with self._lock:
+            self._entries[claim.phash] = str(model_path)
+            self._save()
+            self._release(claim)
+        claim.event.set()
+
+    def fail(self, claim: Optional[Claim]) -> None:
+        """Releases an in-flight claim so a waiter can try itself."""
+        if claim is None:
+            return
+        with self._lock:
+            self._release(claim)
+        claim.event.set()
+
+    def register(self, image_path, model_path) -> None:
+        """Adds an already generated model (e.g. from a previous build)."""
+        if not PIL_AVAILABLE or str(model_path) in self._entries.values():
+            return
+        try:
+            phash = perceptual_hash(image_path)
+        except OSError:
+            return
+        with self._lock:
+            self._entries.setdefault(phash, str(model_path))
+            self._save()
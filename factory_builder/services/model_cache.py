@@ -0,0 +1,146 @@
+"""
+Cache of machine models normalized to their DXF footprint.
+
+Loading a generated `3d_model.glb`, flattening the scene and rescaling it
+to the machine's length x width is pure Python/trimesh work that gives the
+same result as long as the source file and the footprint are unchanged.
+The result is stored as a GLB (one mesh per part, UVs, materials and
+texture images kept), keyed by source hash + target dimensions, so later
+builds only pay I/O.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from factory_builder.services.hashing import file_sha256
+from factory_builder.utils import get_logger
+
+log = get_logger("ModelCache")
+
+# Bump when the normalization below changes, so stale entries are ignored
+CACHE_VERSION = 3
+
+# glTF Y-up -> layout Z-up: (x, y, z) -> (x, -z, y)
+_Y_UP_TO_Z_UP = np.array([
+    [1.0, 0.0, 0.0, 0.0],
+    [0.0, 0.0, -1.0, 0.0],
+    [0.0, 1.0, 0.0, 0.0],
+    [0.0, 0.0, 0.0, 1.0],
+])
+
+
+@dataclass
+class NormalizedModel:
+    meshes: List["trimesh.Trimesh"]  # Z-up, centred on XY, resting on z=0; visuals (UVs/textures) kept
+
+    @property
+    def bounds(self) -> np.ndarray:
+        vertices = np.vstack([m.vertices for m in self.meshes])
+        return np.array([vertices.min(axis=0), vertices.max(axis=0)])
+
+    def to_trimesh(self):
+        import trimesh
+        return trimesh.Scene(self.meshes)
+
+
+def _load_meshes(model_path) -> list:
+    """Scene graph flattened to world-space meshes, each keeping its own visual."""
+    import trimesh
+    return [m for m in trimesh.load(model_path, force="scene").dump() if len(m.faces)]
+
+
+def normalize_model(model_path: str, length: float, width: float) -> NormalizedModel:
+    """
+    Loads a GLB and fits it to the DXF footprint (see debug_cache.py):
+    1. Flatten the scene graph (parts stay separate meshes with their materials)
+    2. Rotate glTF Y-up into the layout's Z-up
+    3. Uniformly scale so the XY extents fit length x width
+    4. Centre on XY and rest on the floor (z = 0)
+    """
+    meshes = _load_meshes(model_path)
+    for mesh in meshes:
+        mesh.apply_transform(_Y_UP_TO_Z_UP)
+
+    lo, hi = NormalizedModel(meshes).bounds
+    extent = np.maximum(hi - lo, 1e-9)
+    scale = min(length / extent[0], width / extent[1])
+    centre = np.array([(lo[0] + hi[0]) / 2.0, (lo[1] + hi[1]) / 2.0, lo[2]])
+
+    fit = np.eye(4)
+    fit[:3, :3] *= scale
+    fit[:3, 3] = -centre * scale
+    for mesh in meshes:
+        mesh.apply_transform(fit)
+    return NormalizedModel(meshes)
+
+
+def _normalize_to_cache(model_path: str, length: float, width: float, out_path: str) -> str:
+    """Process-pool entry point: normalize and write the .glb atomically."""
+    model = normalize_model(model_path, length, width)
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    model.to_trimesh().export(tmp_path, file_type="glb")
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+class ModelCache:
+    """
+    Content-addressed store of normalized machine meshes.
+    Layout: <cache_dir>/<sha256[:32]>_<length>x<width>.v<version>.glb
+    """
+
+    def __init__(self, cache_dir: Path, max_workers: Optional[int] = None):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_workers = max_workers or int(os.getenv("MODEL_CACHE_WORKERS", os.cpu_count() or 1))
+
+    def key(self, model_path, length: float, width: float) -> str:
+        digest = file_sha256(model_path)[:32]
+        return f"{digest}_{length:.1f}x{width:.1f}.v{CACHE_VERSION}"
+
+    def path_for(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.glb"
+
+    def load(self, cache_path: Path) -> NormalizedModel:
+        return NormalizedModel(_load_meshes(cache_path))
+
+    def get(self, model_path, length: float, width: float) -> NormalizedModel:
+        """Returns the normalized model, normalizing in-process on a miss."""
+        cache_path = self.path_for(self.key(model_path, length, width))
+        if not cache_path.exists():
+            _normalize_to_cache(str(model_path), length, width, str(cache_path))
+        return self.load(cache_path)
+
+    def warm(self, requests: Dict[str, Tuple[str, float, float]]) -> Dict[str, Path]:
+        """
+        Ensures every request is cached; misses are normalized in a process pool.
+
+        :param requests: {name: (model_path, length, width)}
+        :return: {name: cache_path} for every request that succeeded
+        """
+        resolved, misses = {}, {}
+        for name, (model_path, length, width) in requests.items():
+            cache_path = self.path_for(self.key(model_path, length, width))
+            if cache_path.exists():
+                resolved[name] = cache_path
+            else:
+                misses[name] = (str(model_path), length, width, str(cache_path))
+
+        log.info(f"🗃️  Model cache: {len(resolved)} hits, {len(misses)} misses")
+        if not misses:
+            return resolved
+
+        workers = max(1, min(self.max_workers, len(misses)))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {name: pool.submit(_normalize_to_cache, *args) for name, args in misses.items()}
+            for name, future in futures.items():
+                try:
+                    resolved[name] = Path(future.result())
+                except Exception as e:
+                    log.warning(f"     ⚠️ Could not normalize model for {name}: {e}")
+
+        return resolved
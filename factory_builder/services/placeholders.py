@@ -0,0 +1,76 @@
+"""
+Parametric placeholder models for machines whose 3D model is not ready.
+
+A placeholder is a few boxes sized from the DXF footprint (plinth, body,
+control cabinet), written as a small GLB through StreamingGLBWriter. It goes
+through the same footprint normalization as a real model, so swapping the
+real model in later changes nothing else in the scene.
+"""
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from factory_builder.services.glb_io import StreamingGLBWriter
+
+MIN_HEIGHT = 800.0
+MAX_HEIGHT = 2500.0
+
+PLINTH_COLOR = (0.25, 0.27, 0.30)
+BODY_COLOR = (0.62, 0.66, 0.70)
+CABINET_COLOR = (0.95, 0.65, 0.10)  # Amber: reads as "not the real model yet"
+
+# Unit cube, 4 vertices per face so every face gets a flat normal
+_FACE_NORMALS = np.array([[1, 0, 0], [-1, 0, 0], [0, 1, 0], [0, -1, 0], [0, 0, 1], [0, 0, -1]], dtype=np.float32)
+_FACE_CORNERS = np.array([
+    [[1, 0, 0], [1, 1, 0], [1, 1, 1], [1, 0, 1]],
+    [[0, 0, 0], [0, 0, 1], [0, 1, 1], [0, 1, 0]],
+    [[0, 1, 0], [0, 1, 1], [1, 1, 1], [1, 1, 0]],
+    [[0, 0, 0], [1, 0, 0], [1, 0, 1], [0, 0, 1]],
+    [[0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1]],
+    [[0, 0, 0], [0, 1, 0], [1, 1, 0], [1, 0, 0]],
+], dtype=np.float32)
+_FACE_TRIS = np.array([0, 1, 2, 0, 2, 3], dtype=np.uint32)
+
+
+def box_buffers(minimum, size):
+    """(vertices, normals, indices) of an axis-aligned box."""
+    vertices = (_FACE_CORNERS * np.asarray(size, dtype=np.float32) + np.asarray(minimum, dtype=np.float32)).reshape(-1, 3)
+    normals = np.repeat(_FACE_NORMALS, 4, axis=0)
+    indices = (_FACE_TRIS[None, :] + 4 * np.arange(6, dtype=np.uint32)[:, None]).reshape(-1)
+    return vertices, normals, indices
+
+
+def placeholder_height(length: float, width: float) -> float:
+    return float(np.clip(0.6 * min(length, width), MIN_HEIGHT, MAX_HEIGHT))
+
+
+def build_placeholder_glb(
+    output_path: Path,
+    length: float,
+    width: float,
+    height: Optional[float] = None,
+    name: str = "Placeholder",
+) -> Path:
+    """
+    Writes a placeholder GLB (glTF Y-up: X = length, Y = height, Z = width),
+    centred on the footprint and resting on y=0.
+    """
+    height = height or placeholder_height(length, width)
+    plinth_h, body_h = 0.1 * height, 0.75 * height
+
+    parts = [
+        ("Plinth", (-length / 2, 0, -width / 2), (length, plinth_h, width), PLINTH_COLOR),
+        ("Body", (-0.45 * length, plinth_h, -0.425 * width), (0.9 * length, body_h, 0.85 * width), BODY_COLOR),
+        # Cabinet on top at one end, so orientation is visible
+        ("Cabinet", (0.25 * length, plinth_h + body_h, -0.125 * width), (0.15 * length, 0.15 * height, 0.25 * width), CABINET_COLOR),
+    ]
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with StreamingGLBWriter(output_path) as writer:
+        root = writer.add_group(name, extras={"placeholder": True, "length": length, "width": width, "height": height})
+        for part, minimum, size, color in parts:
+            vertices, normals, indices = box_buffers(minimum, size)
+            writer.add_mesh(f"{name}_{part}", vertices, indices, color=color, normals=normals, parent=root)
+    return output_path
@@ -0,0 +1,69 @@
+"""
+Precompressed .gz / .br sidecars for assets served to the Twin.
+
+The dashboard's asset server picks a sidecar by Accept-Encoding as long as it
+is not older than the source file, so compression happens once per build
+instead of once per request. Brotli is optional (the `brotli` package).
+"""
+import gzip
+import os
+import shutil
+from pathlib import Path
+from typing import List
+
+from factory_builder.utils import get_logger
+
+log = get_logger("Precompress")
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip only
+    brotli = None
+
+COPY_BLOCK = 1 << 20
+MIN_SIZE = 1024       # Not worth a sidecar below this
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5    # Good ratio at near-gzip speed on 100MB+ scenes
+
+
+def _gzip(src: Path, dst: Path):
+    with open(src, "rb") as fin, gzip.GzipFile(dst, "wb", compresslevel=GZIP_LEVEL, mtime=0) as fout:
+        shutil.copyfileobj(fin, fout, COPY_BLOCK)
+
+
+def _brotli(src: Path, dst: Path):
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        for block in iter(lambda: fin.read(COPY_BLOCK), b""):
+            fout.write(compressor.process(block))
+        fout.write(compressor.finish())
+
+
+def write_sidecars(path: Path) -> List[Path]:
+    """
+    Writes <path>.gz (and <path>.br if brotli is installed), streaming 1 MiB blocks.
+    Sidecars that do not shrink the file are removed rather than served.
+    """
+    path = Path(path)
+    size = path.stat().st_size
+    written = []
+    encoders = [(".gz", _gzip)] + ([(".br", _brotli)] if brotli else [])
+
+    for ext, encode in encoders:
+        sidecar = Path(str(path) + ext)
+        if size < MIN_SIZE:
+            sidecar.unlink(missing_ok=True)
+            continue
+        tmp = sidecar.with_name(sidecar.name + ".tmp")
+        encode(path, tmp)
+        if tmp.stat().st_size >= size:
+            tmp.unlink()
+            sidecar.unlink(missing_ok=True)
+            continue
+        os.replace(tmp, sidecar)
+        written.append(sidecar)
+
+    if written:
+        ratios = ", ".join(f"{p.suffix[1:]} {p.stat().st_size / size:.0%}" for p in written)
+        log.info(f"🗜️  Precompressed {path.name} ({ratios})")
+    return written
@@ -0,0 +1,142 @@
+"""
+Per-machine / per-connection chunks of the composed scene for progressive loading.
+
+Every root node of factory_complete.glb is copied into its own small GLB
+(StreamingGLBWriter.add_glb with roots=[root]), and scene/chunks/manifest.json
+lists them with world-space bounds. The Twin draws the bounds as a skeleton
+immediately and streams the chunks nearest the camera / selection first, so
+the first frame no longer waits for the whole factory.
+
+Chunk file names carry a content hash: a viewer still loading the previous
+manifest never receives a chunk from the next build under the same URL.
+With gltfpack available each chunk also gets a meshopt-compressed variant
+(manifest "compressed"), which the Twin prefers.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Iterable, Optional
+
+from factory_builder.services.camera_map import node_key, root_bounds
+from factory_builder.services.connection_geometry import CONVEYOR, PIPE
+from factory_builder.services.geometry_compress import GeometryCompressor
+from factory_builder.services.glb_io import StreamingGLBWriter, read_glb
+from factory_builder.services.hashing import file_sha256
+from factory_builder.services.precompress import write_sidecars
+from factory_builder.utils import get_logger, sanitize_filename
+
+log = get_logger("SceneChunks")
+
+MANIFEST_NAME = "manifest.json"
+
+MACHINE = "machine"
+CONNECTION = "connection"
+LAYOUT = "layout"  # Floor, walls, anything else: loaded first
+
+_CONNECTION_HINTS = (CONVEYOR, PIPE)
+
+
+def chunk_kind(node: dict, machine_ids: set) -> str:
+    key = node_key(node)
+    if key and (key in machine_ids or (node.get("extras") or {}).get("machine_id")):
+        return MACHINE
+    if any(hint in (node.get("name") or "").lower() for hint in _CONNECTION_HINTS):
+        return CONNECTION
+    return LAYOUT
+
+
+def _chunk_files(chunk: dict) -> list:
+    return [chunk["file"]] + ([chunk["compressed"]["file"]] if chunk.get("compressed") else [])
+
+
+def _is_current(manifest_path: Path, scene_hash: str, compression: Optional[str]) -> bool:
+    if not manifest_path.exists():
+        return False
+    with open(manifest_path, "r") as f:
+        manifest = json.load(f)
+    return (
+        manifest.get("scene_sha256") == scene_hash
+        and manifest.get("compression") == compression
+        and all((manifest_path.parent / name).exists() for c in manifest.get("chunks", []) for name in _chunk_files(c))
+    )
+
+
+def write_scene_chunks(
+    scene_path: Path,
+    out_dir: Path,
+    machine_ids: Optional[Iterable[str]] = None,
+    compressor: Optional[GeometryCompressor] = None,
+) -> Optional[dict]:
+    """Splits the scene into one GLB per root node and writes the manifest (None if the scene is empty)."""
+    scene_path, out_dir = Path(scene_path), Path(out_dir)
+    manifest_path = out_dir / MANIFEST_NAME
+    compressor = compressor or GeometryCompressor()
+    compression = compressor.mode if compressor.enabled else None
+    scene_hash = file_sha256(scene_path)
+    if _is_current(manifest_path, scene_hash, compression):
+        log.info("♻️  Scene chunks are up to date")
+        with open(manifest_path, "r") as f:
+            return json.load(f)
+
+    src = read_glb(scene_path)
+    gltf = src.gltf
+    scenes = gltf.get("scenes", [])
+    roots = scenes[gltf.get("scene", 0)].get("nodes", []) if scenes else []
+    if not roots:
+        return None
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    bounds = root_bounds(gltf)
+    wanted = set(machine_ids or [])
+
+    chunks, used_ids = [], set()
+    for root in roots:
+        node = gltf["nodes"][root]
+        if root not in bounds:
+            continue  # No geometry (empties, lights)
+        kind = chunk_kind(node, wanted)
+        chunk_id = node_key(node) or f"node_{root}"
+        if chunk_id in used_ids:
+            chunk_id = f"{chunk_id}_{root}"
+        used_ids.add(chunk_id)
+
+        part = out_dir / f".{sanitize_filename(chunk_id)}.part.glb"
+        with StreamingGLBWriter(part) as writer:
+            writer.add_glb(src, name=f"chunk_{chunk_id}", roots=[root], extras={"chunk": chunk_id, "kind": kind})
+        final = out_dir / f"{sanitize_filename(chunk_id)}-{file_sha256(part)[:12]}.glb"
+        os.replace(part, final)
+        write_sidecars(final)
+
+        lo, hi = bounds[root]
+        chunk = {
+            "id": chunk_id,
+            "kind": kind,
+            "file": final.name,
+            "bytes": final.stat().st_size,
+            "bounds": {"min": [float(v) for v in lo], "max": [float(v) for v in hi]},
+        }
+        packed = compressor.compress(final)
+        if packed:
+            chunk["compressed"] = {"file": packed.name, "bytes": packed.stat().st_size}
+        chunks.append(chunk)
+
+    manifest = {"scene_sha256": scene_hash, "compression": compression, "chunks": chunks}
+    tmp = manifest_path.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=4)
+    os.replace(tmp, manifest_path)
+
+    # Chunks of earlier builds (and their sidecars) are no longer referenced
+    keep = {name for c in chunks for name in _chunk_files(c)}
+    for stale in out_dir.glob("*.glb*"):
+        if stale.name.split(".glb")[0] + ".glb" not in keep:
+            stale.unlink(missing_ok=True)
+
+    total = sum(c["bytes"] for c in chunks)
+    packed_total = sum(c.get("compressed", c)["bytes"] for c in chunks)
+    log.info(
+        f"🧩 {len(chunks)} scene chunks ({total / 1e6:.1f} MB"
+        + (f", {packed_total / 1e6:.1f} MB meshopt" if compression else "")
+        + f") + manifest: {out_dir}"
+    )
+    return manifest
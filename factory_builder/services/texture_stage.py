@@ -0,0 +1,199 @@
+"""
+Texture post-processing for composed scenes.
+
+Generated machine models embed full-resolution textures, frequently
+identical across machines of the same vendor. This stage:
+1. Hashes every embedded image and collapses duplicates to one image.
+2. Downscales to TEXTURE_MAX_EDGE (re-encoding opaque images as JPEG).
+3. Optionally transcodes to KTX2 / Basis Universal (TEXTURE_TRANSCODE=ktx2),
+   which needs the `toktx` CLI from KTX-Software on PATH.
+Processed images are cached per source hash, so repeat builds are I/O only.
+"""
+import hashlib
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from factory_builder.services.glb_io import read_glb, rewrite_glb
+from factory_builder.utils import get_logger
+
+log = get_logger("TextureStage")
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+_EXT = {"image/png": "png", "image/jpeg": "jpg", "image/ktx2": "ktx2"}
+
+
+class TextureStage:
+    def __init__(self, cache_dir: Path, max_edge: Optional[int] = None, transcode: Optional[str] = None):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_edge = max_edge or int(os.getenv("TEXTURE_MAX_EDGE", "1024"))
+        self.transcode = (transcode if transcode is not None else os.getenv("TEXTURE_TRANSCODE", "")).lower()
+
+        if self.transcode == "ktx2" and not shutil.which("toktx"):
+            log.warning("toktx not found on PATH. KTX2 transcoding disabled.")
+            self.transcode = ""
+
+    # ------------------------------------------------------------------
+    # Single image
+    # ------------------------------------------------------------------
+    def _cache_key(self, digest: str) -> str:
+        return f"{digest}_{self.max_edge}_{self.transcode or 'raw'}"
+
+    def _lookup(self, key: str) -> Optional[Tuple[bytes, str]]:
+        for mime, ext in _EXT.items():
+            path = self.cache_dir / f"{key}.{ext}"
+            if path.exists():
+                return path.read_bytes(), mime
+        return None
+
+    def _store(self, key: str, data: bytes, mime: str):
+        path = self.cache_dir / f"{key}.{_EXT[mime]}"
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def _downscale(self, data: bytes, mime: str) -> Tuple[bytes, str]:
+        img = Image.open(io.BytesIO(data))
+        img.load()
+        resized = max(img.size) > self.max_edge
+        if resized:
+            img.thumbnail((self.max_edge, self.max_edge), Image.LANCZOS)
+
+        has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+        if has_alpha and img.convert("RGBA").getextrema()[3][0] == 255:
+            has_alpha = False
+
+        out = io.BytesIO()
+        if has_alpha:
+            img.convert("RGBA").save(out, format="PNG", optimize=True)
+            new_mime = "image/png"
+        else:
+            img.convert("RGB").save(out, format="JPEG", quality=90, optimize=True)
+            new_mime = "image/jpeg"
+
+        # Never make an untouched image bigger
+        if not resized and len(out.getvalue()) >= len(data):
+            return data, mime
+        return out.getvalue(), new_mime
+
+    def _to_ktx2(self, data: bytes) -> bytes:
+        with tempfile.TemporaryDirectory() as tmp:
+            src = Path(tmp) / "in.png"
+            dst = Path(tmp) / "out.ktx2"
+            Image.open(io.BytesIO(data)).save(src, format="PNG")
+            subprocess.run(
+                ["toktx", "--t2", "--encode", "uastc", "--genmipmap", str(dst), str(src)],
+                check=True, capture_output=True,
+            )
+            return dst.read_bytes()
+
+    def process_image(self, data: bytes, mime: str) -> Tuple[bytes, str]:
+        """Returns (bytes, mimeType) for one image, served from cache when possible."""
+        key = self._cache_key(hashlib.sha256(data).hexdigest())
+        cached = self._lookup(key)
+        if cached:
+            return cached
+
+        try:
+            out, out_mime = self._downscale(data, mime)
+        except (OSError, Image.DecompressionBombError) as e:
+            # Corrupt, unsupported or oversized: ship it as generated (not cached, a later Pillow may cope)
+            log.warning(f"     ⚠️ Image not processed, keeping the original: {e}")
+            return data, mime
+        if self.transcode == "ktx2":
+            try:
+                out, out_mime = self._to_ktx2(out), "image/ktx2"
+            except (subprocess.CalledProcessError, OSError) as e:
+                log.warning(f"     ⚠️ KTX2 transcode failed, keeping {out_mime}: {e}")
+
+        self._store(key, out, out_mime)
+        return out, out_mime
+
+    # ------------------------------------------------------------------
+    # Whole scene
+    # ------------------------------------------------------------------
+    def process(self, glb_path: Path, output_path: Optional[Path] = None) -> Dict[str, int]:
+        """
+        Deduplicates and downscales every embedded image of a GLB.
+        Rewrites in place unless `output_path` is given.
+        """
+        glb_path = Path(glb_path)
+        output_path = Path(output_path or glb_path)
+        if not PIL_AVAILABLE:
+            log.warning("Pillow not installed. Skipping texture stage.")
+            return {}
+
+        src = read_glb(glb_path)
+        gltf = src.gltf
+        images = gltf.get("images", [])
+        if not images:
+            return {"images": 0}
+
+        replaced_views: Dict[int, bytes] = {}
+        canonical: Dict[str, int] = {}   # processed hash -> first image index
+        image_map: Dict[int, int] = {}   # old image index -> kept image index
+        bytes_before = bytes_after = 0
+
+        for idx, img in enumerate(images):
+            if "bufferView" not in img:
+                image_map[idx] = idx
+                continue
+
+            data = src.read_view(img["bufferView"])
+            bytes_before += len(data)
+            out, mime = self.process_image(data, img.get("mimeType", "image/png"))
+
+            digest = hashlib.sha256(out).hexdigest()
+            if digest in canonical:
+                image_map[idx] = canonical[digest]
+                continue
+
+            canonical[digest] = idx
+            image_map[idx] = idx
+            replaced_views[img["bufferView"]] = out
+            img["mimeType"] = mime
+            bytes_after += len(out)
+
+        # Compact the image list and point textures at the survivors
+        kept = sorted(set(image_map.values()))
+        new_index = {old: i for i, old in enumerate(kept)}
+        gltf["images"] = [images[i] for i in kept]
+
+        uses_ktx2 = False
+        for tex in gltf.get("textures", []):
+            sources = [tex] if "source" in tex else []
+            sources += [e for e in tex.get("extensions", {}).values() if isinstance(e, dict) and "source" in e]
+            for s in sources:
+                s["source"] = new_index[image_map[s["source"]]]
+
+            if "source" in tex and gltf["images"][tex["source"]].get("mimeType") == "image/ktx2":
+                tex.setdefault("extensions", {})["KHR_texture_basisu"] = {"source": tex.pop("source")}
+                uses_ktx2 = True
+
+        if uses_ktx2:
+            for key in ("extensionsUsed", "extensionsRequired"):
+                gltf[key] = sorted(set(gltf.get(key, [])) | {"KHR_texture_basisu"})
+
+        rewrite_glb(src, gltf, output_path, replaced_views)
+
+        stats = {
+            "images": len(images),
+            "unique": len(kept),
+            "bytes_before": bytes_before,
+            "bytes_after": bytes_after,
+        }
+        log.info(
+            f"🖼️  Textures: {stats['images']} -> {stats['unique']} unique, "
+            f"{bytes_before / 1e6:.1f} MB -> {bytes_after / 1e6:.1f} MB"
+        )
+        return stats
@@ -1,50 +1,358 @@
 import subprocess
 import json
 import os
+import threading
+import time
 from pathlib import Path
+from factory_builder.services.hashing import file_sha256
 from factory_builder.utils import get_logger
 from .base import VideoEngine
+from ..frame_cache import FrameCache, cache_key, split_frame_list
+from ..hls import PLAYLIST_NAME, SegmentedEncoder, remux_to_mp4
+from ..presets import PRESETS, RenderPreset, choose_preset
+from ..progress import RenderProgress
+from ..worker_client import RenderWorkerClient
 
 log = get_logger("BlenderEngine")
 
+FRAME_COUNT = 300
+FPS = 24
+PROBE_FRAMES = [1, FRAME_COUNT // 2, FRAME_COUNT]
+
+
 class BlenderEngine(VideoEngine):
+    def __init__(self, workers: int = None, preset: str = None, budget_seconds: float = None, queue_dir: Path = None):
+        cpus = os.cpu_count() or 1
+        # Default: ~4 CPU threads per Blender process (8 workers on a 32-core host)
+        self.workers = workers or int(os.getenv("RENDER_WORKERS") or max(1, cpus // 4))
+        self.threads_per_worker = max(1, cpus // self.workers)
+
+        # "draft" | "preview" | "standard" | "final" | "auto"
+        self.preset_name = (preset or os.getenv("RENDER_PRESET") or "standard").lower()
+        self.budget_seconds = budget_seconds or float(os.getenv("RENDER_BUDGET_SECONDS") or 900)
+        self.script_path = Path(__file__).parent.parent / "scripts" / "cinematic_render.py"
+        # "mp4": encode once at the end | "hls": 2s segments + playlist while rendering
+        self.output_mode = (os.getenv("VIDEO_OUTPUT") or "mp4").lower()
+        # PNG frames are deleted after a successful encode unless kept (1080p: ~1-2 GB per shot)
+        self.keep_frames = os.getenv("RENDER_KEEP_FRAMES") == "1"
+
+        # BLENDER_WORKER=1: submit jobs to long-running workers that keep the scene imported
+        self.worker_client = None
+        if os.getenv("BLENDER_WORKER") == "1" and queue_dir is not None:
+            self.worker_client = RenderWorkerClient(queue_dir)
+        self.progress = RenderProgress(None)
+        # Camera map the Blender script computes when the builder's map is missing or empty
+        # (Blender Z-up, flythrough only: never published to the Twin)
+        self.fallback_camera_map = None
+
+    def _blender_cmd(self, config_path: Path) -> list:
+        return [
+            "blender",
+            "-b",                 # Background mode
+            "-P", str(self.script_path), # Run Python Script
+            "--",                 # Pass args to script
+            str(config_path)
+        ]
+
+    def _probe(self, preset: RenderPreset, base_config: dict, work_dir: Path):
+        """
+        Renders PROBE_FRAMES with one worker's thread budget.
+        Returns (seconds per frame, setup seconds) or None if the engine failed.
+        """
+        config_path = work_dir / f"probe_{preset.name}.json"
+        with open(config_path, "w") as f:
+            json.dump(dict(base_config, render=preset.to_config(), probe_frames=PROBE_FRAMES, write_metadata=False), f)
+
+        log.info(f"⏱️  Probing preset '{preset.name}' ({preset.engine})...")
+        if self.worker_client:
+            return self._probe_on_worker(preset, base_config)
+
+        t0 = time.perf_counter()
+        result = subprocess.run(self._blender_cmd(config_path), capture_output=True, text=True)
+        wall = time.perf_counter() - t0
+
+        frame_times = [
+            float(line.split()[1]) for line in result.stdout.splitlines()
+            if line.startswith("PROBE_FRAME_SECONDS")
+        ]
+        if result.returncode != 0 or not frame_times:
+            log.warning(f"     ⚠️ Probe failed for {preset.engine}")
+            return None
+
+        per_frame = sum(frame_times) / len(frame_times)
+        return per_frame, max(0.0, wall - sum(frame_times))
+
+    def _probe_on_worker(self, preset: RenderPreset, base_config: dict):
+        """Same probe on a warm worker; setup is the time not spent rendering probe frames."""
+        self.worker_client.ensure_workers(1)
+        t0 = time.perf_counter()
+        job_id = self.worker_client.submit(dict(base_config, render=preset.to_config(), probe_frames=PROBE_FRAMES, write_metadata=False))
+        status = self.worker_client.wait([job_id])[job_id]
+        wall = time.perf_counter() - t0
+
+        frame_times = status.get("probe_seconds")
+        if status["state"] != "done" or not frame_times:
+            log.warning(f"     ⚠️ Probe failed for {preset.engine}")
+            return None
+        return sum(frame_times) / len(frame_times), max(0.0, wall - sum(frame_times))
+
+    def _resolve_preset(self, base_config: dict, work_dir: Path):
+        """Fixed preset, or the best one that fits the time budget in auto mode."""
+        if self.preset_name != "auto":
+            preset = PRESETS.get(self.preset_name)
+            if preset is None:
+                log.warning(f"Unknown RENDER_PRESET '{self.preset_name}'. Using 'standard'.")
+                preset = PRESETS["standard"]
+            return preset, {}
+
+        preset, report = choose_preset(
+            lambda p: self._probe(p, base_config, work_dir),
+            self.budget_seconds,
+            FRAME_COUNT,
+            self.workers,
+        )
+        log.info(f"🎚️  Auto preset: '{preset.name}' (estimated {report['estimated_seconds']}s after {report['probe_seconds']}s of probes, budget {self.budget_seconds:.0f}s)")
+        return preset, report
+
+    def _shot_key(self, scene_hash: str, base_config: dict) -> str:
+        """What the frames depend on: scene, timing and camera path."""
+        camera_map = base_config.get("camera_map")
+        map_hash = file_sha256(Path(camera_map)) if camera_map and os.path.exists(camera_map) else None
+        return cache_key(scene_hash, FRAME_COUNT, FPS, base_config["machine_order"], map_hash)
+
+    def _request_key(self, shot_key: str, with_output: bool = True) -> str:
+        """Everything that was asked for: the shot, preset (or budget) and, for the result, the output mode."""
+        budget = self.budget_seconds if self.preset_name == "auto" else None
+        return cache_key(shot_key, self.preset_name, budget, *([self.output_mode] if with_output else []))
+
+    def _cached_result(self, output_path: Path, request_key: str) -> bool:
+        """True if cinematic.mp4 was already rendered from this exact request."""
+        report_path = output_path.with_name("render_report.json")
+        if not (output_path.exists() and report_path.exists()):
+            return False
+        try:
+            with open(report_path, "r") as f:
+                return json.load(f).get("request_key") == request_key
+        except (OSError, json.JSONDecodeError):
+            return False
+
+    @staticmethod
+    def _preset_choice_path(cache_root: Path, request_key: str) -> Path:
+        return cache_root / f"{request_key[:16]}.preset.json"
+
+    def _prune_preset_choices(self, cache_root: Path, request_key: str):
+        """Drops auto preset choices of older requests (same pass as the frame sets)."""
+        keep = self._preset_choice_path(cache_root, request_key)
+        for path in cache_root.glob("*.preset.json"):
+            if path != keep:
+                path.unlink(missing_ok=True)
+
+    def _resolve_cached_preset(self, base_config: dict, work_dir: Path, cache_root: Path, request_key: str):
+        """Auto mode probes once per request; a resumed render reuses the choice."""
+        choice_path = self._preset_choice_path(cache_root, request_key)
+        if self.preset_name == "auto" and choice_path.exists():
+            with open(choice_path, "r") as f:
+                saved = json.load(f)
+            log.info(f"🎚️  Reusing auto preset '{saved['preset']['name']}' from the previous attempt")
+            return RenderPreset(**saved["preset"]), saved["report"]
+
+        preset, auto_report = self._resolve_preset(base_config, work_dir)
+        if self.preset_name == "auto":
+            with open(choice_path, "w") as f:
+                json.dump({"preset": preset.to_config(), "report": auto_report}, f)
+        return preset, auto_report
+
     def render(self, scene_path: Path, metadata: dict, output_path: Path) -> Path:
         """
-        Calls Blender via subprocess to execute the cinematic_render.py script.
+        Renders the flythrough with N parallel Blender workers into a frame cache
+        keyed by the scene hash and render config, then encodes the PNG sequence
+        into the final MP4 with a single ffmpeg pass.
+
+        - Same scene + config as the existing cinematic.mp4: nothing is rendered.
+        - Interrupted render: only the missing frames are rendered again.
+
+        Progress (frames, percent, ETA) goes to metadata["status_path"] if given.
         """
         # Define paths
-        script_path = Path(__file__).parent.parent / "scripts" / "cinematic_render.py"
-        
+        started = time.perf_counter()
+        self.progress = RenderProgress(metadata.get("status_path"))
+        work_dir = output_path.parent
+        cache_root = work_dir / "render_cache"
+        cache_root.mkdir(parents=True, exist_ok=True)
+        # Never next to the builder's camera_map.json: that one is an input (and part of the shot key)
+        self.fallback_camera_map = cache_root / "camera_map.json"
+
         # We need to save the metadata (Machine Order, etc.) to a temp config
         # so the Blender script can read it.
-        config_payload = {
+        base_config = {
             "glb_path": str(scene_path),
             "output_video": str(output_path),
-            "output_metadata": str(output_path.parent / "camera_map.json"),
-            "machine_order": [m["id"] for m in metadata.get("layout", {}).get("machines", [])]
+            "output_metadata": str(self.fallback_camera_map),
+            "camera_map": metadata.get("camera_map"),  # Precomputed by the builder (glTF frame)
+            "machine_order": [m["id"] for m in metadata.get("layout", {}).get("machines", [])],
+            "frame_count": FRAME_COUNT,
+            "threads": self.threads_per_worker,
         }
-        
-        config_path = output_path.parent / "render_config.json"
-        with open(config_path, "w") as f:
-            json.dump(config_payload, f)
 
-        log.info("🎥 Launching Blender Headless Engine...")
-        
-        cmd = [
-            "blender",
-            "-b",                 # Background mode
-            "-P", str(script_path), # Run Python Script
-            "--",                 # Pass args to script
-            str(config_path)
+        shot_key = self._shot_key(file_sha256(scene_path), base_config)
+        request_key = self._request_key(shot_key)
+        if self._cached_result(output_path, request_key):
+            log.info(f"♻️  Scene and render config unchanged. Reusing {output_path.name}")
+            self.progress.set_state("done", cached=True, percent=100.0, eta_seconds=0)
+            return output_path
+
+        if self.preset_name == "auto":
+            self.progress.set_state("probing")
+        # mp4 and hls share the preset choice and the frames: only the encode differs
+        preset_key = self._request_key(shot_key, with_output=False)
+        preset, auto_report = self._resolve_cached_preset(base_config, work_dir, cache_root, preset_key)
+        base_config["render"] = preset.to_config()
+
+        frames = FrameCache(cache_root, cache_key(shot_key, preset.to_config()))
+        base_config["output_frames"] = frames.blender_pattern
+        missing = frames.missing(FRAME_COUNT)
+
+        segmenter = None
+        if self.output_mode == "hls":
+            # Segments are cut while the workers render; the dashboard can play the start early
+            segmenter = SegmentedEncoder(work_dir / "hls", frames, FRAME_COUNT, FPS)
+            segmenter.start()
+            self.progress.set_state("queued", stream=f"{work_dir.name}/hls/{PLAYLIST_NAME}")
+
+        render_started = time.perf_counter()
+        self.progress.start_frames(FRAME_COUNT, cached=FRAME_COUNT - len(missing))
+        if missing:
+            if len(missing) < FRAME_COUNT:
+                log.info(f"⏯️  Resuming render: {FRAME_COUNT - len(missing)}/{FRAME_COUNT} frames cached")
+            if not self._render_frames(base_config, split_frame_list(missing, self.workers), work_dir):
+                if segmenter:
+                    segmenter.abort()
+                self.progress.set_state("failed")
+                return None
+        render_seconds = time.perf_counter() - render_started
+
+        self.progress.set_state("encoding", eta_seconds=None)
+        if segmenter:
+            result = output_path if segmenter.finish() and remux_to_mp4(segmenter.playlist, output_path) else None
+        else:
+            result = self._encode(frames, output_path)
+        self.progress.set_state("done" if result else "failed", eta_seconds=0 if result else None)
+        if result:
+            self._write_report(
+                output_path, preset, auto_report, render_seconds, time.perf_counter() - started,
+                cache={"request_key": request_key, "frames_key": frames.key, "frames_rendered": len(missing)},
+            )
+            frames.prune_others()
+            self._prune_preset_choices(cache_root, preset_key)
+            if not self.keep_frames:
+                frames.clear()
+        return result
+
+    def _render_frames(self, base_config: dict, groups: list, work_dir: Path) -> bool:
+        """Runs one Blender worker per group of frame ranges; False if any worker failed."""
+        if self.worker_client:
+            return self._render_on_workers(base_config, groups)
+
+        log.info(f"🎥 Launching {len(groups)} Blender Headless Workers ({self.threads_per_worker} threads each)...")
+
+        procs = []
+        for i, ranges in enumerate(groups):
+            config_payload = dict(base_config, frame_ranges=ranges, write_metadata=(i == 0))
+            config_path = work_dir / f"render_config_{i}.json"
+            with open(config_path, "w") as f:
+                json.dump(config_payload, f)
+
+            cmd = self._blender_cmd(config_path)
+            # Stream stdout: every line goes to the worker log and the progress parser
+            log_path = work_dir / f"render_worker_{i}.log"
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1, errors="replace")
+            reader = threading.Thread(target=self._stream_output, args=(proc, log_path), daemon=True)
+            reader.start()
+            procs.append((proc, reader, log_path))
+
+        failed = False
+        for proc, reader, log_path in procs:
+            proc.wait()
+            reader.join()
+            if proc.returncode != 0:
+                failed = True
+                tail = log_path.read_text(errors="replace").splitlines()[-30:]
+                log.error(f"❌ Blender Error ({log_path.name}):\n" + "\n".join(tail))
+
+        return not failed
+
+    def _stream_output(self, proc: subprocess.Popen, log_path: Path):
+        with open(log_path, "w") as log_file:
+            for line in proc.stdout:
+                log_file.write(line)
+                self.progress.feed_line(line)
+
+    def _render_on_workers(self, base_config: dict, groups: list) -> bool:
+        """Queues one job per group on the persistent workers and follows their progress."""
+        self.worker_client.ensure_workers(len(groups))
+        job_ids = [
+            self.worker_client.submit(dict(base_config, frame_ranges=ranges, write_metadata=(i == 0)))
+            for i, ranges in enumerate(groups)
         ]
+        log.info(f"📬 Queued {len(job_ids)} render jobs on persistent Blender workers")
+
+        last_logged = [0.0]
 
+        def _progress(statuses: dict):
+            self.progress.set_frames_done(sum(s.get("frames_done", 0) for s in statuses.values()))
+            if time.perf_counter() - last_logged[0] < 10:
+                return
+            last_logged[0] = time.perf_counter()
+            done = sum(s.get("frames_done", 0) for s in statuses.values())
+            total = sum(s.get("frames_total", 0) for s in statuses.values()) or "?"
+            queued = sum(1 for s in statuses.values() if s["state"] == "queued")
+            log.info(f"     🎞️ {done}/{total} frames rendered ({queued} jobs waiting for a worker)")
+
+        statuses = self.worker_client.wait(job_ids, on_progress=_progress)
+        failed = [s for s in statuses.values() if s["state"] != "done"]
+        for status in failed:
+            log.error(f"❌ Blender job {status['job_id']} {status['state']}:\n{status.get('error', '')}")
+        return not failed
+
+    def _write_report(self, output_path: Path, preset: RenderPreset, auto_report: dict, render_seconds: float, total_seconds: float, cache: dict):
+        """Writes the chosen settings and measured timings next to the video."""
+        report = {
+            "mode": self.preset_name,
+            "preset": preset.to_config(),
+            "frames": FRAME_COUNT,
+            "workers": self.workers,
+            "threads_per_worker": self.threads_per_worker,
+            "budget_seconds": self.budget_seconds if self.preset_name == "auto" else None,
+            "render_seconds": round(render_seconds, 1),
+            "total_seconds": round(total_seconds, 1),
+            "seconds_per_frame": round(render_seconds * self.workers / max(1, cache["frames_rendered"]), 3),
+        }
+        report.update(auto_report)
+        report.update(cache)
+
+        report_path = output_path.with_name("render_report.json")
+        with open(report_path, "w") as f:
+            json.dump(report, f, indent=4)
+        log.info(f"🧾 Render report: {report_path}")
+
+    def _encode(self, frames: FrameCache, output_path: Path) -> Path:
+        """Concatenates all worker slices (one numbered PNG sequence) into the MP4."""
+        log.info("🎞️ Encoding frame sequence with ffmpeg...")
+        cmd = [
+            "ffmpeg", "-y",
+            "-framerate", str(FPS),
+            "-start_number", "1",
+            "-i", frames.ffmpeg_pattern,
+            "-c:v", "libx264",
+            "-pix_fmt", "yuv420p",
+            "-crf", "23",
+            str(output_path)
+        ]
         try:
-            # Run Blender
-            # Capture output to avoid spamming main log unless error
-            result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+            subprocess.run(cmd, check=True, capture_output=True, text=True)
             log.info("✅ Blender Render Successful")
             return output_path
-            
+
         except subprocess.CalledProcessError as e:
-            log.error(f"❌ Blender Error:\n{e.stderr}")
-            return None
\ No newline at end of file
+            log.error(f"❌ ffmpeg Error:\n{e.stderr}")
+            return None
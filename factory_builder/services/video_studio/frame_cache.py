@@ -0,0 +1,102 @@
+"""
+On-disk frame cache for resumable flythrough renders.
+
+Frames live in render_cache/<key>/frame_####.png, where the key hashes the
+scene GLB and everything that changes the pictures (preset, frame count,
+camera path). After a crash only the missing or truncated frames are
+rendered again. Once the video is published the frames are deleted, unless
+RENDER_KEEP_FRAMES=1.
+"""
+import hashlib
+import json
+import shutil
+from pathlib import Path
+from typing import Iterable, List, Tuple
+
+PNG_TRAILER = b"IEND\xaeB`\x82"
+
+
+def cache_key(*parts) -> str:
+    """Stable hash of JSON-serializable parts."""
+    payload = json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def is_complete_png(path: Path) -> bool:
+    """A frame interrupted mid-write has no IEND trailer."""
+    try:
+        with open(path, "rb") as f:
+            f.seek(-len(PNG_TRAILER), 2)
+            return f.read() == PNG_TRAILER
+    except OSError:
+        return False
+
+
+def frames_to_ranges(frames: Iterable[int]) -> List[Tuple[int, int]]:
+    """[1, 2, 3, 7, 8] -> [(1, 3), (7, 8)]"""
+    ranges = []
+    for f in sorted(frames):
+        if ranges and f == ranges[-1][1] + 1:
+            ranges[-1] = (ranges[-1][0], f)
+        else:
+            ranges.append((f, f))
+    return ranges
+
+
+def split_frame_list(frames: List[int], workers: int) -> List[List[Tuple[int, int]]]:
+    """
+    Splits the frames to render into at most `workers` near-equal groups of
+    consecutive frames, each expressed as contiguous ranges.
+    """
+    frames = sorted(frames)
+    if not frames:
+        return []
+    workers = max(1, min(workers, len(frames)))
+    size, extra = divmod(len(frames), workers)
+    groups, cursor = [], 0
+    for i in range(workers):
+        length = size + (1 if i < extra else 0)
+        groups.append(frames_to_ranges(frames[cursor:cursor + length]))
+        cursor += length
+    return groups
+
+
+class FrameCache:
+    def __init__(self, root: Path, key: str):
+        self.root = Path(root)
+        self.key = key
+        self.dir = self.root / key[:16]
+        self.dir.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def blender_pattern(self) -> str:
+        return str(self.dir / "frame_####")
+
+    @property
+    def ffmpeg_pattern(self) -> str:
+        return str(self.dir / "frame_%04d.png")
+
+    def frame_path(self, frame: int) -> Path:
+        return self.dir / f"frame_{frame:04d}.png"
+
+    def missing(self, frame_count: int) -> List[int]:
+        """Frames still to render; truncated frames are deleted."""
+        todo = []
+        for frame in range(1, frame_count + 1):
+            path = self.frame_path(frame)
+            if path.exists() and is_complete_png(path):
+                continue
+            if path.exists():
+                path.unlink()
+            todo.append(frame)
+        return todo
+
+    def clear(self):
+        """Drops this frame set (the video it was rendered for is published)."""
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def prune_others(self):
+        """Drops frame sets of older scenes / configs."""
+        for child in self.root.iterdir():
+            if child.is_dir() and child != self.dir:
+                shutil.rmtree(child, ignore_errors=True)
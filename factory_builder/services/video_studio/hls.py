@@ -0,0 +1,158 @@
+"""
+Segmented (HLS) output for the flythrough.
+
+Frames are piped into ffmpeg in order while the workers are still rendering.
+ffmpeg cuts fixed-duration .ts segments and appends each one to an EVENT
+playlist, so the dashboard can start playing while the rest renders.
+
+The playlist only lists closed segments. After a crash, every listed segment
+is kept and encoding resumes at the first frame of the next one, with
+append_list and a timestamp offset so the playlist continues seamlessly.
+"""
+import json
+import re
+import shutil
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from factory_builder.utils import get_logger
+from .frame_cache import FrameCache, is_complete_png
+
+log = get_logger("HLS")
+
+SEGMENT_SECONDS = 2
+PLAYLIST_NAME = "index.m3u8"
+EXTINF_RE = re.compile(r"^#EXTINF:", re.MULTILINE)
+
+
+def listed_segments(playlist: Path) -> int:
+    """Number of closed segments in a playlist (0 if missing)."""
+    if not playlist.exists():
+        return 0
+    return len(EXTINF_RE.findall(playlist.read_text(errors="replace")))
+
+
+def is_finished(playlist: Path) -> bool:
+    return playlist.exists() and "#EXT-X-ENDLIST" in playlist.read_text(errors="replace")
+
+
+class SegmentedEncoder:
+    """
+    Feeds frames 1..frame_count from a FrameCache into ffmpeg as they appear.
+    start() returns immediately; finish() waits for ffmpeg, abort() keeps what was written.
+    """
+
+    def __init__(self, out_dir: Path, frames: FrameCache, frame_count: int, fps: int, poll_seconds: float = 0.2):
+        self.out_dir = Path(out_dir)
+        self.playlist = self.out_dir / PLAYLIST_NAME
+        self.frames = frames
+        self.frame_count = frame_count
+        self.fps = fps
+        self.poll_seconds = poll_seconds
+        self.frames_per_segment = fps * SEGMENT_SECONDS
+
+        self._abort = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._proc: Optional[subprocess.Popen] = None
+        self.error = None
+
+    def _prepare_dir(self) -> int:
+        """Keeps segments of the same frame set; returns the first frame still to encode."""
+        state_path = self.out_dir / "hls_state.json"
+        if state_path.exists():
+            with open(state_path, "r") as f:
+                if json.load(f).get("frames_key") != self.frames.key:
+                    shutil.rmtree(self.out_dir)  # Different scene or config
+
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        with open(state_path, "w") as f:
+            json.dump({"frames_key": self.frames.key}, f)
+
+        return listed_segments(self.playlist) * self.frames_per_segment + 1
+
+    def _ffmpeg_cmd(self, first_frame: int) -> list:
+        return [
+            "ffmpeg", "-y", "-loglevel", "error",
+            "-f", "image2pipe", "-c:v", "png", "-framerate", str(self.fps), "-i", "-",
+            "-c:v", "libx264", "-pix_fmt", "yuv420p", "-crf", "23",
+            # Keyframe exactly every segment so cuts land on frame multiples
+            "-g", str(self.frames_per_segment), "-keyint_min", str(self.frames_per_segment), "-sc_threshold", "0",
+            "-force_key_frames", f"expr:gte(t,n_forced*{SEGMENT_SECONDS})",
+            "-output_ts_offset", f"{(first_frame - 1) / self.fps:.6f}",
+            "-f", "hls",
+            "-hls_time", str(SEGMENT_SECONDS),
+            "-hls_playlist_type", "event",
+            # temp_file: segments/playlist appear atomically, a killed ffmpeg leaves no torn entry
+            "-hls_flags", "append_list+independent_segments+temp_file",
+            "-hls_segment_filename", str(self.out_dir / "segment_%05d.ts"),
+            str(self.playlist),
+        ]
+
+    def start(self) -> bool:
+        """False if the playlist is already complete for this frame set."""
+        first_frame = self._prepare_dir()
+        if first_frame > self.frame_count:
+            if not is_finished(self.playlist):
+                # Killed after the last segment but before the trailer
+                with open(self.playlist, "a") as f:
+                    f.write("#EXT-X-ENDLIST\n")
+            return False
+        if first_frame > 1:
+            log.info(f"⏯️  HLS: {first_frame - 1} frames already segmented, resuming")
+
+        self._proc = subprocess.Popen(self._ffmpeg_cmd(first_frame), stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+        self._thread = threading.Thread(target=self._feed, args=(first_frame,), daemon=True)
+        self._thread.start()
+        return True
+
+    def _feed(self, first_frame: int):
+        try:
+            for frame in range(first_frame, self.frame_count + 1):
+                path = self.frames.frame_path(frame)
+                while not (path.exists() and is_complete_png(path)):
+                    if self._abort.wait(self.poll_seconds):
+                        return
+                self._proc.stdin.write(path.read_bytes())
+            self._proc.stdin.close()
+        except (BrokenPipeError, OSError) as e:
+            self.error = str(e)
+
+    def finish(self, timeout: Optional[float] = None) -> bool:
+        """Waits for the last frame and ffmpeg's final playlist write."""
+        if self._proc is None:
+            return is_finished(self.playlist)
+        self._thread.join(timeout)
+        self._proc.wait()
+        stderr = self._proc.stderr.read().decode(errors="replace")
+        if self._proc.returncode != 0 or self.error:
+            log.error(f"❌ HLS encoder failed: {self.error or stderr}")
+            return False
+        return True
+
+    def abort(self):
+        """
+        Stops like a crash would: ffmpeg is killed, not closed, so it never appends
+        a partial segment or ENDLIST. Segments in the playlist stay valid for a resume.
+        """
+        self._abort.set()
+        if self._proc is not None and self._proc.poll() is None:
+            self._proc.kill()  # Also unblocks a feeder stuck on a full pipe
+            self._proc.wait()
+        if self._thread:
+            self._thread.join()
+
+
+def remux_to_mp4(playlist: Path, output_path: Path) -> bool:
+    """Single-file copy of the finished playlist (no re-encode)."""
+    cmd = ["ffmpeg", "-y", "-loglevel", "error", "-i", str(playlist), "-c", "copy", "-movflags", "+faststart", str(output_path)]
+    started = time.perf_counter()
+    try:
+        subprocess.run(cmd, check=True, capture_output=True, text=True)
+    except subprocess.CalledProcessError as e:
+        log.error(f"❌ ffmpeg remux Error:\n{e.stderr}")
+        return False
+    log.info(f"🎞️ Remuxed HLS playlist to {output_path.name} in {time.perf_counter() - started:.1f}s")
+    return True
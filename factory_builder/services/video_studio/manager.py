@@ -1,8 +1,11 @@
 import os
+import threading
 from pathlib import Path
 from factory_builder.utils import get_logger
 from .engines.blender_engine import BlenderEngine
 from .engines.ai_engine import AIEngine
+from .previews import MachinePreviewBatch
+from .progress import RenderProgress
 
 log = get_logger("VideoManager")
 
@@ -11,7 +14,41 @@ class VideoStudio:
         self.ctx = context
         # Default to blender, but allows env override
         self.mode = os.getenv("VIDEO_ENGINE", "blender").lower()
-        
+        # Read by the Twin to show render progress / ETA
+        self.status_path = self.ctx.shared_root / "video_status.json"
+
+    def start(self):
+        """
+        Runs produce() on a background (non-daemon) thread so the build returns as soon
+        as the scene exists; the process still waits for the video before exiting.
+        VIDEO_BACKGROUND=0 keeps the old blocking behaviour.
+        """
+        if os.getenv("VIDEO_BACKGROUND", "1") == "0":
+            self.produce()
+            return None
+
+        RenderProgress(self.status_path)  # "queued" until the engine picks it up
+        thread = threading.Thread(target=self._produce_safely, name=f"video-{self.ctx.project_name}", daemon=False)
+        thread.start()
+        log.info(f"🎬 Video production running in background. Status: {self.status_path}")
+        return thread
+
+    def _produce_safely(self):
+        try:
+            self.produce()
+        except Exception as e:
+            log.exception(f"❌ Video production crashed: {e}")
+            RenderProgress(self.status_path).set_state("failed", error=str(e))
+
+    def produce_previews(self, contract: dict, camera_map: Path = None):
+        """Thumbnail + orbit clip per machine, one scene import in total."""
+        machine_ids = [m.get("id", m.get("name")) for m in contract.get("machines", [])]
+        if not machine_ids:
+            return None
+        return MachinePreviewBatch(self.ctx.shared_root / "previews").run(
+            self.ctx.final_scene_glb, machine_ids, camera_map
+        )
+
     def produce(self):
         log.info(f"🎬 Video Studio Initialized (Mode: {self.mode})")
         
@@ -24,6 +61,7 @@ class VideoStudio:
         
         if not scene_path.exists():
             log.error(f"Cannot generate video: Scene missing at {scene_path}")
+            RenderProgress(self.status_path).set_state("failed", error="Scene missing")
             return
 
         # Load Layout Metadata (to know machine order)
@@ -35,25 +73,30 @@ class VideoStudio:
         if self.mode == "ai":
             engine = AIEngine()
         else:
-            engine = BlenderEngine()
+            # Shared across projects so warm workers serve every builder run
+            engine = BlenderEngine(queue_dir=self.ctx.builder_root.parent / ".cache" / "render_queue")
             
+        # Camera map computed by the builder right after composition (if any)
+        camera_map = self.ctx.builder_scene / "camera_map.json"
+
+        # Machine inspector previews first: short, and useful before the flythrough is done
+        if self.mode != "ai" and os.getenv("MACHINE_PREVIEWS", "1") != "0":
+            self.produce_previews(contract, camera_map)
+
         # Render
         result_path = engine.render(
             scene_path=scene_path,
-            metadata={"layout": contract}, # Pass full contract
+            metadata={
+                "layout": contract, # Pass full contract
+                "camera_map": str(camera_map) if camera_map.exists() else None,
+                "status_path": self.status_path,
+            },
             output_path=video_out
         )
 
         if result_path and result_path.exists():
-            # Copy camera metadata to Shared Data for Streamlit
-            src_meta = self.ctx.builder_scene / "camera_map.json"
-            dst_meta = self.ctx.shared_root / "camera_map.json"
-            
-            if src_meta.exists():
-                import shutil
-                shutil.copy(src_meta, dst_meta)
-                log.info(f"📍 Camera coordinates published to: {dst_meta}")
-            
+            # The Twin only reads the builder's glTF-frame camera_map.json; Blender's fallback
+            # map (Z-up, flythrough framing) stays in render_cache and is never published
             log.success(f"🎞️ Video Production Complete: {result_path}")
         else:
             log.error("Video production failed.")
\ No newline at end of file
@@ -0,0 +1,125 @@
+"""
+Render presets for the video studio and the time-budgeted "auto" selection.
+
+Per-frame cost is modelled as k_engine * samples * pixels. `k_engine` is
+measured by rendering a few probe frames with the cheapest candidate of each
+engine. The first ladder entry whose estimate fits what is left of the
+wall-clock budget after probing is chosen.
+"""
+import math
+import time
+from dataclasses import dataclass, asdict
+from typing import Callable, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class RenderPreset:
+    name: str
+    engine: str          # Blender render engine id
+    samples: int
+    resolution_x: int
+    resolution_y: int
+
+    @property
+    def cost_units(self) -> float:
+        return float(self.samples * self.resolution_x * self.resolution_y)
+
+    def to_config(self) -> dict:
+        return asdict(self)
+
+
+PRESETS = {
+    "draft": RenderPreset("draft", "BLENDER_WORKBENCH", 1, 960, 540),
+    "preview": RenderPreset("preview", "BLENDER_EEVEE", 16, 1280, 720),
+    "standard": RenderPreset("standard", "CYCLES", 32, 1280, 720),
+    "final": RenderPreset("final", "CYCLES", 128, 1920, 1080),
+}
+
+# Best -> cheapest. "auto" picks the first entry that fits the budget.
+AUTO_LADDER: List[RenderPreset] = [
+    PRESETS["final"],
+    RenderPreset("high", "CYCLES", 64, 1920, 1080),
+    PRESETS["standard"],
+    RenderPreset("fast", "CYCLES", 16, 1280, 720),
+    RenderPreset("low", "CYCLES", 8, 960, 540),
+    PRESETS["preview"],
+    RenderPreset("eevee_low", "BLENDER_EEVEE", 8, 960, 540),
+    PRESETS["draft"],
+]
+
+# probe(preset) -> (seconds per frame, fixed setup seconds) or None if the engine failed
+ProbeFn = Callable[[RenderPreset], Optional[Tuple[float, float]]]
+
+# Probes stop once they have used this share of the budget (the rest is for rendering)
+PROBE_BUDGET_FRACTION = 0.2
+
+
+def estimate_seconds(per_frame: float, setup: float, frame_count: int, workers: int) -> float:
+    """Wall clock with `workers` parallel processes, each paying setup once."""
+    return setup + per_frame * math.ceil(frame_count / max(1, workers))
+
+
+def choose_preset(
+    probe: ProbeFn,
+    budget_seconds: float,
+    frame_count: int,
+    workers: int,
+    ladder: List[RenderPreset] = AUTO_LADDER,
+    clock: Callable[[], float] = time.monotonic,
+) -> Tuple[RenderPreset, dict]:
+    """
+    Walks the ladder best-first; each engine is probed once, on its cheapest
+    candidate, and dearer candidates are extrapolated by samples x pixels.
+    Probe time is taken out of the budget, and no further engine is probed
+    once probes have used PROBE_BUDGET_FRACTION of it.
+
+    :return: (chosen preset, report dict with probes and estimates)
+    """
+    cheapest = {preset.engine: preset for preset in ladder}  # Best -> cheapest: the last one wins
+    engine_cost = {}   # engine -> (seconds per cost unit, setup)
+    failed = set()
+    probes, estimates = [], []
+    fallback = None
+    started = clock()
+
+    def report(estimate: float, fits: bool) -> dict:
+        return {
+            "probes": probes, "estimates": estimates, "estimated_seconds": round(estimate, 1),
+            "probe_seconds": round(clock() - started, 1), "fits_budget": fits,
+        }
+
+    for preset in ladder:
+        if preset.engine in failed:
+            continue
+        if preset.engine not in engine_cost:
+            if fallback is not None and clock() - started >= PROBE_BUDGET_FRACTION * budget_seconds:
+                break  # Probing has had its share: settle for what was measured
+            probed = cheapest[preset.engine]
+            measured = probe(probed)
+            if measured is None:
+                failed.add(preset.engine)
+                probes.append({"preset": probed.name, "engine": probed.engine, "failed": True})
+                continue
+            per_frame, setup = measured
+            engine_cost[preset.engine] = (per_frame / probed.cost_units, setup)
+            probes.append({
+                "preset": probed.name,
+                "engine": probed.engine,
+                "seconds_per_frame": round(per_frame, 4),
+                "setup_seconds": round(setup, 2),
+            })
+
+        unit, setup = engine_cost[preset.engine]
+        estimate = estimate_seconds(unit * preset.cost_units, setup, frame_count, workers)
+        estimates.append({"preset": preset.name, "estimated_seconds": round(estimate, 1)})
+        fallback = (preset, estimate)
+
+        if estimate <= budget_seconds - (clock() - started):
+            return preset, report(estimate, True)
+
+    if fallback is None:
+        raise RuntimeError("No render engine could complete a probe frame.")
+
+    # Nothing fits: go with the cheapest candidate that was measured
+    preset, estimate = fallback
+    return preset, report(estimate, False)
@@ -0,0 +1,100 @@
+"""
+Per-machine previews for the Twin's machine inspector.
+
+One Blender session imports the scene once and renders a thumbnail and a
+short orbit clip for every machine (scripts/machine_previews.py). Outputs go
+to shared_data/<project>/previews/<machine>/ with a manifest.json. The batch
+is skipped when the manifest was built from the same scene and settings.
+"""
+import json
+import os
+import subprocess
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from factory_builder.services.hashing import file_sha256
+from factory_builder.utils import get_logger, sanitize_filename
+from .frame_cache import cache_key
+from .presets import PRESETS
+
+log = get_logger("Previews")
+
+PREVIEW_RESOLUTION = (640, 360)
+ORBIT_FRAMES = 48  # 2s at 24 fps
+
+
+class MachinePreviewBatch:
+    def __init__(self, output_dir: Path, preset: str = None, orbit_frames: int = None):
+        self.output_dir = Path(output_dir)
+        self.manifest_path = self.output_dir / "manifest.json"
+        self.preset = PRESETS.get((preset or os.getenv("PREVIEW_PRESET") or "preview").lower(), PRESETS["preview"])
+        self.orbit_frames = ORBIT_FRAMES if orbit_frames is None else orbit_frames
+        self.script_path = Path(__file__).parent / "scripts" / "machine_previews.py"
+
+    def _settings(self) -> dict:
+        render = dict(self.preset.to_config(), resolution_x=PREVIEW_RESOLUTION[0], resolution_y=PREVIEW_RESOLUTION[1])
+        return {"render": render, "orbit_frames": self.orbit_frames}
+
+    def _is_current(self, key: str) -> bool:
+        if not self.manifest_path.exists():
+            return False
+        with open(self.manifest_path, "r") as f:
+            return json.load(f).get("key") == key
+
+    def run(self, scene_path: Path, machine_ids: List[str], camera_map: Optional[Path] = None) -> Optional[dict]:
+        """Renders all previews in one Blender process; returns the manifest (None on failure)."""
+        settings = self._settings()
+        map_hash = file_sha256(camera_map) if camera_map and camera_map.exists() else None
+        key = cache_key(file_sha256(scene_path), machine_ids, map_hash, settings)
+        if self._is_current(key):
+            log.info("♻️  Machine previews are up to date")
+            with open(self.manifest_path, "r") as f:
+                return json.load(f)
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        raw_manifest = self.output_dir / "manifest.partial.json"
+        config = dict(
+            settings,
+            glb_path=str(scene_path),
+            camera_map=str(camera_map) if camera_map and camera_map.exists() else None,
+            machine_order=machine_ids,
+            folders={m_id: sanitize_filename(m_id) for m_id in machine_ids},
+            output_dir=str(self.output_dir),
+            manifest_path=str(raw_manifest),
+            threads=os.cpu_count(),
+        )
+        config_path = self.output_dir / "preview_config.json"
+        with open(config_path, "w") as f:
+            json.dump(config, f)
+
+        log.info(f"🖼️  Rendering previews for {len(machine_ids)} machines (one Blender session)...")
+        started = time.perf_counter()
+        cmd = ["blender", "-b", "-P", str(self.script_path), "--", str(config_path)]
+        log_path = self.output_dir / "previews.log"
+        with open(log_path, "w") as log_file:
+            result = subprocess.run(cmd, stdout=log_file, stderr=subprocess.STDOUT)
+
+        if result.returncode != 0 or not raw_manifest.exists():
+            tail = log_path.read_text(errors="replace").splitlines()[-30:]
+            log.error("❌ Preview batch failed:\n" + "\n".join(tail))
+            return None
+
+        with open(raw_manifest, "r") as f:
+            machines = json.load(f)
+        raw_manifest.unlink()
+
+        manifest = {
+            "key": key,
+            "resolution": list(PREVIEW_RESOLUTION),
+            "orbit_frames": self.orbit_frames,
+            "preset": self.preset.name,
+            "machines": machines,
+        }
+        tmp = self.manifest_path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=4)
+        os.replace(tmp, self.manifest_path)
+
+        log.success(f"🖼️  {len(machines)} machine previews in {time.perf_counter() - started:.1f}s: {self.output_dir}")
+        return manifest
@@ -0,0 +1,117 @@
+"""
+Render progress published to shared_data/<project>/video_status.json.
+
+The Blender workers' stdout is streamed line by line; every saved frame
+bumps the counter and the ETA is extrapolated from the frames rendered in
+this run (cached frames from a resumed render do not skew it).
+"""
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+# Blender prints one "Saved: '<path>/frame_0012.png'" line per written frame
+SAVED_RE = re.compile(r"Saved: '.*?(\d+)\.png'")
+# ... and "Fra:12 Mem:..." status lines while rendering it
+FRA_RE = re.compile(r"^Fra:(\d+)\b")
+
+
+def parse_saved_frame(line: str) -> Optional[int]:
+    match = SAVED_RE.search(line)
+    return int(match.group(1)) if match else None
+
+
+def parse_current_frame(line: str) -> Optional[int]:
+    match = FRA_RE.match(line)
+    return int(match.group(1)) if match else None
+
+
+class RenderProgress:
+    """Thread-safe status file writer shared by all worker stream readers."""
+
+    def __init__(self, status_path: Optional[Path], min_interval: float = 1.0):
+        self.status_path = Path(status_path) if status_path else None
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._last_write = 0.0
+        self.status = {
+            "state": "queued",
+            "frame": None,
+            "frames_done": 0,
+            "frames_total": None,
+            "percent": 0.0,
+            "eta_seconds": None,
+            "started": time.time(),
+        }
+        self._render_started = None
+        self._cached = 0
+        self._write(force=True)
+
+    def set_state(self, state: str, **extra):
+        with self._lock:
+            self.status["state"] = state
+            self.status.update(extra)
+            self._write(force=True)
+
+    def start_frames(self, frames_total: int, cached: int = 0):
+        with self._lock:
+            self._render_started = time.time()
+            self._cached = cached
+            self.status.update(state="rendering", frames_total=frames_total, frames_done=cached)
+            self._refresh()
+            self._write(force=True)
+
+    def feed_line(self, line: str):
+        """Parses one line of Blender stdout."""
+        saved = parse_saved_frame(line)
+        if saved is not None:
+            self.frame_done(saved)
+            return
+        current = parse_current_frame(line)
+        if current is not None and current != self.status["frame"]:
+            with self._lock:
+                self.status["frame"] = current
+                self._write()
+
+    def frame_done(self, frame: Optional[int] = None, count: int = 1):
+        with self._lock:
+            if frame is not None:
+                self.status["frame"] = frame
+            self.status["frames_done"] += count
+            self._refresh()
+            self._write()
+
+    def set_frames_done(self, frames_done: int):
+        """Absolute counter (persistent workers report totals per job)."""
+        with self._lock:
+            self.status["frames_done"] = self._cached + frames_done
+            self._refresh()
+            self._write()
+
+    def _refresh(self):
+        total = self.status["frames_total"] or 0
+        done = min(self.status["frames_done"], total)
+        self.status["percent"] = round(100.0 * done / total, 1) if total else 0.0
+
+        rendered = done - self._cached
+        if self._render_started and rendered > 0:
+            elapsed = time.time() - self._render_started
+            self.status["eta_seconds"] = round(elapsed / rendered * (total - done), 1)
+
+    def _write(self, force: bool = False):
+        if self.status_path is None:
+            return
+        now = time.time()
+        if not force and now - self._last_write < self.min_interval:
+            return
+        self._last_write = now
+        self.status["updated"] = now
+
+        self.status_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.status_path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.status, f)
+        os.replace(tmp, self.status_path)
@@ -3,24 +3,32 @@ import json
 import sys
 import math
 import os
+import time
+import numpy as np
 from mathutils import Vector
 
-# --- ARGUMENT PARSING ---
-# Blender ignores args after "--", so we pass our JSON config there
-try:
-    args_start = sys.argv.index("--") + 1
-    config_path = sys.argv[args_start]
-except ValueError:
-    print("❌ Error: Config path not passed to Blender script")
-    sys.exit(1)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from scene_math import frame_ranges, grouped_bounds, match_objects  # noqa: E402,F401
 
-with open(config_path, "r") as f:
-    config = json.load(f)
+# Objects created per render job; a warm worker deletes them between jobs
+FLYPATH_NAME = "Flypath_Obj"
+CAMERA_NAME = "CinemaCam"
+
+
+# ==========================================
+# 0. CONFIG
+# ==========================================
+def load_config(argv) -> dict:
+    """Blender ignores args after "--", so we pass our JSON config there"""
+    try:
+        config_path = argv[argv.index("--") + 1]
+    except (ValueError, IndexError):
+        print("❌ Error: Config path not passed to Blender script")
+        sys.exit(1)
+
+    with open(config_path, "r") as f:
+        return json.load(f)
 
-GLB_PATH = config["glb_path"]
-OUTPUT_VIDEO = config["output_video"]
-OUTPUT_METADATA = config["output_metadata"]
-MACHINE_ORDER = config.get("machine_order", []) # List of IDs in flow order
 
 # ==========================================
 # 1. SETUP & IMPORT
@@ -29,145 +37,274 @@ def reset_scene():
     bpy.ops.object.select_all(action='SELECT')
     bpy.ops.object.delete()
 
-reset_scene()
 
-print(f"📥 Importing Scene: {GLB_PATH}")
-bpy.ops.import_scene.gltf(filepath=GLB_PATH)
+def import_scene(glb_path: str):
+    print(f"📥 Importing Scene: {glb_path}")
+    bpy.ops.import_scene.gltf(filepath=glb_path)
+
 
 # ==========================================
 # 2. METADATA & CAMERA CALCULATION
 # ==========================================
-camera_map = {}
-valid_objects = []
-
-print("📷 Computing Smart Camera Coordinates...")
-
-# Map logical flow to actual objects
-scene_objects = {obj.name: obj for obj in bpy.context.scene.objects if obj.type == 'MESH'}
-
-# Sort objects based on the flow order provided by the Architect
-ordered_objects = []
-for m_id in MACHINE_ORDER:
-    # Try finding exact match or sanitized match
-    obj = scene_objects.get(m_id)
-    if not obj:
-        # Fallback: check if name contains ID (Blender sometimes renames)
-        for name, o in scene_objects.items():
-            if m_id in name:
-                obj = o
-                break
-    if obj:
-        ordered_objects.append(obj)
-
-if not ordered_objects:
-    print("⚠️ No matching machines found. Using all meshes.")
-    ordered_objects = list(scene_objects.values())
-
-# Calculate Snap Coordinates per Machine
-for obj in ordered_objects:
-    # Calculate Bounding Box in World Space
-    bbox_corners = [obj.matrix_world @ Vector(corner) for corner in obj.bound_box]
-    
-    min_x = min([v.x for v in bbox_corners])
-    max_x = max([v.x for v in bbox_corners])
-    min_y = min([v.y for v in bbox_corners])
-    max_y = max([v.y for v in bbox_corners])
-    max_z = max([v.z for v in bbox_corners])
-    
-    center = Vector(((min_x + max_x)/2, (min_y + max_y)/2, (max_z)/2))
-    size_x = max_x - min_x
-    size_y = max_y - min_y
-    max_dim = max(size_x, size_y)
+def gltf_to_blender(v):
+    """glTF is Y-up; the Blender importer maps (x, y, z) -> (x, -z, y)."""
+    return Vector((v["x"], -v["z"], v["y"]))
+
+
+def build_object_index(machine_ids: list) -> dict:
+    """machine_id -> object, from node extras first, then names (see scene_math.match_objects)."""
+    return match_objects(machine_ids, (
+        (obj, obj.get("machine_id"), obj.name, obj.type == 'MESH') for obj in bpy.context.scene.objects
+    ))
+
+
+def world_bounds(entries: list):
+    """
+    World AABB of each (key, object) over the meshes of its subtree, in one NumPy pass.
+    :return: (keys that have geometry, lo (N, 3), hi (N, 3))
+    """
+    # Parent -> children once (Object.children_recursive scans the whole scene per call)
+    children = {}
+    for obj in bpy.context.scene.objects:
+        if obj.parent is not None:
+            children.setdefault(obj.parent.name, []).append(obj)
+
+    owners, corners, matrices = [], [], []
+    for i, (_, root) in enumerate(entries):
+        stack = [root]
+        while stack:
+            obj = stack.pop()
+            stack.extend(children.get(obj.name, ()))
+            if obj.type != 'MESH':
+                continue
+            owners.append(i)
+            corners.append([corner[:] for corner in obj.bound_box])
+            matrices.append([row[:] for row in obj.matrix_world])
+
+    # Owners are already grouped in order
+    found, lo, hi = grouped_bounds(owners, corners, matrices)
+    return [entries[i][0] for i in found], lo, hi
+
+
+def compute_camera_path(config: dict):
+    """
+    :return: (camera_map, path_points in Blender space in flow order, whether to write the map)
+    """
+    machine_order = config.get("machine_order", [])  # List of IDs in flow order
+    camera_map = {}
+    path_points = []
+
+    # Preferred: the map the builder computed right after composition
+    precomputed_map = config.get("camera_map")
+    if precomputed_map and os.path.exists(precomputed_map):
+        print(f"📷 Reusing builder camera map: {precomputed_map}")
+        with open(precomputed_map, "r") as f:
+            camera_map = json.load(f)
+        ordered_ids = [m_id for m_id in machine_order if m_id in camera_map] or list(camera_map)
+        path_points = [gltf_to_blender(camera_map[m_id]["position"]) for m_id in ordered_ids]
+        if path_points:
+            return camera_map, path_points, False  # The builder's map is already published
+
+    print("📷 Computing Smart Camera Coordinates...")
+
+    # Map logical flow to actual objects (one pass over the scene)
+    index = build_object_index(machine_order)
+    ordered_ids = [m_id for m_id in machine_order if m_id in index]
+
+    if not ordered_ids:
+        print("⚠️ No matching machines found. Using all meshes.")
+        index = {obj.name: obj for obj in bpy.context.scene.objects if obj.type == 'MESH'}
+        ordered_ids = list(index)
+
+    keys, lo, hi = world_bounds([(m_id, index[m_id]) for m_id in ordered_ids])
+    if not keys:
+        return camera_map, path_points, config.get("write_metadata", True)
+
+    center = np.column_stack(((lo[:, 0] + hi[:, 0]) / 2, (lo[:, 1] + hi[:, 1]) / 2, hi[:, 2] / 2))
+    size = hi - lo
+    max_dim = np.maximum(size[:, 0], size[:, 1])
 
     # 🎥 OPTIMAL SNAP STRATEGY
     # Position: Offset by 1.5x size along Y axis (Front view usually), elevated Z
     zoom_factor = 2.0
-    cam_pos = Vector((
-        center.x + (size_x * 0.5), 
-        center.y - (max_dim * zoom_factor), 
-        center.z + (max_dim * 1.0)
+    cam_pos = np.column_stack((
+        center[:, 0] + size[:, 0] * 0.5,
+        center[:, 1] - max_dim * zoom_factor,
+        center[:, 2] + max_dim * 1.0,
     ))
 
-    camera_map[obj.name] = {
-        "target": {"x": center.x, "y": center.y, "z": center.z},
-        "position": {"x": cam_pos.x, "y": cam_pos.y, "z": cam_pos.z}
-    }
+    for key, c, p in zip(keys, center.tolist(), cam_pos.tolist()):
+        camera_map[key] = {
+            "target": {"x": c[0], "y": c[1], "z": c[2]},
+            "position": {"x": p[0], "y": p[1], "z": p[2]}
+        }
+        path_points.append(Vector(p))
+
+    return camera_map, path_points, config.get("write_metadata", True)
 
-# Save Metadata for Streamlit
-with open(OUTPUT_METADATA, "w") as f:
-    json.dump(camera_map, f, indent=4)
-print(f"✅ Camera Metadata saved to: {OUTPUT_METADATA}")
 
 # ==========================================
 # 3. CINEMATIC PATH GENERATION
 # ==========================================
-print("🛤️ Generating Cinematic Path...")
-
-# Create a Curve
-curve_data = bpy.data.curves.new('Flypath', type='CURVE')
-curve_data.dimensions = '3D'
-curve_data.resolution_u = 64
-curve_obj = bpy.data.objects.new('Flypath_Obj', curve_data)
-bpy.context.collection.objects.link(curve_obj)
-
-spline = curve_data.splines.new('BEZIER')
-spline.bezier_points.add(len(ordered_objects) - 1) # First point exists by default
-
-for i, obj in enumerate(ordered_objects):
-    meta = camera_map[obj.name]
-    pos = meta["position"]
-    
-    # Set Point Position
-    b_point = spline.bezier_points[i]
-    b_point.co = (pos["x"], pos["y"], pos["z"])
-    b_point.handle_left_type = 'AUTO'
-    b_point.handle_right_type = 'AUTO'
-
-# Setup Camera
-cam_data = bpy.data.cameras.new("CinemaCam")
-cam_obj = bpy.data.objects.new("CinemaCam", cam_data)
-bpy.context.collection.objects.link(cam_obj)
-bpy.context.scene.camera = cam_obj
-
-# Follow Path Constraint
-constraint = cam_obj.constraints.new(type='FOLLOW_PATH')
-constraint.target = curve_obj
-constraint.use_curve_follow = True # Bank/Roll with curve
-constraint.forward_axis = 'FORWARD_Z' # Standard for Camera
-constraint.up_axis = 'UP_Y'
-
-# Animate path evaluation
-curve_obj.data.path_duration = 300 # 300 Frames
-curve_obj.data.eval_time = 0
-curve_obj.keyframe_insert(data_path="eval_time", frame=1)
-curve_obj.data.eval_time = 300
-curve_obj.keyframe_insert(data_path="eval_time", frame=300)
-
-# Track To (Always look slightly ahead or at center)
-# Simpler approach: Create an Empty that follows the path slightly ahead
-# For now, let's just use LOOK_AT constraint to the current machine logic
-# (Advanced: Keyframe the 'Track To' target per machine)
+def clear_flythrough():
+    """Removes the path and camera of a previous job (the imported scene stays)."""
+    for name in (CAMERA_NAME, FLYPATH_NAME):
+        obj = bpy.data.objects.get(name)
+        if obj is None:
+            continue
+        data = obj.data
+        bpy.data.objects.remove(obj, do_unlink=True)
+        if isinstance(data, bpy.types.Curve):
+            bpy.data.curves.remove(data)
+        elif isinstance(data, bpy.types.Camera):
+            bpy.data.cameras.remove(data)
+
+
+def build_flythrough(path_points: list, frame_count: int):
+    print("🛤️ Generating Cinematic Path...")
+    clear_flythrough()
+
+    # Create a Curve
+    curve_data = bpy.data.curves.new('Flypath', type='CURVE')
+    curve_data.dimensions = '3D'
+    curve_data.resolution_u = 64
+    curve_obj = bpy.data.objects.new(FLYPATH_NAME, curve_data)
+    bpy.context.collection.objects.link(curve_obj)
+
+    spline = curve_data.splines.new('BEZIER')
+    spline.bezier_points.add(len(path_points) - 1) # First point exists by default
+
+    for i, pos in enumerate(path_points):
+        # Set Point Position
+        b_point = spline.bezier_points[i]
+        b_point.co = (pos.x, pos.y, pos.z)
+        b_point.handle_left_type = 'AUTO'
+        b_point.handle_right_type = 'AUTO'
+
+    # Setup Camera
+    cam_data = bpy.data.cameras.new(CAMERA_NAME)
+    cam_obj = bpy.data.objects.new(CAMERA_NAME, cam_data)
+    bpy.context.collection.objects.link(cam_obj)
+    bpy.context.scene.camera = cam_obj
+
+    # Follow Path Constraint
+    constraint = cam_obj.constraints.new(type='FOLLOW_PATH')
+    constraint.target = curve_obj
+    constraint.use_curve_follow = True # Bank/Roll with curve
+    constraint.forward_axis = 'FORWARD_Z' # Standard for Camera
+    constraint.up_axis = 'UP_Y'
+
+    # Animate path evaluation
+    curve_obj.data.path_duration = frame_count
+    curve_obj.data.eval_time = 0
+    curve_obj.keyframe_insert(data_path="eval_time", frame=1)
+    curve_obj.data.eval_time = frame_count
+    curve_obj.keyframe_insert(data_path="eval_time", frame=frame_count)
+
+    # Track To (Always look slightly ahead or at center)
+    # Simpler approach: Create an Empty that follows the path slightly ahead
+    # For now, let's just use LOOK_AT constraint to the current machine logic
+    # (Advanced: Keyframe the 'Track To' target per machine)
+
 
 # ==========================================
 # 4. RENDER SETTINGS
 # ==========================================
-scene = bpy.context.scene
-scene.render.engine = 'CYCLES' # or EEVEE
-scene.cycles.device = 'CPU' # Docker compatibility
-scene.cycles.samples = 32   # Fast render
-
-scene.render.resolution_x = 1280
-scene.render.resolution_y = 720
-scene.render.fps = 24
-scene.frame_start = 1
-scene.frame_end = 300
-
-scene.render.filepath = OUTPUT_VIDEO
-scene.render.image_settings.file_format = 'FFMPEG'
-scene.render.ffmpeg.format = 'MPEG4'
-scene.render.ffmpeg.codec = 'H264'
-scene.render.ffmpeg.constant_rate_factor = 'MEDIUM'
-
-print(f"🎬 Starting Render: {OUTPUT_VIDEO}")
-bpy.ops.render.render(animation=True)
-print("✅ Render Complete.")
\ No newline at end of file
+def apply_render_settings(config: dict):
+    # Render preset (engine / samples / resolution), see video_studio/presets.py
+    render = config.get("render", {})
+    scene = bpy.context.scene
+    scene.render.engine = render.get("engine", 'CYCLES')
+    samples = render.get("samples", 32)
+    if scene.render.engine == 'CYCLES':
+        scene.cycles.device = 'CPU' # Docker compatibility
+        scene.cycles.samples = samples
+    elif scene.render.engine.startswith('BLENDER_EEVEE'):
+        scene.eevee.taa_render_samples = samples
+
+    scene.render.resolution_x = render.get("resolution_x", 1280)
+    scene.render.resolution_y = render.get("resolution_y", 720)
+    scene.render.resolution_percentage = 100
+    scene.render.fps = 24
+
+    threads = config.get("threads")  # Fixed CPU threads per worker (None = auto)
+    if threads:
+        scene.render.threads_mode = 'FIXED'
+        scene.render.threads = threads
+    else:
+        scene.render.threads_mode = 'AUTO'
+
+    output_frames = config.get("output_frames")  # e.g. /.../frame_#### -> PNG sequence
+    if output_frames:
+        # Image sequence: the engine encodes all worker slices with one ffmpeg pass
+        scene.render.filepath = output_frames
+        scene.render.image_settings.file_format = 'PNG'
+        scene.render.image_settings.color_mode = 'RGB'
+        scene.render.use_overwrite = False  # Never redo a frame already in the cache
+    else:
+        scene.render.filepath = config["output_video"]
+        scene.render.image_settings.file_format = 'FFMPEG'
+        scene.render.ffmpeg.format = 'MPEG4'
+        scene.render.ffmpeg.codec = 'H264'
+        scene.render.ffmpeg.constant_rate_factor = 'MEDIUM'
+
+
+# ==========================================
+# 5. RENDER
+# ==========================================
+def run_probe(probe_frames: list) -> list:
+    """Timing probe for the auto preset: the engine parses these lines"""
+    scene = bpy.context.scene
+    timings = []
+    for frame in probe_frames:
+        scene.frame_set(frame)
+        t0 = time.perf_counter()
+        bpy.ops.render.render(write_still=False)
+        timings.append(time.perf_counter() - t0)
+        print(f"PROBE_FRAME_SECONDS {timings[-1]:.4f}")
+    print("✅ Probe Complete.")
+    return timings
+
+
+def render_ranges(ranges: list):
+    scene = bpy.context.scene
+    for start, end in ranges:
+        scene.frame_start = start
+        scene.frame_end = end
+        print(f"🎬 Starting Render: frames {start}-{end} -> {scene.render.filepath}")
+        bpy.ops.render.render(animation=True)
+    print("✅ Render Complete.")
+
+
+def render_job(config: dict):
+    """
+    Everything after the import: camera path, settings, then the probe or the frames.
+    Returns the probe timings in probe mode, otherwise None.
+    """
+    camera_map, path_points, write_metadata = compute_camera_path(config)
+
+    # Save Metadata for Streamlit (only one worker writes it)
+    if write_metadata:
+        with open(config["output_metadata"], "w") as f:
+            json.dump(camera_map, f, indent=4)
+        print(f"✅ Camera Metadata saved to: {config['output_metadata']}")
+
+    build_flythrough(path_points, config.get("frame_count", 300))
+    apply_render_settings(config)
+
+    probe_frames = config.get("probe_frames")  # Auto mode: time these frames, write nothing
+    if probe_frames:
+        return run_probe(probe_frames)
+    render_ranges(frame_ranges(config))
+    return None
+
+
+def main():
+    config = load_config(sys.argv)
+    reset_scene()
+    import_scene(config["glb_path"])
+    render_job(config)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Per-machine thumbnails and orbit clips in one Blender session.
+
+    blender -b -P machine_previews.py -- <config.json>
+
+The scene is imported once; one camera (tracking an empty) is moved from
+machine to machine using the camera map, so the render context is reused
+for every still and clip. The engine side is video_studio/previews.py.
+"""
+import bpy
+import json
+import math
+import os
+import sys
+import time
+
+from mathutils import Vector
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import cinematic_render as cr  # noqa: E402
+
+CAMERA_NAME = "PreviewCam"
+PIVOT_NAME = "PreviewPivot"
+ZOOM_FACTOR = 2.5  # Same framing as the builder's camera map
+
+
+def machine_views(config: dict) -> dict:
+    """{machine_id: (target, position)} in Blender space, in flow order."""
+    machine_order = config.get("machine_order", [])
+    precomputed_map = config.get("camera_map")
+    if precomputed_map and os.path.exists(precomputed_map):
+        with open(precomputed_map, "r") as f:
+            camera_map = json.load(f)
+        ids = [m_id for m_id in machine_order if m_id in camera_map] or list(camera_map)
+        return {
+            m_id: (cr.gltf_to_blender(camera_map[m_id]["target"]), cr.gltf_to_blender(camera_map[m_id]["position"]))
+            for m_id in ids
+        }
+
+    # No builder map: same framing from the imported objects
+    index = cr.build_object_index(machine_order)
+    keys, lo, hi = cr.world_bounds([(m_id, index[m_id]) for m_id in machine_order if m_id in index])
+    centers = (lo + hi) / 2
+    zoom = (hi - lo).max(axis=1, keepdims=True) * ZOOM_FACTOR
+    positions = centers + zoom
+    return {k: (Vector(c), Vector(p)) for k, c, p in zip(keys, centers.tolist(), positions.tolist())}
+
+
+def setup_rig():
+    """Camera parented to a pivot empty and tracking it: orbiting = rotating the pivot."""
+    pivot = bpy.data.objects.new(PIVOT_NAME, None)
+    bpy.context.collection.objects.link(pivot)
+
+    cam = bpy.data.objects.new(CAMERA_NAME, bpy.data.cameras.new(CAMERA_NAME))
+    bpy.context.collection.objects.link(cam)
+    cam.parent = pivot
+    track = cam.constraints.new(type='TRACK_TO')
+    track.target = pivot
+    track.track_axis = 'TRACK_NEGATIVE_Z'
+    track.up_axis = 'UP_Y'
+
+    bpy.context.scene.camera = cam
+    return pivot, cam
+
+
+def frame_machine(pivot, cam, target: Vector, position: Vector, orbit_frames: int):
+    pivot.animation_data_clear()
+    pivot.location = target
+    pivot.rotation_euler = (0.0, 0.0, 0.0)
+    cam.location = position - target  # Local offset under the pivot
+
+    # One full turn over [0, 2π), linear: the last frame is one step short of the first, so the clip loops
+    pivot.keyframe_insert(data_path="rotation_euler", index=2, frame=1)
+    pivot.rotation_euler[2] = 2 * math.pi * (orbit_frames - 1) / orbit_frames
+    pivot.keyframe_insert(data_path="rotation_euler", index=2, frame=orbit_frames)
+    for fcurve in pivot.animation_data.action.fcurves:
+        for point in fcurve.keyframe_points:
+            point.interpolation = 'LINEAR'
+
+
+def render_thumbnail(path: str):
+    scene = bpy.context.scene
+    scene.frame_set(1)
+    scene.render.image_settings.file_format = 'PNG'
+    scene.render.image_settings.color_mode = 'RGB'
+    scene.render.filepath = path
+    bpy.ops.render.render(write_still=True)
+
+
+def render_orbit(path: str, orbit_frames: int):
+    scene = bpy.context.scene
+    scene.frame_start = 1
+    scene.frame_end = orbit_frames
+    scene.render.image_settings.file_format = 'FFMPEG'
+    scene.render.ffmpeg.format = 'MPEG4'
+    scene.render.ffmpeg.codec = 'H264'
+    scene.render.ffmpeg.constant_rate_factor = 'MEDIUM'
+    scene.render.filepath = path
+    bpy.ops.render.render(animation=True)
+
+
+def main():
+    config = cr.load_config(sys.argv)
+    output_dir = config["output_dir"]
+    folders = config["folders"]  # machine_id -> safe folder name
+    orbit_frames = config.get("orbit_frames", 48)
+
+    cr.reset_scene()
+    cr.import_scene(config["glb_path"])
+    # Render engine, samples, resolution, threads (output paths are set per file below)
+    cr.apply_render_settings(dict(config, output_frames=None, output_video=os.path.join(output_dir, "orbit.mp4")))
+
+    views = machine_views(config)
+    pivot, cam = setup_rig()
+    manifest = {}
+
+    for m_id, (target, position) in views.items():
+        folder = folders.get(m_id)
+        if folder is None:
+            continue
+        t0 = time.perf_counter()
+        os.makedirs(os.path.join(output_dir, folder), exist_ok=True)
+        frame_machine(pivot, cam, target, position, orbit_frames)
+
+        thumbnail = os.path.join(folder, "thumbnail.png")
+        render_thumbnail(os.path.join(output_dir, thumbnail))
+        entry = {"thumbnail": thumbnail}
+
+        if orbit_frames > 0:
+            orbit = os.path.join(folder, "orbit.mp4")
+            render_orbit(os.path.join(output_dir, orbit), orbit_frames)
+            entry["orbit"] = orbit
+
+        manifest[m_id] = entry
+        print(f"PREVIEW_DONE {m_id} {time.perf_counter() - t0:.2f}")
+
+    with open(config["manifest_path"], "w") as f:
+        json.dump(manifest, f, indent=4)
+    print(f"✅ Previews for {len(manifest)} machines written to {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Persistent headless Blender render worker.
+
+    blender -b -P render_worker.py -- <queue_dir> [idle_seconds]
+
+Jobs are cinematic_render.py configs dropped into <queue_dir>/pending/ by
+video_studio/worker_client.py. A worker claims a job by renaming it into
+running/, keeps the last imported GLB warm (path + mtime) and reports
+progress in status/<job_id>.json. Several workers can share one queue.
+"""
+import bpy
+import json
+import os
+import sys
+import time
+import traceback
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import cinematic_render as cr  # noqa: E402
+
+POLL_SECONDS = 0.5
+
+
+class JobQueue:
+    def __init__(self, root: str):
+        self.root = root
+        self.dirs = {name: os.path.join(root, name) for name in ("pending", "running", "status", "workers")}
+        for path in self.dirs.values():
+            os.makedirs(path, exist_ok=True)
+
+    def claim(self):
+        """Oldest pending job, or None. The rename makes the claim atomic between workers."""
+        for name in sorted(os.listdir(self.dirs["pending"])):
+            if not name.endswith(".json"):
+                continue
+            running = os.path.join(self.dirs["running"], name)
+            try:
+                os.rename(os.path.join(self.dirs["pending"], name), running)
+            except OSError:
+                continue  # Another worker was faster
+            return running
+        return None
+
+    def write_json(self, folder: str, name: str, payload: dict):
+        path = os.path.join(self.dirs[folder], name)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(payload, f)
+        os.replace(tmp, path)
+
+    def should_stop(self) -> bool:
+        return os.path.exists(os.path.join(self.root, "stop"))
+
+
+class WarmScene:
+    """Re-imports only when a different GLB (or a rewritten one) is requested."""
+
+    def __init__(self):
+        self.key = None
+
+    def ensure(self, glb_path: str) -> bool:
+        key = (os.path.abspath(glb_path), os.stat(glb_path).st_mtime_ns)
+        if key == self.key:
+            cr.clear_flythrough()
+            return True
+
+        cr.reset_scene()
+        bpy.ops.outliner.orphans_purge(do_recursive=True)
+        cr.import_scene(glb_path)
+        self.key = key
+        return False
+
+
+def run_job(queue: JobQueue, warm: WarmScene, job_path: str):
+    job_id = os.path.basename(job_path)[:-len(".json")]
+    with open(job_path, "r") as f:
+        config = json.load(f)
+
+    ranges = cr.frame_ranges(config)
+    total = len(config["probe_frames"]) if config.get("probe_frames") else sum(e - s + 1 for s, e in ranges)
+    status = {
+        "job_id": job_id,
+        "state": "running",
+        "worker_pid": os.getpid(),
+        "frame": None,
+        "frames_done": 0,
+        "frames_total": total,
+        "started": time.time(),
+    }
+    queue.write_json("status", f"{job_id}.json", status)
+
+    def on_frame(scene, *args):
+        status["frame"] = scene.frame_current
+        status["frames_done"] += 1
+        queue.write_json("status", f"{job_id}.json", status)
+
+    bpy.app.handlers.render_write.append(on_frame)
+    try:
+        status["warm"] = warm.ensure(config["glb_path"])
+        timings = cr.render_job(config)
+        if timings is not None:
+            status["probe_seconds"] = timings
+        status["state"] = "done"
+    except Exception:
+        status["state"] = "failed"
+        status["error"] = traceback.format_exc()
+        warm.key = None  # Scene state is unknown after a failure
+    finally:
+        bpy.app.handlers.render_write.remove(on_frame)
+        status["finished"] = time.time()
+        queue.write_json("status", f"{job_id}.json", status)
+        os.remove(job_path)
+
+    print(f"{'✅' if status['state'] == 'done' else '❌'} Job {job_id}: {status['state']}")
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:]
+    queue = JobQueue(argv[0])
+    idle_seconds = float(argv[1]) if len(argv) > 1 else 600.0
+
+    warm = WarmScene()
+    heartbeat = f"{os.getpid()}.json"
+    idle_since = time.time()
+    queue.write_json("workers", heartbeat, {"pid": os.getpid(), "job": None, "scene": None})
+    print(f"🟢 Render worker {os.getpid()} listening on {queue.root}")
+
+    try:
+        while not queue.should_stop():
+            job_path = queue.claim()
+            if job_path is None:
+                if time.time() - idle_since > idle_seconds:
+                    break
+                time.sleep(POLL_SECONDS)
+                continue
+
+            queue.write_json("workers", heartbeat, {"pid": os.getpid(), "job": os.path.basename(job_path), "scene": warm.key and warm.key[0]})
+            run_job(queue, warm, job_path)
+            queue.write_json("workers", heartbeat, {"pid": os.getpid(), "job": None, "scene": warm.key and warm.key[0]})
+            idle_since = time.time()
+    finally:
+        try:
+            os.remove(os.path.join(queue.dirs["workers"], heartbeat))
+        except OSError:
+            pass
+    print(f"🔴 Render worker {os.getpid()} stopped")
+
+
+if __name__ == "__main__":
+    main()
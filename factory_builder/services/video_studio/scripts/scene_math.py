@@ -0,0 +1,70 @@
+"""
+Blender-free parts of cinematic_render.py: frame ranges, machine id -> object
+matching and the batched world-space bounds. Plain Python + NumPy, so they
+run (and are tested) outside Blender.
+"""
+import numpy as np
+
+
+def frame_ranges(config: dict) -> list:
+    """Frames this job renders, as [[start, end], ...] (resumed renders pass only the missing ones)."""
+    frame_count = config.get("frame_count", 300)
+    start = config.get("frame_start", 1)
+    end = config.get("frame_end", frame_count)
+    return config.get("frame_ranges") or [[start, end]]
+
+
+def match_objects(machine_ids: list, objects) -> dict:
+    """
+    machine_id -> object, built in one pass over `objects`, given as
+    (object, its machine_id extra or None, name, is mesh).
+
+    The importer keeps glTF node extras as custom properties, so the composer's
+    `machine_id` extra is authoritative. Name matching is the fallback for scenes
+    without it: exact name, then name without Blender's ".001" suffix, and a
+    substring scan only for the few ids still unmatched.
+    """
+    wanted = set(machine_ids)
+    index, by_name, by_base = {}, {}, {}
+    for obj, m_id, name, is_mesh in objects:
+        if m_id in wanted and m_id not in index:
+            index[m_id] = obj
+        if is_mesh:
+            by_name[name] = obj
+            by_base.setdefault(name.rsplit(".", 1)[0], obj)
+
+    missing = [m_id for m_id in machine_ids if m_id not in index]
+    for m_id in missing:
+        obj = by_name.get(m_id) or by_base.get(m_id)
+        if obj:
+            index[m_id] = obj
+
+    leftovers = [m_id for m_id in missing if m_id not in index]
+    for m_id in leftovers:
+        # Fallback: check if name contains ID (Blender sometimes renames)
+        for name, o in by_name.items():
+            if m_id in name:
+                index[m_id] = o
+                break
+    return index
+
+
+def grouped_bounds(owners, corners, matrices):
+    """
+    World AABB per owner from local bound-box corners, in one NumPy pass.
+
+    :param owners: (M,) owner index of each mesh, grouped (equal owners adjacent)
+    :param corners: (M, 8, 3) local bound-box corners
+    :param matrices: (M, 4, 4) world matrices
+    :return: (owner of each row, lo (N, 3), hi (N, 3))
+    """
+    owners = np.asarray(owners)
+    if len(owners) == 0:
+        return owners, np.empty((0, 3)), np.empty((0, 3))
+    corners = np.asarray(corners, dtype=np.float64)
+    matrices = np.asarray(matrices, dtype=np.float64)
+    world = np.einsum("mij,mkj->mki", matrices[:, :3, :3], corners) + matrices[:, None, :3, 3]
+    lo, hi = world.min(axis=1), world.max(axis=1)
+
+    starts = np.flatnonzero(np.r_[True, owners[1:] != owners[:-1]])
+    return owners[starts], np.minimum.reduceat(lo, starts, axis=0), np.maximum.reduceat(hi, starts, axis=0)
@@ -0,0 +1,133 @@
+"""
+Client side of the persistent Blender render worker (scripts/render_worker.py).
+
+Jobs are render configs written atomically into <queue>/pending/. Workers
+claim them, keep the imported GLB warm between jobs and report progress in
+<queue>/status/<job_id>.json. The queue is shared by all projects, so jobs
+from several builder runs are served in submission order.
+"""
+import json
+import os
+import subprocess
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from factory_builder.utils import get_logger
+
+log = get_logger("RenderWorker")
+
+FINAL_STATES = ("done", "failed")
+
+
+def _pid_alive(pid: int) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class RenderWorkerClient:
+    def __init__(self, queue_dir: Path, idle_seconds: float = None):
+        self.queue_dir = Path(queue_dir)
+        self.idle_seconds = idle_seconds or float(os.getenv("BLENDER_WORKER_IDLE_SECONDS") or 600)
+        self.script_path = Path(__file__).parent / "scripts" / "render_worker.py"
+        self._spawned: List[subprocess.Popen] = []
+        for name in ("pending", "running", "status", "workers", "logs"):
+            (self.queue_dir / name).mkdir(parents=True, exist_ok=True)
+
+    # --- Workers ---
+
+    def alive_workers(self) -> set:
+        pids = set()
+        for heartbeat in (self.queue_dir / "workers").glob("*.json"):
+            try:
+                pid = int(heartbeat.stem)
+            except ValueError:
+                continue
+            if _pid_alive(pid):
+                pids.add(pid)
+            else:
+                heartbeat.unlink(missing_ok=True)  # Crashed worker
+        # Started by us but not registered yet
+        pids.update(p.pid for p in self._spawned if p.poll() is None)
+        return pids
+
+    def ensure_workers(self, count: int):
+        """Starts workers until `count` are alive; running ones (from any project) are reused."""
+        (self.queue_dir / "stop").unlink(missing_ok=True)
+        alive = len(self.alive_workers())
+        for _ in range(max(0, count - alive)):
+            log_file = open(self.queue_dir / "logs" / f"worker_{uuid.uuid4().hex[:8]}.log", "w")
+            cmd = ["blender", "-b", "-P", str(self.script_path), "--", str(self.queue_dir), str(self.idle_seconds)]
+            # Own session: the worker outlives this builder run and stays warm for the next one
+            self._spawned.append(subprocess.Popen(cmd, stdout=log_file, stderr=subprocess.STDOUT, start_new_session=True))
+            log_file.close()
+        if count > alive:
+            log.info(f"🟢 Started {count - alive} render worker(s) ({alive} already warm)")
+
+    def shutdown(self):
+        """Asks every worker to exit after its current job."""
+        (self.queue_dir / "stop").touch()
+
+    # --- Jobs ---
+
+    def submit(self, config: dict) -> str:
+        """Queues a render config; the id sorts by submission time."""
+        job_id = f"{time.time_ns()}_{uuid.uuid4().hex[:8]}"
+        # Status first: a worker may claim the job right after the rename
+        self._write_status(job_id, {"job_id": job_id, "state": "queued", "queued": time.time()})
+        pending = self.queue_dir / "pending"
+        tmp = pending / f"{job_id}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(config, f)
+        os.replace(tmp, pending / f"{job_id}.json")
+        return job_id
+
+    def status(self, job_id: str) -> dict:
+        try:
+            with open(self.queue_dir / "status" / f"{job_id}.json", "r") as f:
+                status = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {"job_id": job_id, "state": "unknown"}
+
+        # A worker that died mid-job never writes its final state
+        if status.get("state") == "running" and not _pid_alive(status.get("worker_pid", 0)):
+            status.update(state="failed", error="Render worker exited during the job")
+            self._write_status(job_id, status)
+        return status
+
+    def wait(
+        self,
+        job_ids: List[str],
+        poll_seconds: float = 1.0,
+        timeout: Optional[float] = None,
+        on_progress: Optional[Callable[[Dict[str, dict]], None]] = None,
+    ) -> Dict[str, dict]:
+        """Blocks until every job is done or failed (or the timeout passes)."""
+        started = time.time()
+        while True:
+            statuses = {job_id: self.status(job_id) for job_id in job_ids}
+            if on_progress:
+                on_progress(statuses)
+            if all(s["state"] in FINAL_STATES for s in statuses.values()):
+                return statuses
+            if timeout is not None and time.time() - started > timeout:
+                return statuses
+            if not self.alive_workers():
+                log.error("❌ No render worker alive. Check the logs in " + str(self.queue_dir / "logs"))
+                return statuses
+            time.sleep(poll_seconds)
+
+    def _write_status(self, job_id: str, status: dict):
+        path = self.queue_dir / "status" / f"{job_id}.json"
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(status, f)
+        os.replace(tmp, path)
@@ -0,0 +1,46 @@
+import sys
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Setup path to import factory_builder
+sys.path.append(os.getcwd())
+sys.path.append(os.path.join(os.getcwd(), "factory_builder"))
+
+from factory_builder.services.glb_io import StreamingGLBWriter
+from factory_builder.services.camera_map import build_camera_map
+
+# 2000 x 2000 x 2000 machine body resting on the floor, centred on its origin
+BODY = np.array([[-1000, -1000, 0], [1000, 1000, 2000], [1000, -1000, 0]], dtype=np.float32)
+
+
+class TestCameraMap(unittest.TestCase):
+    def test_map_from_composed_scene(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            scene = Path(tmp) / "factory_complete.glb"
+            moved = np.eye(4)
+            moved[:3, 3] = [10000.0, 0.0, 0.0]
+            with StreamingGLBWriter(scene) as writer:
+                writer.add_mesh("M1", BODY, [0, 1, 2])
+                group = writer.add_group("Node_7", matrix=moved, extras={"machine_id": "M2"})
+                writer.add_mesh("M2_body", BODY, [0, 1, 2], parent=group)
+                writer.add_mesh("Conveyors", BODY, [0, 1, 2])
+
+            result = build_camera_map(scene, ["M1", "M2"])
+
+        self.assertEqual(set(result), {"M1", "M2"})
+
+        # Same framing as SceneComposer._compute_camera_coords (see test_camera_coords)
+        self.assertEqual(result["M1"]["target"], {"x": 0.0, "y": 0.0, "z": 1000.0})
+        self.assertEqual(result["M1"]["position"], {"x": 5000.0, "y": 5000.0, "z": 6000.0})
+
+        # Extras win over node names, and parent transforms are applied
+        self.assertEqual(result["M2"]["target"], {"x": 10000.0, "y": 0.0, "z": 1000.0})
+        self.assertEqual(result["M2"]["position"], {"x": 15000.0, "y": 5000.0, "z": 6000.0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import sys
+import os
+import unittest
+
+import numpy as np
+
+# Setup path to import factory_builder
+sys.path.append(os.getcwd())
+sys.path.append(os.path.join(os.getcwd(), "factory_builder"))
+
+from factory_builder.services.connection_geometry import (
+    ConnectionGeometryBuilder, connection_kind, CONVEYOR, PIPE
+)
+
+
+class TestConnectionGeometry(unittest.TestCase):
+    def setUp(self):
+        self.builder = ConnectionGeometryBuilder()
+
+    def test_connection_kind(self):
+        self.assertEqual(connection_kind("conveyor"), CONVEYOR)
+        self.assertEqual(connection_kind("Pipe_Line"), PIPE)
+        self.assertEqual(connection_kind("pump"), PIPE)
+        self.assertIsNone(connection_kind("agv"))
+
+    def test_one_buffer_per_type(self):
+        buffers = self.builder.build([
+            ("conveyor", [(0, 0), (5000, 0), (5000, 3000)]),
+            ("conveyor", [(0, 0), (2000, 0)]),
+            ("pipe", [(0, 0), (4000, 0), (4000, 2000)]),
+            ("agv", [(0, 0), (1000, 0)]),
+        ])
+        self.assertEqual(set(buffers), {CONVEYOR, PIPE})
+
+        # 3 straight segments + 1 bend joint, 8 vertices / 12 triangles per box
+        conveyor = buffers[CONVEYOR]
+        self.assertEqual(conveyor.vertices.shape, (4 * 8, 3))
+        self.assertEqual(conveyor.indices.shape, (4 * 12, 3))
+        self.assertEqual(conveyor.vertices.dtype, np.float32)
+        self.assertEqual(conveyor.indices.dtype, np.uint32)
+        self.assertLess(conveyor.indices.max(), len(conveyor.vertices))
+
+        pipe = buffers[PIPE]
+        self.assertFalse(pipe.is_empty)
+        self.assertLess(pipe.indices.max(), len(pipe.vertices))
+
+    def test_conveyor_box_extents(self):
+        conveyor = self.builder.build([("conveyor", [(0, 0), (5000, 0)])])[CONVEYOR]
+        v = conveyor.vertices
+        np.testing.assert_allclose(v.min(axis=0), [0, -400, 750])
+        np.testing.assert_allclose(v.max(axis=0), [5000, 400, 900])
+
+    def test_straight_path_has_no_joint(self):
+        conveyor = self.builder.build([("conveyor", [(0, 0), (1000, 0), (2000, 0)])])[CONVEYOR]
+        self.assertEqual(len(conveyor.vertices), 2 * 8)
+
+    def test_degenerate_input(self):
+        buffers = self.builder.build([("conveyor", [(0, 0)]), ("pipe", [(5, 5), (5, 5)])])
+        self.assertTrue(buffers[CONVEYOR].is_empty)
+        self.assertTrue(buffers[PIPE].is_empty)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import sys
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+# Setup path to import factory_builder
+sys.path.append(os.getcwd())
+sys.path.append(os.path.join(os.getcwd(), "factory_builder"))
+
+from factory_builder.services.video_studio.frame_cache import (
+    FrameCache, PNG_TRAILER, cache_key, frames_to_ranges, split_frame_list,
+)
+
+
+class TestFrameCache(unittest.TestCase):
+    def test_ranges(self):
+        self.assertEqual(frames_to_ranges([8, 1, 2, 3, 7]), [(1, 3), (7, 8)])
+
+    def test_split_covers_every_frame_once(self):
+        frames = [1, 2, 3, 10, 11, 12, 13, 280, 281]
+        groups = split_frame_list(frames, 4)
+        self.assertEqual(len(groups), 4)
+        covered = [f for group in groups for s, e in group for f in range(s, e + 1)]
+        self.assertEqual(covered, frames)
+
+    def test_missing_skips_complete_and_drops_truncated(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = FrameCache(Path(tmp), cache_key("scene", {"samples": 32}))
+            cache.frame_path(1).write_bytes(b"\x89PNG..." + PNG_TRAILER)
+            cache.frame_path(2).write_bytes(b"\x89PNG...")  # Crash mid-write
+            self.assertEqual(cache.missing(3), [2, 3])
+            self.assertFalse(cache.frame_path(2).exists())
+
+    def test_clear_and_prune(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            old = FrameCache(Path(tmp), cache_key("scene", 1))
+            cache = FrameCache(Path(tmp), cache_key("scene", 2))
+            cache.frame_path(1).write_bytes(b"\x89PNG..." + PNG_TRAILER)
+            cache.prune_others()
+            self.assertFalse(old.dir.exists())
+            cache.clear()
+            self.assertEqual(list(Path(tmp).iterdir()), [])
+
+    def test_key_changes_with_config(self):
+        self.assertNotEqual(cache_key("scene", {"samples": 32}), cache_key("scene", {"samples": 64}))
+
+
+if __name__ == "__main__":
+    unittest.main()
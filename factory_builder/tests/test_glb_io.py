@@ -0,0 +1,83 @@
+import sys
+import os
+import struct
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Setup path to import factory_builder
+sys.path.append(os.getcwd())
+sys.path.append(os.path.join(os.getcwd(), "factory_builder"))
+
+from factory_builder.services.glb_io import StreamingGLBWriter, read_glb, GLB_MAGIC
+
+
+def _read_accessor(glb, index, dtype, width):
+    acc = glb.gltf["accessors"][index]
+    raw = glb.read_view(acc["bufferView"])
+    return np.frombuffer(raw, dtype=dtype).reshape(-1, width) if width > 1 else np.frombuffer(raw, dtype=dtype)
+
+
+class TestStreamingGLBWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write_model(self, name, offset):
+        path = self.dir / f"{name}.glb"
+        vertices = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0]], dtype=np.float32) + offset
+        with StreamingGLBWriter(path) as writer:
+            writer.add_mesh(name, vertices, [0, 1, 2], color=(1.0, 0.0, 0.0))
+        return path, vertices
+
+    def test_header_and_chunks(self):
+        path, _ = self._write_model("tri", 0.0)
+        data = path.read_bytes()
+        magic, version, length = struct.unpack("<III", data[:12])
+        self.assertEqual(magic, GLB_MAGIC)
+        self.assertEqual(version, 2)
+        self.assertEqual(length, len(data))
+        self.assertEqual(len(data) % 4, 0)
+        # No temporary chunk left behind
+        self.assertEqual(sorted(p.name for p in self.dir.iterdir()), ["tri.glb"])
+
+    def test_merge_models(self):
+        a_path, a_verts = self._write_model("A", 0.0)
+        b_path, b_verts = self._write_model("B", 5.0)
+
+        out = self.dir / "scene.glb"
+        with StreamingGLBWriter(out) as writer:
+            transform = np.eye(4)
+            transform[:3, 3] = [100.0, 0.0, 0.0]
+            wa = writer.add_glb(a_path, "Machine_A", matrix=transform, extras={"machine_id": "A"})
+            wb = writer.add_glb(b_path, "Machine_B")
+
+        glb = read_glb(out)
+        g = glb.gltf
+        self.assertEqual(g["scenes"][0]["nodes"], [wa, wb])
+        self.assertEqual(g["nodes"][wa]["extras"], {"machine_id": "A"})
+        self.assertEqual(g["nodes"][wa]["matrix"][12], 100.0)  # column-major translation
+        self.assertEqual(len(g["meshes"]), 2)
+        self.assertEqual(len(g["materials"]), 2)
+
+        mesh_b = g["nodes"][g["nodes"][wb]["children"][0]]["mesh"]
+        prim = g["meshes"][mesh_b]["primitives"][0]
+        np.testing.assert_array_equal(_read_accessor(glb, prim["attributes"]["POSITION"], np.float32, 3), b_verts)
+        np.testing.assert_array_equal(_read_accessor(glb, prim["indices"], np.uint32, 1), [0, 1, 2])
+
+    def test_abort_on_error(self):
+        out = self.dir / "broken.glb"
+        with self.assertRaises(RuntimeError):
+            with StreamingGLBWriter(out) as writer:
+                writer.add_mesh("x", np.zeros((3, 3)), [0, 1, 2])
+                raise RuntimeError("boom")
+        self.assertEqual(list(self.dir.iterdir()), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
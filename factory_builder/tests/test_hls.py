@@ -0,0 +1,48 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from factory_builder.services.video_studio.frame_cache import FrameCache
+from factory_builder.services.video_studio.hls import SegmentedEncoder, is_finished, listed_segments
+
+PLAYLIST = """#EXTM3U
+#EXT-X-VERSION:6
+#EXT-X-TARGETDURATION:2
+#EXT-X-PLAYLIST-TYPE:EVENT
+#EXTINF:2.000000,
+segment_00000.ts
+#EXTINF:2.000000,
+segment_00001.ts
+"""
+
+
+class TestSegmentedEncoder(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_resume_after_listed_segments(self):
+        frames = FrameCache(self.root / "cache", "a" * 64)
+        encoder = SegmentedEncoder(self.root / "hls", frames, frame_count=300, fps=24)
+        encoder._prepare_dir()
+        encoder.playlist.write_text(PLAYLIST)
+
+        self.assertEqual(listed_segments(encoder.playlist), 2)
+        self.assertFalse(is_finished(encoder.playlist))
+        self.assertEqual(encoder._prepare_dir(), 2 * 48 + 1)
+
+    def test_other_frame_set_starts_over(self):
+        first = SegmentedEncoder(self.root / "hls", FrameCache(self.root / "cache", "a" * 64), 300, 24)
+        first._prepare_dir()
+        first.playlist.write_text(PLAYLIST)
+
+        second = SegmentedEncoder(self.root / "hls", FrameCache(self.root / "cache", "b" * 64), 300, 24)
+        self.assertEqual(second._prepare_dir(), 1)
+        self.assertFalse(second.playlist.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import sys
+import os
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Setup path to import factory_builder
+sys.path.append(os.getcwd())
+sys.path.append(os.path.join(os.getcwd(), "factory_builder"))
+
+from factory_builder.services import image_dedup
+from factory_builder.services.image_dedup import ReferenceImageIndex, perceptual_hash
+
+BASE = 0x0F0F_0F0F_0F0F_0F0F
+
+
+class TestPerceptualHash(unittest.TestCase):
+    def test_resized_reencoded_copy_is_near(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            blobs = np.random.default_rng(0).integers(0, 255, (6, 6, 3), dtype=np.uint8)
+            photo = Image.fromarray(blobs).resize((256, 256), Image.BICUBIC)
+            photo.save(Path(tmp) / "a.png")
+            photo.resize((180, 180)).save(Path(tmp) / "b.jpg", quality=70)
+            photo.transpose(Image.ROTATE_180).save(Path(tmp) / "c.png")
+
+            a, b, c = (perceptual_hash(Path(tmp) / name) for name in ("a.png", "b.jpg", "c.png"))
+        self.assertLessEqual(bin(a ^ b).count("1"), 6)
+        self.assertGreater(bin(a ^ c).count("1"), 6)
+
+
+class TestReferenceImageIndex(unittest.TestCase):
+    """Hashes are given per file name, so distances to the threshold are exact."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.hashes = {}
+        self._hash = image_dedup.perceptual_hash
+        image_dedup.perceptual_hash = lambda path: self.hashes[Path(path).name]
+        self.index = ReferenceImageIndex(self.dir / "index.json", max_distance=6)
+
+    def tearDown(self):
+        image_dedup.perceptual_hash = self._hash
+        self.tmp.cleanup()
+
+    def image(self, name: str, flipped_bits: int = 0) -> str:
+        self.hashes[name] = BASE ^ ((1 << flipped_bits) - 1)
+        return name
+
+    def model(self, name: str) -> Path:
+        path = self.dir / name
+        path.write_bytes(b"glTF")
+        return path
+
+    def test_match_within_threshold(self):
+        claim, model = self.index.acquire(self.image("a.png"))
+        self.assertIsNone(model)
+        self.index.complete(claim, self.model("a.glb"))
+
+        self.assertEqual(self.index.acquire(self.image("b.png", flipped_bits=6))[1], str(self.dir / "a.glb"))
+        # Survives a restart
+        reloaded = ReferenceImageIndex(self.dir / "index.json", max_distance=6)
+        self.assertEqual(reloaded.acquire(self.image("c.png", flipped_bits=3))[1], str(self.dir / "a.glb"))
+
+    def test_miss_above_threshold(self):
+        claim, _ = self.index.acquire(self.image("a.png"))
+        self.index.complete(claim, self.model("a.glb"))
+        claim, model = self.index.acquire(self.image("b.png", flipped_bits=7))
+        self.assertIsNone(model)
+        self.assertEqual(claim.phash, self.hashes["b.png"])  # Caller owns a new generation
+
+    def _acquire_in_thread(self, name: str, timeout: float = 5):
+        result = {}
+        thread = threading.Thread(target=lambda: result.update(value=self.index.acquire(name, timeout=timeout)))
+        thread.start()
+        time.sleep(0.1)
+        self.assertTrue(thread.is_alive())  # Blocked on the in-flight job
+        return thread, result
+
+    def test_waiter_gets_result_after_complete(self):
+        claim, _ = self.index.acquire(self.image("a.png"))
+        thread, result = self._acquire_in_thread(self.image("b.png", flipped_bits=2))
+        self.index.complete(claim, self.model("a.glb"))
+        thread.join(1)
+        self.assertEqual(result["value"], (None, str(self.dir / "a.glb")))
+
+    def test_waiter_gets_fresh_slot_after_fail(self):
+        claim, _ = self.index.acquire(self.image("a.png"))
+        thread, result = self._acquire_in_thread(self.image("b.png", flipped_bits=2))
+        self.index.fail(claim)
+        thread.join(1)
+        waiter_claim, model = result["value"]
+        self.assertIsNone(model)
+        self.assertEqual(waiter_claim.phash, self.hashes["b.png"])
+
+        # The waiter now owns the job: a third near-duplicate waits on it
+        thread, result = self._acquire_in_thread(self.image("c.png", flipped_bits=1))
+        self.index.complete(waiter_claim, self.model("b.glb"))
+        thread.join(1)
+        self.assertEqual(result["value"][1], str(self.dir / "b.glb"))
+
+    def test_timed_out_caller_cannot_release_the_owners_claim(self):
+        owner, _ = self.index.acquire(self.image("a.png"))
+        self.image("a2.png")  # Same hash as the owner's image
+        late, model = self.index.acquire("a2.png", timeout=0.05)
+        self.assertIsNone(model)
+        self.assertIsNot(late, owner)
+
+        # The timed-out caller's failure must leave the owner's job in flight
+        self.index.fail(late)
+        thread, result = self._acquire_in_thread(self.image("b.png", flipped_bits=2))
+        self.index.complete(owner, self.model("a.glb"))
+        thread.join(1)
+        self.assertEqual(result["value"], (None, str(self.dir / "a.glb")))
+
+    def test_save_merges_entries_of_other_builders(self):
+        other = ReferenceImageIndex(self.dir / "index.json", max_distance=6)
+        claim, _ = self.index.acquire(self.image("a.png"))
+        self.index.complete(claim, self.model("a.glb"))
+        claim, _ = other.acquire(self.image("z.png", flipped_bits=40))
+        other.complete(claim, self.model("z.glb"))
+
+        reloaded = ReferenceImageIndex(self.dir / "index.json", max_distance=6)
+        self.assertEqual(reloaded.acquire("a.png")[1], str(self.dir / "a.glb"))
+        self.assertEqual(reloaded.acquire("z.png")[1], str(self.dir / "z.glb"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import sys
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import trimesh
+from PIL import Image
+
+# Setup path to import factory_builder
+sys.path.append(os.getcwd())
+sys.path.append(os.path.join(os.getcwd(), "factory_builder"))
+
+from factory_builder.services import model_cache
+from factory_builder.services.glb_io import StreamingGLBWriter
+from factory_builder.services.model_cache import ModelCache
+from factory_builder.services.placeholders import box_buffers
+
+
+def _write_box(path, size):
+    """glTF (Y-up) box from the origin to `size`, red."""
+    vertices, normals, indices = box_buffers((0.0, 0.0, 0.0), size)
+    with StreamingGLBWriter(path) as writer:
+        writer.add_mesh("body", vertices, indices, color=(1.0, 0.0, 0.0), normals=normals)
+
+
+class TestModelCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.cache = ModelCache(self.dir / "cache", max_workers=2)
+        self.model = self.dir / "3d_model.glb"
+        _write_box(self.model, (2.0, 1.0, 4.0))  # 2 wide (X), 1 tall (Y), 4 deep (Z)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_fit_to_footprint_is_z_up(self):
+        model = self.cache.get(self.model, 4.0, 8.0)
+        lo, hi = model.bounds
+        # Depth becomes Y, height becomes Z; scale 2 fits X and Y exactly, centred, on the floor
+        np.testing.assert_allclose(lo, [-2.0, -4.0, 0.0], atol=1e-5)
+        np.testing.assert_allclose(hi, [2.0, 4.0, 2.0], atol=1e-5)
+        self.assertEqual(tuple(model.meshes[0].visual.material.main_color[:3]), (255, 0, 0))
+
+        # Narrower footprint: the limiting axis decides a uniform scale
+        model = self.cache.get(self.model, 1.0, 8.0)
+        np.testing.assert_allclose(model.bounds[1], [0.5, 1.0, 0.5], atol=1e-5)
+
+    def test_hit_skips_normalization(self):
+        first = self.cache.get(self.model, 4.0, 8.0)
+        normalize = model_cache._normalize_to_cache
+        model_cache._normalize_to_cache = lambda *args: self.fail("cache miss on unchanged model")
+        try:
+            second = self.cache.get(self.model, 4.0, 8.0)
+        finally:
+            model_cache._normalize_to_cache = normalize
+        np.testing.assert_array_equal(first.bounds, second.bounds)
+        self.assertEqual(len(list((self.dir / "cache").glob("*.glb"))), 1)
+
+    def test_source_change_invalidates_key(self):
+        old_key = self.cache.key(self.model, 4.0, 8.0)
+        self.cache.get(self.model, 4.0, 8.0)
+        self.assertNotEqual(old_key, self.cache.key(self.model, 4.0, 6.0))
+
+        _write_box(self.model, (2.0, 3.0, 4.0))  # Regenerated model: taller
+        self.assertNotEqual(old_key, self.cache.key(self.model, 4.0, 8.0))
+        self.assertAlmostEqual(float(self.cache.get(self.model, 4.0, 8.0).bounds[1][2]), 6.0, places=4)
+
+    def test_textured_models_keep_uvs_and_image(self):
+        textured = self.dir / "textured.glb"
+        box = trimesh.creation.box()
+        uv = np.random.default_rng(0).random((len(box.vertices), 2))
+        box.visual = trimesh.visual.TextureVisuals(uv=uv, image=Image.new("RGB", (8, 8), (0, 128, 255)))
+        box.export(textured)
+
+        resolved = self.cache.warm({"plain": (str(self.model), 4.0, 8.0), "textured": (str(textured), 2.0, 2.0)})
+        self.assertEqual(set(resolved), {"plain", "textured"})
+
+        model = self.cache.load(resolved["textured"])
+        visual = model.meshes[0].visual
+        self.assertEqual(visual.uv.shape, (len(model.meshes[0].vertices), 2))
+        image = visual.material.baseColorTexture
+        self.assertEqual(image.size, (8, 8))
+        self.assertEqual(image.convert("RGB").getpixel((0, 0)), (0, 128, 255))
+        np.testing.assert_allclose(model.bounds, [[-1.0, -1.0, 0.0], [1.0, 1.0, 2.0]], atol=1e-5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import sys
+import os
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+# Setup path to import factory_builder
+sys.path.append(os.getcwd())
+sys.path.append(os.path.join(os.getcwd(), "factory_builder"))
+
+from factory_builder.services.video_studio.engines import blender_engine
+from factory_builder.services.video_studio.engines.blender_engine import FRAME_COUNT, BlenderEngine
+from factory_builder.services.video_studio.frame_cache import PNG_TRAILER, frames_to_ranges, split_frame_list
+
+# Stands in for `blender -b -P cinematic_render.py -- config.json`: writes its frames, logs its time span
+FAKE_BLENDER = '''
+import json, sys, time
+config = json.load(open(sys.argv[-1]))
+started = time.time()
+time.sleep(0.3)
+frames = [f for start, end in config["frame_ranges"] for f in range(start, end + 1)]
+if config.get("fail"):
+    sys.exit(1)
+for f in frames:
+    with open(config["output_frames"].replace("####", "%04d" % f) + ".png", "wb") as out:
+        out.write(b"PNG" + {trailer!r})
+with open(config["spans"], "a") as log:
+    log.write(json.dumps([started, time.time(), frames, config["write_metadata"]]) + "\\n")
+'''.format(trailer=PNG_TRAILER)
+
+
+class TestFrameSplit(unittest.TestCase):
+    def test_groups_are_balanced_and_consecutive(self):
+        groups = split_frame_list(list(range(1, FRAME_COUNT + 1)), 8)
+        sizes = [sum(e - s + 1 for s, e in group) for group in groups]
+        self.assertEqual(sum(sizes), FRAME_COUNT)
+        self.assertLessEqual(max(sizes) - min(sizes), 1)
+        self.assertTrue(all(len(group) == 1 for group in groups))  # One contiguous range each
+        self.assertEqual([group[0][0] for group in groups][:2], [1, 39])
+
+    def test_more_workers_than_frames(self):
+        self.assertEqual(split_frame_list([5, 9], 8), [[(5, 5)], [(9, 9)]])
+        self.assertEqual(split_frame_list([], 8), [])
+        self.assertEqual(frames_to_ranges([]), [])
+
+
+class TestParallelRender(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        script = self.dir / "fake_blender.py"
+        script.write_text(FAKE_BLENDER)
+        self.scene = self.dir / "factory_complete.glb"
+        self.scene.write_bytes(b"glTF")
+        self.spans = self.dir / "spans.jsonl"
+
+        self.engine = BlenderEngine(workers=4, preset="standard")
+        self.engine.output_mode = "mp4"
+        self.engine._blender_cmd = lambda config_path: [sys.executable, str(script), str(config_path)]
+
+        self.encodes = []
+        self._run = blender_engine.subprocess.run
+        blender_engine.subprocess.run = self._fake_ffmpeg
+
+    def tearDown(self):
+        blender_engine.subprocess.run = self._run
+        self.tmp.cleanup()
+
+    def _fake_ffmpeg(self, cmd, **kwargs):
+        self.encodes.append(cmd)
+        Path(cmd[-1]).write_bytes(b"mp4")
+
+    def render(self, **extra):
+        render_frames = self.engine._render_frames
+        self.engine._render_frames = lambda config, groups, work_dir: render_frames(
+            dict(config, spans=str(self.spans), **extra), groups, work_dir
+        )
+        return self.engine.render(self.scene, {"layout": {"machines": [{"id": "M1"}]}}, self.dir / "cinematic.mp4")
+
+    def test_workers_render_disjoint_ranges_concurrently(self):
+        self.assertEqual(self.render(), self.dir / "cinematic.mp4")
+
+        spans = [json.loads(line) for line in self.spans.read_text().splitlines()]
+        self.assertEqual(len(spans), 4)
+        frames = sorted(f for span in spans for f in span[2])
+        self.assertEqual(frames, list(range(1, FRAME_COUNT + 1)))  # Each frame exactly once
+        self.assertEqual(sum(1 for span in spans if span[3]), 1)  # One worker writes the camera map
+        self.assertLess(max(span[0] for span in spans), min(span[1] for span in spans))  # All ran at once
+
+        # One encode of the whole numbered sequence
+        self.assertEqual(len(self.encodes), 1)
+        cmd = self.encodes[0]
+        self.assertEqual(cmd[0], "ffmpeg")
+        self.assertTrue(cmd[cmd.index("-i") + 1].endswith("frame_%04d.png"))
+        self.assertEqual(cmd[cmd.index("-start_number") + 1], "1")
+        self.assertEqual(list((self.dir / "render_cache").glob("*/frame_*.png")), [])  # Frames dropped once published
+
+    def test_older_preset_choices_are_pruned(self):
+        stale = self.dir / "render_cache" / "0123456789abcdef.preset.json"
+        stale.parent.mkdir()
+        stale.write_text("{}")
+        self.render()
+        self.assertFalse(stale.exists())
+
+    def test_frames_kept_on_request(self):
+        self.engine.keep_frames = True
+        self.render()
+        self.assertEqual(len(list((self.dir / "render_cache").glob("*/frame_*.png"))), FRAME_COUNT)
+
+    def test_failed_worker_fails_the_render(self):
+        self.assertIsNone(self.render(fail=True))
+        self.assertEqual(self.encodes, [])
+        self.assertFalse((self.dir / "cinematic.mp4").exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
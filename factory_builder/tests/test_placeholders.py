@@ -0,0 +1,31 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from factory_builder.services.glb_io import read_glb
+from factory_builder.services.placeholders import box_buffers, build_placeholder_glb
+
+
+class TestPlaceholders(unittest.TestCase):
+    def test_box_normals_point_outward(self):
+        vertices, normals, indices = box_buffers((0, 0, 0), (2, 3, 4))
+        tris = vertices[indices.reshape(-1, 3)]
+        face_normals = np.cross(tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0])
+        self.assertTrue(np.all(np.einsum("ij,ij->i", face_normals, normals[indices.reshape(-1, 3)[:, 0]]) > 0))
+
+    def test_placeholder_matches_footprint(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = build_placeholder_glb(Path(tmp) / "placeholder.glb", length=4000, width=1500)
+            gltf = read_glb(path).gltf
+
+            self.assertEqual(len(gltf["meshes"]), 3)
+            lo = np.min([a["min"] for a in gltf["accessors"] if "min" in a], axis=0)
+            hi = np.max([a["max"] for a in gltf["accessors"] if "max" in a], axis=0)
+            np.testing.assert_allclose(hi - lo, [4000, 900, 1500])  # Height from the footprint
+            self.assertTrue(gltf["nodes"][0]["extras"]["placeholder"])
+
+
+if __name__ == "__main__":
+    unittest.main()
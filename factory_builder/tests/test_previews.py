@@ -0,0 +1,38 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from factory_builder.services.video_studio import previews
+from factory_builder.services.video_studio.previews import MachinePreviewBatch
+
+
+def fake_blender(cmd, **kwargs):
+    """Writes what scripts/machine_previews.py would write."""
+    with open(cmd[-1], "r") as f:
+        config = json.load(f)
+    machines = {m_id: {"thumbnail": f"{folder}/thumbnail.png"} for m_id, folder in config["folders"].items()}
+    with open(config["manifest_path"], "w") as f:
+        json.dump(machines, f)
+    return mock.Mock(returncode=0)
+
+
+class TestMachinePreviewBatch(unittest.TestCase):
+    def test_one_session_then_cached(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            scene = Path(tmp) / "factory_complete.glb"
+            scene.write_bytes(b"glTF")
+            batch = MachinePreviewBatch(Path(tmp) / "previews", orbit_frames=0)
+
+            with mock.patch.object(previews.subprocess, "run", side_effect=fake_blender) as run:
+                manifest = batch.run(scene, ["M-01", "M/02"])
+                self.assertEqual(run.call_count, 1)
+                self.assertEqual(manifest["machines"]["M/02"]["thumbnail"], "M_02/thumbnail.png")
+
+                batch.run(scene, ["M-01", "M/02"])
+                self.assertEqual(run.call_count, 1)  # Same scene and settings: no Blender launch
+
+
+if __name__ == "__main__":
+    unittest.main()
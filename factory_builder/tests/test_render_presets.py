@@ -0,0 +1,102 @@
+import sys
+import os
+import unittest
+
+# Setup path to import factory_builder
+sys.path.append(os.getcwd())
+sys.path.append(os.path.join(os.getcwd(), "factory_builder"))
+
+from factory_builder.services.video_studio.engines.blender_engine import BlenderEngine
+from factory_builder.services.video_studio.presets import (
+    AUTO_LADDER, PROBE_BUDGET_FRACTION, PRESETS, choose_preset, estimate_seconds
+)
+
+
+class FakeProbe:
+    """Per-frame cost proportional to samples * pixels, per engine; each probe takes `wall` seconds of clock."""
+    def __init__(self, seconds_per_unit, setup=10.0, failing=(), wall=0.0):
+        self.seconds_per_unit = seconds_per_unit
+        self.setup = setup
+        self.failing = set(failing)
+        self.wall = wall
+        self.now = 0.0
+        self.calls = []
+
+    def clock(self):
+        return self.now
+
+    def __call__(self, preset):
+        self.calls.append(preset.name)
+        self.now += self.wall
+        if preset.engine in self.failing:
+            return None
+        return self.seconds_per_unit[preset.engine] * preset.cost_units, self.setup
+
+
+class TestRenderPresets(unittest.TestCase):
+    def test_estimate(self):
+        self.assertEqual(estimate_seconds(2.0, 10.0, frame_count=300, workers=8), 10.0 + 2.0 * 38)
+
+    def test_generous_budget_picks_best(self):
+        probe = FakeProbe({"CYCLES": 1e-9})
+        preset, report = choose_preset(probe, budget_seconds=3600, frame_count=300, workers=8)
+        self.assertEqual(preset, PRESETS["final"])
+        self.assertTrue(report["fits_budget"])
+        self.assertEqual(probe.calls, ["low"])  # Probed on the cheapest CYCLES candidate
+
+    def test_tight_budget_extrapolates_within_engine(self):
+        # final = 128 * 1920 * 1080 units -> ~26.5 s/frame; standard -> ~2.9 s/frame
+        probe = FakeProbe({"CYCLES": 1e-7})
+        preset, report = choose_preset(probe, budget_seconds=150, frame_count=300, workers=8)
+        self.assertEqual(preset.name, "standard")
+        self.assertEqual(probe.calls, ["low"])  # Only one probe per engine
+        self.assertLessEqual(report["estimated_seconds"], 150)
+
+    def test_falls_through_to_cheaper_engine(self):
+        probe = FakeProbe({"CYCLES": 1e-5, "BLENDER_EEVEE": 1e-9, "BLENDER_WORKBENCH": 1e-9})
+        preset, _ = choose_preset(probe, budget_seconds=60, frame_count=300, workers=8)
+        self.assertEqual(preset, PRESETS["preview"])
+        self.assertEqual(probe.calls, ["low", "eevee_low"])
+
+    def test_probe_time_comes_out_of_the_budget(self):
+        # standard alone needs ~97 s: fits 150 s, but not what is left after a 60 s probe
+        probe = FakeProbe({"CYCLES": 1e-7}, wall=60.0)
+        preset, report = choose_preset(probe, budget_seconds=150, frame_count=300, workers=8, clock=probe.clock)
+        self.assertEqual(preset.name, "fast")
+        self.assertLessEqual(report["estimated_seconds"], 150 - 60)
+        self.assertEqual(report["probe_seconds"], 60.0)
+
+    def test_probing_stops_at_its_share_of_the_budget(self):
+        budget = 100.0
+        probe = FakeProbe({"CYCLES": 1.0, "BLENDER_EEVEE": 1e-9}, wall=budget * PROBE_BUDGET_FRACTION)
+        preset, report = choose_preset(probe, budget_seconds=budget, frame_count=300, workers=8, clock=probe.clock)
+        self.assertEqual(probe.calls, ["low"])  # EEVEE would fit but is never probed
+        self.assertEqual(preset.name, "low")
+        self.assertFalse(report["fits_budget"])
+
+    def test_failed_engine_is_skipped(self):
+        probe = FakeProbe({"CYCLES": 1e-5, "BLENDER_WORKBENCH": 1e-9}, failing={"BLENDER_EEVEE"})
+        preset, report = choose_preset(probe, budget_seconds=60, frame_count=300, workers=8)
+        self.assertEqual(preset, PRESETS["draft"])
+        self.assertTrue(any(p.get("failed") for p in report["probes"]))
+
+    def test_nothing_fits_returns_cheapest(self):
+        probe = FakeProbe({"CYCLES": 1.0, "BLENDER_EEVEE": 1.0, "BLENDER_WORKBENCH": 1.0})
+        preset, report = choose_preset(probe, budget_seconds=1, frame_count=300, workers=1)
+        self.assertEqual(preset, AUTO_LADDER[-1])
+        self.assertFalse(report["fits_budget"])
+
+
+class TestRenderKeys(unittest.TestCase):
+    def test_output_mode_only_changes_the_request(self):
+        config = {"machine_order": ["M1", "M2"], "camera_map": None}
+        mp4, hls = BlenderEngine(workers=1, preset="standard"), BlenderEngine(workers=1, preset="standard")
+        hls.output_mode = "hls"
+        shot = mp4._shot_key("scene-hash", config)
+        self.assertEqual(shot, hls._shot_key("scene-hash", config))  # Same frames
+        self.assertNotEqual(mp4._request_key(shot), hls._request_key(shot))  # Different result
+        self.assertEqual(mp4._request_key(shot, with_output=False), hls._request_key(shot, with_output=False))
+        self.assertNotEqual(shot, mp4._shot_key("scene-hash", dict(config, machine_order=["M2", "M1"])))
+
+if __name__ == '__main__':
+    unittest.main()
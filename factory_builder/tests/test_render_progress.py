@@ -0,0 +1,30 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from factory_builder.services.video_studio.progress import RenderProgress, parse_current_frame, parse_saved_frame
+
+
+class TestRenderProgress(unittest.TestCase):
+    def test_parses_blender_lines(self):
+        self.assertEqual(parse_saved_frame("Saved: '/data/p1/render_cache/ab12/frame_0042.png'"), 42)
+        self.assertEqual(parse_current_frame("Fra:17 Mem:120.5M | Time:00:01.20 | Sample 8/32"), 17)
+        self.assertIsNone(parse_saved_frame("Fra:17 Mem:120.5M"))
+
+    def test_status_file_counts_cached_frames(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "video_status.json"
+            progress = RenderProgress(path, min_interval=0)
+            progress.start_frames(10, cached=5)
+            progress.feed_line("Saved: '/tmp/frame_0006.png'")
+
+            status = json.loads(path.read_text())
+            self.assertEqual(status["state"], "rendering")
+            self.assertEqual(status["frames_done"], 6)
+            self.assertEqual(status["percent"], 60.0)
+            self.assertIsNotNone(status["eta_seconds"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Setup path to import factory_builder
+sys.path.append(os.getcwd())
+sys.path.append(os.path.join(os.getcwd(), "factory_builder"))
+
+from factory_builder.services.geometry_compress import GeometryCompressor
+from factory_builder.services.glb_io import StreamingGLBWriter, read_glb
+from factory_builder.services.scene_chunks import write_scene_chunks
+
+TRI = np.array([[0, 0, 0], [1000, 0, 0], [0, 1000, 1000]], dtype=np.float32)
+
+
+class TestSceneChunks(unittest.TestCase):
+    def test_one_chunk_per_root(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            scene = Path(tmp) / "factory_complete.glb"
+            moved = np.eye(4)
+            moved[:3, 3] = [5000.0, 0.0, 0.0]
+            with StreamingGLBWriter(scene) as writer:
+                writer.add_mesh("Floor", TRI * 10, [0, 1, 2])
+                group = writer.add_group("Node_3", matrix=moved, extras={"machine_id": "M1"})
+                writer.add_mesh("M1_body", TRI, [0, 1, 2], parent=group)
+                writer.add_mesh("Conveyors", TRI, [0, 1, 2])
+
+            out = Path(tmp) / "chunks"
+            manifest = write_scene_chunks(scene, out, ["M1"], GeometryCompressor(mode="off"))
+
+            kinds = {c["id"]: c["kind"] for c in manifest["chunks"]}
+            self.assertEqual(kinds, {"Floor": "layout", "M1": "machine", "Conveyors": "connection"})
+
+            m1 = next(c for c in manifest["chunks"] if c["id"] == "M1")
+            self.assertEqual(m1["bounds"]["min"], [5000.0, 0.0, 0.0])
+            self.assertEqual(m1["bounds"]["max"], [6000.0, 1000.0, 1000.0])
+
+            # The chunk keeps the machine node (transform + extras) and only its own geometry
+            chunk = read_glb(out / m1["file"]).gltf
+            self.assertEqual(len(chunk["meshes"]), 1)
+            machine_node = next(n for n in chunk["nodes"] if (n.get("extras") or {}).get("machine_id") == "M1")
+            self.assertIn("matrix", machine_node)
+
+            # Unchanged scene: manifest reused, nothing rewritten
+            mtime = (out / m1["file"]).stat().st_mtime_ns
+            self.assertEqual(write_scene_chunks(scene, out, ["M1"], GeometryCompressor(mode="off")), json.loads((out / "manifest.json").read_text()))
+            self.assertEqual((out / m1["file"]).stat().st_mtime_ns, mtime)
+
+    def test_compressed_variants(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            # Stand-in for gltfpack: writes the first half of its input
+            fake = Path(tmp) / "gltfpack"
+            fake.write_text(
+                "#!/usr/bin/env python3\n"
+                "import sys\n"
+                "args = sys.argv\n"
+                "data = open(args[args.index('-i') + 1], 'rb').read()\n"
+                "open(args[args.index('-o') + 1], 'wb').write(data[: len(data) // 2])\n"
+            )
+            fake.chmod(0o755)
+
+            scene = Path(tmp) / "factory_complete.glb"
+            with StreamingGLBWriter(scene) as writer:
+                writer.add_mesh("Floor", TRI * 10, [0, 1, 2])
+
+            out = Path(tmp) / "chunks"
+            manifest = write_scene_chunks(scene, out, [], GeometryCompressor(mode="meshopt", binary=str(fake)))
+            self.assertEqual(manifest["compression"], "meshopt")
+            floor = manifest["chunks"][0]
+            self.assertTrue(floor["compressed"]["file"].endswith(".meshopt.glb"))
+            self.assertLess(floor["compressed"]["bytes"], floor["bytes"])
+            self.assertTrue((out / floor["compressed"]["file"]).exists())
+
+            # Compression turned off: rebuilt without variants, old ones removed
+            manifest = write_scene_chunks(scene, out, [], GeometryCompressor(mode="off"))
+            self.assertNotIn("compressed", manifest["chunks"][0])
+            self.assertEqual(list(out.glob("*.meshopt.glb")), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import sys
+import os
+import unittest
+
+import numpy as np
+
+# Setup path to import factory_builder
+sys.path.append(os.getcwd())
+sys.path.append(os.path.join(os.getcwd(), "factory_builder"))
+
+from factory_builder.services.video_studio.scripts.scene_math import frame_ranges, grouped_bounds, match_objects
+
+
+def _random_matrix(rng):
+    """Rotation about a random axis, non-uniform scale and a translation."""
+    axis = rng.normal(size=3)
+    axis /= np.linalg.norm(axis)
+    angle = rng.uniform(0, 2 * np.pi)
+    k = np.array([[0, -axis[2], axis[1]], [axis[2], 0, -axis[0]], [-axis[1], axis[0], 0]])
+    rotation = np.eye(3) + np.sin(angle) * k + (1 - np.cos(angle)) * k @ k
+    matrix = np.eye(4)
+    matrix[:3, :3] = rotation @ np.diag(rng.uniform(0.5, 3.0, 3))
+    matrix[:3, 3] = rng.uniform(-100, 100, 3)
+    return matrix
+
+
+def _box_corners(lo, hi):
+    return np.array([[x, y, z] for x in (lo[0], hi[0]) for y in (lo[1], hi[1]) for z in (lo[2], hi[2])])
+
+
+class TestFrameRanges(unittest.TestCase):
+    def test_defaults_to_the_whole_shot(self):
+        self.assertEqual(frame_ranges({}), [[1, 300]])
+        self.assertEqual(frame_ranges({"frame_count": 48}), [[1, 48]])
+        self.assertEqual(frame_ranges({"frame_start": 10, "frame_end": 20}), [[10, 20]])
+
+    def test_explicit_ranges_win(self):
+        config = {"frame_start": 1, "frame_end": 300, "frame_ranges": [[1, 3], [7, 8]]}
+        self.assertEqual(frame_ranges(config), [[1, 3], [7, 8]])
+
+
+class TestMatchObjects(unittest.TestCase):
+    def test_extras_then_names(self):
+        objects = [
+            ("empty_m1", "M1", "Group_M1", False),   # Tagged by the composer
+            ("mesh_m1", None, "M1", True),           # Same name: the extra still wins
+            ("mesh_m2", None, "M2.001", True),       # Renamed on import
+            ("mesh_m3", None, "Line_M3_body", True),
+            ("empty_m4", None, "M4", False),         # Untagged empties are not matched by name
+        ]
+        index = match_objects(["M1", "M2", "M3", "M4"], objects)
+        self.assertEqual(index, {"M1": "empty_m1", "M2": "mesh_m2", "M3": "mesh_m3"})
+
+    def test_exact_name_beats_substring(self):
+        objects = [("long", None, "M10", True), ("short", None, "M1", True)]
+        self.assertEqual(match_objects(["M1", "M10"], objects), {"M1": "short", "M10": "long"})
+
+
+class TestGroupedBounds(unittest.TestCase):
+    def test_matches_per_object_reference(self):
+        rng = np.random.default_rng(7)
+        owners, corners, matrices = [], [], []
+        for owner in range(40):
+            for _ in range(rng.integers(1, 5)):  # Several meshes per machine
+                lo = rng.uniform(-5, 0, 3)
+                owners.append(owner)
+                corners.append(_box_corners(lo, lo + rng.uniform(0.1, 5, 3)))
+                matrices.append(_random_matrix(rng))
+
+        found, lo, hi = grouped_bounds(owners, corners, matrices)
+        np.testing.assert_array_equal(found, np.arange(40))
+
+        for i, owner in enumerate(found):
+            points = np.concatenate([
+                (matrix @ np.c_[box, np.ones(8)].T).T[:, :3]
+                for o, box, matrix in zip(owners, corners, matrices) if o == owner
+            ])
+            np.testing.assert_allclose(lo[i], points.min(axis=0), rtol=1e-12, atol=1e-9)
+            np.testing.assert_allclose(hi[i], points.max(axis=0), rtol=1e-12, atol=1e-9)
+
+    def test_owners_without_meshes_are_left_out(self):
+        corners = [_box_corners([0, 0, 0], [1, 1, 1])] * 2
+        found, lo, hi = grouped_bounds([1, 3], corners, [np.eye(4), np.eye(4)])
+        self.assertEqual(found.tolist(), [1, 3])
+        found, lo, hi = grouped_bounds([], [], [])
+        self.assertEqual((len(found), lo.shape), (0, (0, 3)))
+
+
+if __name__ == '__main__':
+    unittest.main()
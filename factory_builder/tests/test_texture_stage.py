@@ -0,0 +1,104 @@
+import sys
+import os
+import io
+import json
+import struct
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Setup path to import factory_builder
+sys.path.append(os.getcwd())
+sys.path.append(os.path.join(os.getcwd(), "factory_builder"))
+
+from factory_builder.services.glb_io import read_glb
+from factory_builder.services.texture_stage import TextureStage
+
+
+def _png(width, height, seed=0):
+    pixels = np.random.default_rng(seed).integers(0, 255, (height, width, 3), dtype=np.uint8)
+    out = io.BytesIO()
+    Image.fromarray(pixels).save(out, format="PNG")
+    return out.getvalue()
+
+
+def _write_glb(path, images):
+    """GLB holding only embedded images, one texture per image."""
+    blob, views = b"", []
+    for data in images:
+        views.append({"buffer": 0, "byteOffset": len(blob), "byteLength": len(data)})
+        blob += data + b"\x00" * (-len(data) % 4)
+    gltf = {
+        "asset": {"version": "2.0"},
+        "buffers": [{"byteLength": len(blob)}],
+        "bufferViews": views,
+        "images": [{"bufferView": i, "mimeType": "image/png"} for i in range(len(images))],
+        "textures": [{"source": i} for i in range(len(images))],
+    }
+    text = json.dumps(gltf).encode()
+    text += b" " * (-len(text) % 4)
+    with open(path, "wb") as f:
+        f.write(struct.pack("<III", 0x46546C67, 2, 12 + 8 + len(text) + 8 + len(blob)))
+        f.write(struct.pack("<II", len(text), 0x4E4F534A) + text)
+        f.write(struct.pack("<II", len(blob), 0x004E4942) + blob)
+
+
+def _image(glb, index):
+    return glb.read_view(glb.gltf["images"][index]["bufferView"])
+
+
+class TestTextureStage(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.stage = TextureStage(self.dir / "cache", max_edge=256, transcode="")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_duplicates_collapse_and_large_images_shrink(self):
+        big, other = _png(1024, 512, seed=1), _png(64, 64, seed=2)
+        scene = self.dir / "scene.glb"
+        _write_glb(scene, [big, other, big])
+
+        stats = self.stage.process(scene)
+        glb = read_glb(scene)
+        self.assertEqual((stats["images"], stats["unique"]), (3, 2))
+        self.assertEqual([t["source"] for t in glb.gltf["textures"]], [0, 1, 0])
+        self.assertEqual(Image.open(io.BytesIO(_image(glb, 0))).size, (256, 128))
+        self.assertEqual(glb.gltf["images"][0]["mimeType"], "image/jpeg")  # Opaque: re-encoded
+
+        # Second build is served from the cache
+        self.assertEqual(len(list((self.dir / "cache").iterdir())), 2)
+        _write_glb(scene, [big])
+        self.stage.process(scene)
+        self.assertEqual(len(list((self.dir / "cache").iterdir())), 2)
+
+    def test_undecodable_image_is_kept_as_is(self):
+        broken = b"\x89PNG\r\n\x1a\n" + b"truncated"
+        scene = self.dir / "scene.glb"
+        _write_glb(scene, [broken, _png(512, 512)])
+
+        stats = self.stage.process(scene)
+        glb = read_glb(scene)
+        self.assertEqual(stats["unique"], 2)
+        self.assertEqual(_image(glb, 0), broken)
+        self.assertEqual(glb.gltf["images"][0]["mimeType"], "image/png")
+        self.assertEqual(max(Image.open(io.BytesIO(_image(glb, 1))).size), 256)
+
+    def test_decompression_bomb_is_kept_as_is(self):
+        data = _png(300, 300)
+        limit = Image.MAX_IMAGE_PIXELS
+        Image.MAX_IMAGE_PIXELS = 10_000  # Errors above twice the limit
+        try:
+            self.assertEqual(self.stage.process_image(data, "image/png"), (data, "image/png"))
+        finally:
+            Image.MAX_IMAGE_PIXELS = limit
+        self.assertEqual(list((self.dir / "cache").iterdir()), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from factory_builder.services.video_studio.worker_client import RenderWorkerClient
+
+
+class TestRenderWorkerClient(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.client = RenderWorkerClient(Path(self.tmp.name))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_submit_queues_in_order(self):
+        first = self.client.submit({"glb_path": "a.glb"})
+        second = self.client.submit({"glb_path": "b.glb"})
+        pending = sorted(p.stem for p in (Path(self.tmp.name) / "pending").glob("*.json"))
+        self.assertEqual(pending, [first, second])
+        self.assertEqual(self.client.status(first)["state"], "queued")
+
+    def test_dead_worker_marks_job_failed(self):
+        job_id = self.client.submit({"glb_path": "a.glb"})
+        status_path = Path(self.tmp.name) / "status" / f"{job_id}.json"
+        status_path.write_text(json.dumps({"job_id": job_id, "state": "running", "worker_pid": 2 ** 22 + 1}))
+        self.assertEqual(self.client.status(job_id)["state"], "failed")
+
+
+if __name__ == "__main__":
+    unittest.main()